@@ -0,0 +1,12 @@
+"""
+Cálculos das páginas do dashboard, sem Streamlit.
+
+Cada função recebe DataFrames e parâmetros de filtro e devolve DataFrames (ou
+valores) prontos para desenhar; as páginas em `pages/` só leem os widgets e
+desenham. Assim os cálculos podem ser guardados em cache, medidos
+(`benchmarks/run.py`) e usados fora do dashboard:
+
+- `analytics.sensores`: visão geral da cidade (`pages/sensores/Geral.py`);
+- `analytics.saude`: internações do SUS (`pages/sus/Dados_Saude.py`);
+- `analytics.poluentes_doencas`: poluentes x internações (`pages/poluentes_doencas/Poluentes_Doencas.py`).
+"""
@@ -0,0 +1,127 @@
+"""
+Correlação defasada entre as medições diárias dos sensores e as internações.
+
+O efeito da poluição nas internações aparece dias depois. Para cada defasagem k
+(0 a `DEFASAGEM_MAXIMA` dias) a correlação é entre a variável no dia t e o número de
+internações no dia t + k, por estação e na média da cidade (`CIDADE`, média das
+estações em cada dia, como no cubo de `utils/rollup.py`).
+
+Em vez de um `x.corr(y.shift(-k))` por variável, estação e defasagem, as séries vão
+para uma matriz (estação, variável, dia) e as somas da correlação de Pearson (n, Σx,
+Σy, Σx², Σy² e Σxy, só nos dias em que os dois lados têm valor) saem todas de
+correlações cruzadas por FFT, em uma única passada. O resultado é o mesmo do
+`shift().corr()` (pares completos, como no pandas).
+"""
+import numpy as np
+import pandas as pd
+from utils.rollup import CIDADE
+from analytics.juncao import chave_dia
+
+DEFASAGEM_MAXIMA = 30
+MINIMO_PARES = 10  # com menos dias em comum a correlação fica NaN
+
+
+def matriz_diaria(df_sensor, variaveis, inicio, n_dias, estacao='nome_estacao'):
+    """
+    Matriz (estação, variável, dia) a partir do dia `inicio` (chave de `analytics/juncao.py`),
+    com NaN nos dias sem medição.
+
+    A primeira linha é a cidade (média das estações com valor no dia). Retorna os
+    nomes das linhas e a matriz.
+    """
+    estacoes, codigos = np.unique(df_sensor[estacao].to_numpy(dtype=object), return_inverse=True)
+    dias = chave_dia(df_sensor['data_formatada']) - inicio
+    dentro = (dias >= 0) & (dias < n_dias)
+
+    matriz = np.full((len(estacoes) + 1, len(variaveis), n_dias), np.nan)
+    matriz[codigos[dentro] + 1, :, dias[dentro]] = df_sensor[variaveis].to_numpy(dtype='float64')[dentro]
+
+    validos = ~np.isnan(matriz[1:])
+    contagem = validos.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        matriz[0] = np.where(contagem > 0, np.nansum(matriz[1:], axis=0) / contagem, np.nan)
+    return [CIDADE] + list(estacoes), matriz
+
+
+def _cruzada(a, b, defasagem_maxima, n_fft):
+    """Σ_t a[..., t] · b[t + k] para k = 0..defasagem_maxima (b é uma série só)"""
+    from scipy import fft
+    espectro = np.conj(fft.rfft(a, n_fft, axis=-1)) * fft.rfft(b, n_fft)
+    return fft.irfft(espectro, n_fft, axis=-1)[..., :defasagem_maxima + 1]
+
+
+def correlacao_defasada(df_sensor, internacoes, variaveis, defasagem_maxima=DEFASAGEM_MAXIMA,
+                        minimo=MINIMO_PARES, estacao='nome_estacao'):
+    """
+    Correlação entre cada variável (por estação e na cidade) no dia t e `internacoes`
+    (Series indexada pela chave de dia, ver `analytics.juncao.internacoes_por_dia`) no dia t + k.
+
+    Retorna um DataFrame longo com nome_estacao, variavel, defasagem, correlacao e n
+    (dias em comum), com a cidade primeiro.
+    """
+    colunas = [estacao, 'variavel', 'defasagem', 'correlacao', 'n']
+    if df_sensor.empty or internacoes.empty:
+        return pd.DataFrame(columns=colunas)
+
+    # Calendário comum aos sensores e às internações
+    chaves = chave_dia(df_sensor['data_formatada'])
+    inicio = max(chaves.min(), internacoes.index[0])
+    fim = min(chaves.max(), internacoes.index[-1])
+    if fim < inicio:
+        return pd.DataFrame(columns=colunas)
+    n_dias = fim - inicio + 1
+
+    from scipy import fft
+    nomes, x = matriz_diaria(df_sensor, variaveis, inicio, n_dias, estacao)
+    y = internacoes.reindex(np.arange(inicio, fim + 1)).to_numpy(dtype='float64')
+
+    # Centralizar não muda a correlação e evita perder precisão em n·Σx² − (Σx)²
+    mx = ~np.isnan(x)
+    my = ~np.isnan(y)
+    x = np.where(mx, x, 0.0)
+    y = np.where(my, y, 0.0)
+    x = np.where(mx, x - x.sum(axis=-1, keepdims=True) / np.maximum(mx.sum(axis=-1, keepdims=True), 1), 0.0)
+    y = np.where(my, y - y.sum() / max(my.sum(), 1), 0.0)
+    mx = mx.astype('float64')
+    my = my.astype('float64')
+
+    n_fft = fft.next_fast_len(n_dias + defasagem_maxima, real=True)
+    n = np.rint(_cruzada(mx, my, defasagem_maxima, n_fft))
+    soma_x = _cruzada(x, my, defasagem_maxima, n_fft)
+    soma_y = _cruzada(mx, y, defasagem_maxima, n_fft)
+    soma_xx = _cruzada(x * x, my, defasagem_maxima, n_fft)
+    soma_yy = _cruzada(mx, y * y, defasagem_maxima, n_fft)
+    soma_xy = _cruzada(x, y, defasagem_maxima, n_fft)
+
+    variancia_x = n * soma_xx - soma_x ** 2
+    variancia_y = n * soma_yy - soma_y ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlacao = np.clip((n * soma_xy - soma_x * soma_y) / np.sqrt(variancia_x * variancia_y), -1, 1)
+    # Poucos dias em comum ou variância nula (só resto de arredondamento da FFT) viram NaN, como no pandas
+    constante = (variancia_x <= 1e-10 * n * soma_xx) | (variancia_y <= 1e-10 * n * soma_yy)
+    correlacao[(n < max(minimo, 2)) | constante] = np.nan
+
+    n_grupos, n_variaveis, n_defasagens = correlacao.shape
+    return pd.DataFrame({
+        estacao: np.repeat(nomes, n_variaveis * n_defasagens),
+        'variavel': np.tile(np.repeat(variaveis, n_defasagens), n_grupos),
+        'defasagem': np.tile(np.arange(n_defasagens), n_grupos * n_variaveis),
+        'correlacao': correlacao.ravel(),
+        'n': n.astype('int64').ravel(),
+    })
+
+
+def matriz_defasagens(correlacoes, nome_estacao, variaveis=None, estacao='nome_estacao'):
+    """Variáveis nas linhas e defasagens nas colunas, para uma estação (ou a cidade)"""
+    linhas = correlacoes[correlacoes[estacao] == nome_estacao]
+    matriz = linhas.pivot(index='variavel', columns='defasagem', values='correlacao')
+    return matriz.reindex(variaveis) if variaveis is not None else matriz
+
+
+def pico_por_variavel(correlacoes, nome_estacao, estacao='nome_estacao'):
+    """Para cada variável, a defasagem com a maior correlação em valor absoluto"""
+    linhas = correlacoes[(correlacoes[estacao] == nome_estacao) & correlacoes['correlacao'].notna()]
+    if linhas.empty:
+        return pd.DataFrame(columns=['variavel', 'defasagem', 'correlacao', 'n'])
+    indices = linhas['correlacao'].abs().groupby(linhas['variavel'], sort=False).idxmax()
+    return linhas.loc[indices, ['variavel', 'defasagem', 'correlacao', 'n']].reset_index(drop=True)
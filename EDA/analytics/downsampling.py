@@ -0,0 +1,97 @@
+"""
+Redução de séries longas para os gráficos, preservando a forma e os picos.
+
+- `lttb`: Largest-Triangle-Three-Buckets. Mantém o primeiro e o último ponto e, em
+  cada intervalo, o ponto que forma o maior triângulo com o ponto escolhido no
+  intervalo anterior e a média do seguinte.
+- `minmax`: o primeiro e o último ponto e, entre eles, o mínimo e o máximo de cada
+  intervalo (dois pontos por intervalo).
+
+As séries com até `pontos` valores voltam inteiras; ao aproximar um período com
+`recortar_intervalo`, a série recortada é reduzida de novo e, se couber no limite,
+aparece com todos os pontos.
+"""
+import numpy as np
+import pandas as pd
+from utils.config import DOWNSAMPLE_POINTS, DOWNSAMPLE_METHOD
+
+
+def _numerico(valores):
+    valores = np.asarray(valores)
+    if np.issubdtype(valores.dtype, np.datetime64):
+        return valores.astype('datetime64[ns]').astype('int64').astype('float64')
+    return valores.astype('float64')
+
+
+def lttb(x, y, pontos):
+    """Posições dos pontos escolhidos pelo LTTB (x em ordem crescente)"""
+    x, y = _numerico(x), _numerico(y)
+    n = len(x)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+
+    # pontos - 2 intervalos entre o primeiro e o último ponto
+    tamanho = (n - 2) / (pontos - 2)
+    bordas = np.floor(np.arange(pontos - 1) * tamanho).astype(np.int64) + 1
+    escolhidos = np.empty(pontos, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+
+    anterior = 0
+    for i in range(pontos - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        seguinte_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x, media_y = x[fim:seguinte_fim].mean(), y[fim:seguinte_fim].mean()
+        ax, ay = x[anterior], y[anterior]
+        areas = np.abs((ax - media_x) * (y[inicio:fim] - ay) - (ax - x[inicio:fim]) * (media_y - ay))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def minmax(x, y, pontos):
+    """Posições do primeiro e do último ponto e do mínimo e do máximo de cada intervalo entre eles, em ordem"""
+    y = _numerico(y)
+    n = len(y)
+    if pontos >= n or pontos < 2:
+        return np.arange(n)
+    extremos = np.array([0, n - 1])
+    intervalos = (pontos - 2) // 2
+    if intervalos == 0:
+        return extremos
+    grupos = np.repeat(np.arange(intervalos), np.diff(np.linspace(0, n - 2, intervalos + 1).astype(np.int64)))
+    serie = pd.Series(y[1:-1])
+    internos = np.concatenate([serie.groupby(grupos).idxmin().to_numpy(), serie.groupby(grupos).idxmax().to_numpy()])
+    return np.union1d(extremos, internos + 1)
+
+
+METODOS = {'lttb': lttb, 'minmax': minmax}
+
+
+def reduzir(df, x, colunas, pontos=DOWNSAMPLE_POINTS, metodo=DOWNSAMPLE_METHOD):
+    """
+    Linhas de `df` que bastam para desenhar `colunas` em função de `x` com cerca de `pontos` pontos.
+
+    `df` deve estar ordenado por `x`; com `x=None` usa a posição das linhas (eixos de
+    categorias, como 'mes_ano'). Com várias colunas, junta os pontos escolhidos para
+    cada uma, para que todas as curvas do gráfico usem as mesmas linhas. Valores
+    vazios são ignorados na escolha; séries que cabem no limite voltam inteiras.
+    """
+    colunas = [colunas] if isinstance(colunas, str) else list(colunas)
+    if len(df) <= pontos:
+        return df
+
+    eixo = np.arange(len(df)) if x is None else df[x].to_numpy()
+    escolhidos = []
+    for coluna in colunas:
+        valores = df[coluna].to_numpy(dtype='float64', na_value=np.nan)
+        validos = np.flatnonzero(~np.isnan(valores))
+        escolhidos.append(validos[METODOS[metodo](eixo[validos], valores[validos], pontos)])
+    return df.iloc[np.unique(np.concatenate(escolhidos))]
+
+
+def recortar_intervalo(df, x, inicio, fim):
+    """Linhas com inicio <= x <= fim (df ordenado por x)"""
+    valores = df[x].to_numpy()
+    inicio = np.searchsorted(valores, np.asarray(inicio, dtype=valores.dtype), side='left')
+    fim = np.searchsorted(valores, np.asarray(fim, dtype=valores.dtype), side='right')
+    return df.iloc[inicio:fim]
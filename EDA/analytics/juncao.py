@@ -0,0 +1,107 @@
+"""
+Junção dos sensores com as internações por uma chave inteira de dia.
+
+A chave é o número de dias desde 1970-01-01 (`chave_dia`). Os dois lados viram
+séries indexadas por ela e são alinhados pelo índice (`reindex`), sem `pd.merge`:
+as internações de cada dia são contadas uma vez e buscadas pela chave, em vez de
+o merge diário × mensal em ['ano', 'mes'] repetir a contagem do mês em todas as
+linhas de todas as estações (o que distorce as correlações).
+
+O calendário da junção é o intervalo de dias comum aos dois lados, sem buracos
+(dias sem medição ficam com NaN nas variáveis e dias sem internação com zero).
+Com `defasagens`, cada k > 0 acrescenta `num_internacoes_k`, as internações do
+dia t + k. O agregado mensal (`agregar_mensal`) sai da própria junção diária.
+"""
+import numpy as np
+import pandas as pd
+
+DIA = 'dia'
+INTERNACOES = 'num_internacoes'
+
+
+def chave_dia(datas):
+    """Dias desde 1970-01-01 (int64) de datas, textos de data ou datetime64"""
+    datas = pd.to_datetime(pd.Series(datas) if not isinstance(datas, pd.Series) else datas)
+    return datas.to_numpy(dtype='datetime64[D]').astype('int64')
+
+
+def data_da_chave(chaves):
+    """Inverso de `chave_dia`"""
+    return pd.DatetimeIndex(np.asarray(chaves, dtype='int64').astype('datetime64[D]'))
+
+
+def _datas_internacao(df_sus):
+    # O loader já traz `data_formatada`; os CSVs brutos (dashboard.py) só têm DT_INTER (AAAAMMDD)
+    if 'data_formatada' in df_sus.columns:
+        return df_sus['data_formatada']
+    return pd.to_datetime(df_sus['DT_INTER'].astype(str), format='%Y%m%d')
+
+
+def coluna_defasada(k):
+    return INTERNACOES if k == 0 else f'{INTERNACOES}_{k}'
+
+
+def internacoes_por_dia(df_sus):
+    """Internações por dia de internação (índice `dia`, contíguo, zero nos dias sem nenhuma)"""
+    if df_sus.empty:
+        return pd.Series(dtype='int64', name=INTERNACOES, index=pd.Index([], dtype='int64', name=DIA))
+    chaves = chave_dia(_datas_internacao(df_sus))
+    inicio = chaves.min()
+    contagem = np.bincount(chaves - inicio)
+    return pd.Series(contagem, name=INTERNACOES,
+                     index=pd.RangeIndex(inicio, inicio + len(contagem), name=DIA))
+
+
+def sensores_por_dia(df_sensor, variaveis, por_estacao=False, estacao='nome_estacao'):
+    """
+    Média diária das variáveis, na cidade (média das estações; índice `dia`) ou por
+    estação (índice (estação, `dia`)). Só os dias com alguma linha de medição.
+    """
+    chaves = pd.Series(chave_dia(df_sensor['data_formatada']), index=df_sensor.index, name=DIA)
+    por = [df_sensor[estacao], chaves] if por_estacao else chaves
+    return df_sensor[variaveis].groupby(por).mean()
+
+
+def juntar_diario(df_sensor, df_sus, variaveis, defasagens=(0,), por_estacao=False, estacao='nome_estacao'):
+    """
+    Variáveis dos sensores e internações do mesmo dia (e de t + k para cada k de
+    `defasagens`), no calendário comum aos dois lados.
+
+    Índice `dia` (ou (estação, `dia`) com `por_estacao`); colunas `variaveis`,
+    `num_internacoes` e `num_internacoes_k`. NaN nas internações de t + k que caem
+    depois do último dia com dados do SUS.
+    """
+    sensores = sensores_por_dia(df_sensor, variaveis, por_estacao, estacao)
+    internacoes = internacoes_por_dia(df_sus)
+    dias_sensores = sensores.index.get_level_values(DIA)
+    if sensores.empty or internacoes.empty:
+        return sensores.iloc[:0].assign(**{coluna_defasada(k): pd.Series(dtype='float64') for k in defasagens})
+
+    inicio = max(dias_sensores.min(), internacoes.index[0])
+    fim = min(dias_sensores.max(), internacoes.index[-1])
+    calendario = pd.RangeIndex(inicio, max(inicio, fim + 1), name=DIA)
+    if por_estacao:
+        estacoes = sensores.index.get_level_values(estacao).unique()
+        calendario = pd.MultiIndex.from_product([estacoes, calendario], names=[estacao, DIA])
+    juncao = sensores.reindex(calendario)
+
+    dias = juncao.index.get_level_values(DIA).to_numpy()
+    for k in defasagens:
+        juncao[coluna_defasada(k)] = internacoes.reindex(dias + k).to_numpy(dtype='float64')
+    return juncao
+
+
+def agregar_mensal(juncao):
+    """Agregado mensal da junção diária: média das variáveis e soma das internações (colunas ano e mes)"""
+    datas = data_da_chave(juncao.index.get_level_values(DIA))
+    niveis = [nome for nome in juncao.index.names if nome != DIA]
+    por = [juncao.index.get_level_values(nome) for nome in niveis] + [
+        pd.Index(datas.year, name='ano'), pd.Index(datas.month, name='mes')]
+
+    internacoes = [col for col in juncao.columns if col == INTERNACOES or col.startswith(INTERNACOES + '_')]
+    agregacao = {col: ('sum' if col in internacoes else 'mean') for col in juncao.columns}
+    mensal = juncao.groupby(por).agg(agregacao)
+    # Meses com alguma defasagem além do fim dos dados somam só parte dos dias
+    incompletos = juncao[internacoes].isna().groupby(por).any()
+    mensal[internacoes] = mensal[internacoes].mask(incompletos)
+    return mensal.reset_index()
@@ -0,0 +1,84 @@
+"""
+Cálculos da relação entre poluentes e internações (`pages/poluentes_doencas/Poluentes_Doencas.py`).
+
+As duas fontes são mensais: médias dos sensores (com as colunas padronizadas de
+`load_sensor_boxcox_data`) e o número de internações de `load_sus_data`.
+"""
+import numpy as np
+import pandas as pd
+
+VARIAVEIS_CORRELACAO = ['pm2_5', 'pm10', 'co', 'o3', 'no', 'no2', 'nox', 'so2', 'chuva', 'temp', 'ur', 'num_internacoes']
+
+NOMES_CORRELACAO = {
+    'pm2_5': 'PM2.5',
+    'pm10': 'PM10',
+    'co': 'CO',
+    'o3': 'Ozônio',
+    'no': 'NO',
+    'no2': 'NO₂',
+    'nox': 'NOx',
+    'so2': 'SO₂',
+    'chuva': 'Chuva',
+    'temp': 'Temperatura',
+    'ur': 'Umidade',
+    'num_internacoes': 'Internações'
+}
+
+
+def juntar_mensal(df_sensor_boxcox, df_sus_aggregated):
+    """Médias mensais dos sensores e internações do mesmo mês"""
+    return pd.merge(df_sensor_boxcox, df_sus_aggregated, on=['ano', 'mes'], how='inner')
+
+
+def matriz_correlacao(df_merged, variaveis=VARIAVEIS_CORRELACAO, nomes=NOMES_CORRELACAO):
+    """Correlação entre as variáveis, com nomes amigáveis nas linhas e colunas"""
+    return df_merged[variaveis].corr().rename(columns=nomes, index=nomes)
+
+
+def regressao_linear(df_merged, variavel, alvo='num_internacoes', confianca=0.95):
+    """
+    Regressão linear de `alvo` em função de `variavel`, ignorando os meses sem a variável.
+
+    Retorna um dicionário com x, y e os valores previstos (Series), R², coeficiente,
+    intercepto, correlação e `linha`: a reta em ordem de x com o intervalo de
+    confiança da média prevista (ic_inferior, ic_superior; vazio com menos de 3 meses).
+    Retorna None se não houver meses com a variável.
+    """
+    from scipy import stats
+    from sklearn.linear_model import LinearRegression
+    X = df_merged[[variavel]].dropna()
+    y = df_merged.loc[X.index, alvo]
+    if X.empty:
+        return None
+
+    reg = LinearRegression().fit(X, y)
+    previsto = pd.Series(reg.predict(X), index=X.index)
+
+    linha = pd.DataFrame({'x': X[variavel], 'previsto': previsto}).sort_values('x')
+    n = len(X)
+    if n > 2:
+        x = X[variavel].to_numpy(dtype='float64')
+        residuo = np.sqrt(((y.to_numpy(dtype='float64') - previsto.to_numpy()) ** 2).sum() / (n - 2))
+        soma_quadrados = ((x - x.mean()) ** 2).sum()
+        erro = residuo * np.sqrt(1 / n + (linha['x'].to_numpy() - x.mean()) ** 2 / soma_quadrados)
+        margem = stats.t.ppf((1 + confianca) / 2, n - 2) * erro
+        linha['ic_inferior'] = linha['previsto'] - margem
+        linha['ic_superior'] = linha['previsto'] + margem
+    else:
+        linha['ic_inferior'] = linha['ic_superior'] = np.nan
+
+    return {
+        'x': X[variavel],
+        'y': y,
+        'previsto': previsto,
+        'r2': reg.score(X, y),
+        'coeficiente': reg.coef_[0],
+        'intercepto': reg.intercept_,
+        'correlacao': X[variavel].corr(y),
+        'linha': linha,
+    }
+
+
+def medias(df_merged, colunas):
+    """Média de cada coluna no período todo"""
+    return df_merged[list(colunas)].mean()
@@ -0,0 +1,87 @@
+"""
+Cálculos das internações por doenças respiratórias (`pages/sus/Dados_Saude.py`).
+
+A faixa etária e a descrição do sexo são colunas categóricas criadas uma vez pelo
+loader (`adicionar_dimensoes`), e as tabelas das abas saem prontas de `contagens`,
+também calculada no loader: a página não reagrupa as internações a cada rerun.
+"""
+import pandas as pd
+
+FAIXAS_ETARIAS = [0, 5, 12, 18, 30, 50, 65, 100]
+ROTULOS_FAIXAS = ['0-5', '6-12', '13-18', '19-30', '31-50', '51-65', '66+']
+SEXO_DESCRICAO = {1: 'Masculino', 3: 'Feminino'}
+
+
+def adicionar_dimensoes(df_sus):
+    """Faixa etária e descrição do sexo como colunas categóricas (no próprio DataFrame)"""
+    df_sus['faixa_etaria'] = pd.cut(df_sus['IDADE'], bins=FAIXAS_ETARIAS, labels=ROTULOS_FAIXAS, right=False)
+    df_sus['sexo_desc'] = df_sus['SEXO'].map(SEXO_DESCRICAO).astype(pd.CategoricalDtype(list(SEXO_DESCRICAO.values())))
+    return df_sus
+
+
+def indicadores(df_sus):
+    """Total de internações, média de idade, taxa de mortalidade (%) e média de permanência"""
+    total = df_sus.shape[0]
+    return {
+        'total_internacoes': total,
+        'media_idade': df_sus['IDADE'].mean(),
+        'taxa_mortalidade': df_sus['MORTE'].mean() * 100 if total > 0 else 0,
+        'media_permanencia': df_sus['DIAS_PERM'].mean(),
+    }
+
+
+# observed=True: só as categorias presentes (sem linhas com contagem zero)
+def internacoes_por_faixa_etaria(df_sus):
+    return df_sus.groupby('faixa_etaria', observed=True).size().reset_index(name='count')
+
+
+def internacoes_por_sexo(df_sus):
+    return df_sus.groupby('sexo_desc', observed=True).size().reset_index(name='count')
+
+
+def internacoes_por_diagnostico(df_sus):
+    """Internações e óbitos por diagnóstico principal, em ordem de código"""
+    por_diagnostico = df_sus.groupby('DIAG_PRINC', observed=True)['MORTE'].agg(total_internacoes='size', obitos='sum')
+    por_diagnostico.index = por_diagnostico.index.astype(str)
+    return por_diagnostico.rename_axis('diagnostico').sort_index().reset_index()
+
+
+def top_diagnosticos(diagnosticos, n=10):
+    """Diagnósticos principais mais frequentes, da tabela de `internacoes_por_diagnostico`"""
+    top_diag = diagnosticos.sort_values('total_internacoes', ascending=False, kind='stable').head(n)
+    return top_diag[['diagnostico', 'total_internacoes']].rename(columns={'total_internacoes': 'count'}).reset_index(drop=True)
+
+
+def mortalidade_mensal(df_sus):
+    """Internações, óbitos e taxa de mortalidade (%) por mês de competência"""
+    df_mortalidade = df_sus.groupby(['ANO_CMPT', 'MES_CMPT']).agg(
+        total_internacoes=('MORTE', 'size'),
+        total_obitos=('MORTE', 'sum')
+    ).reset_index()
+
+    df_mortalidade['taxa_mortalidade'] = (df_mortalidade['total_obitos'] / df_mortalidade['total_internacoes']) * 100
+    df_mortalidade['mes_ano'] = df_mortalidade['ANO_CMPT'].astype(str) + '-' + df_mortalidade['MES_CMPT'].astype(str)
+    return df_mortalidade
+
+
+def top_causas_morte(diagnosticos, n=10):
+    """
+    Diagnósticos com mais óbitos, com o total de internações e a taxa de mortalidade (%),
+    da tabela de `internacoes_por_diagnostico`; vazio sem óbitos
+    """
+    com_obitos = diagnosticos[diagnosticos['obitos'] > 0].sort_values('obitos', ascending=False, kind='stable')
+    df_mortalidade_diag = com_obitos.head(n)[['diagnostico', 'obitos', 'total_internacoes']].reset_index(drop=True)
+    df_mortalidade_diag['taxa_mortalidade'] = (df_mortalidade_diag['obitos'] / df_mortalidade_diag['total_internacoes']) * 100
+    return df_mortalidade_diag.sort_values('obitos', ascending=True, kind='stable')
+
+
+def contagens(df_sus):
+    """Tabelas das abas: indicadores, internações por faixa etária, por sexo, por diagnóstico e mortalidade mensal"""
+    return {
+        'indicadores': indicadores(df_sus),
+        'faixa_etaria': internacoes_por_faixa_etaria(df_sus),
+        'sexo': internacoes_por_sexo(df_sus),
+        'diagnosticos': internacoes_por_diagnostico(df_sus),
+        'mortalidade': mortalidade_mensal(df_sus),
+    }
+
@@ -0,0 +1,92 @@
+"""
+Filtros interativos da página de saúde (`pages/sus/Dados_Saude.py`) sobre o índice de bitmaps.
+
+O índice (`utils/bitmap_index.py`) é construído uma vez pelo loader sobre as colunas de
+baixa cardinalidade das internações: ano e mês de competência, sexo, faixa etária,
+capítulo da CID-10 do diagnóstico principal e óbito. Como em `analytics/saude_sql.py`,
+o DataFrame filtrado vira uma consulta: um dicionário com as internações, o índice e o
+bitmap das linhas selecionadas, que `filtrar` estreita com E bit a bit. Os indicadores
+saem do bitmap e das colunas numéricas, sem copiar as linhas.
+"""
+import bisect
+import numpy as np
+import pandas as pd
+from utils import bitmap_index
+
+# Capítulos da CID-10: (primeiro código, número do capítulo), em ordem de código
+CAPITULOS_CID = [
+    ('A00', 'I'), ('C00', 'II'), ('D50', 'III'), ('E00', 'IV'), ('F00', 'V'), ('G00', 'VI'), ('H00', 'VII'),
+    ('H60', 'VIII'), ('I00', 'IX'), ('J00', 'X'), ('K00', 'XI'), ('L00', 'XII'), ('M00', 'XIII'), ('N00', 'XIV'),
+    ('O00', 'XV'), ('P00', 'XVI'), ('Q00', 'XVII'), ('R00', 'XVIII'), ('S00', 'XIX'), ('U00', 'XXII'),
+    ('V01', 'XX'), ('Z00', 'XXI'),
+]
+_INICIOS = [inicio for inicio, _ in CAPITULOS_CID]
+
+# Colunas da consulta -> colunas do índice
+DIMENSOES = {'ano': 'ANO_CMPT', 'mes': 'MES_CMPT', 'sexo': 'SEXO', 'faixa_etaria': 'faixa_etaria',
+             'capitulo': 'capitulo_cid', 'morte': 'MORTE'}
+
+
+def capitulo(cid):
+    """Capítulo da CID-10 de um código (None se não começar por letra e dois dígitos)"""
+    cid = str(cid).strip().upper()[:3]
+    if len(cid) < 3 or not cid[0].isalpha() or not cid[1:].isdigit():
+        return None
+    posicao = bisect.bisect_right(_INICIOS, cid) - 1
+    return CAPITULOS_CID[posicao][1] if posicao >= 0 else None
+
+
+def capitulos(diagnosticos):
+    """Capítulo da CID-10 de cada diagnóstico (calculado uma vez por código distinto)"""
+    codigos, valores = pd.factorize(diagnosticos)
+    por_codigo = np.array([capitulo(valor) for valor in valores] + [None], dtype=object)
+    return pd.Series(por_codigo[codigos], index=diagnosticos.index)
+
+
+def indexar(df_sus):
+    """Índice de bitmaps das internações (com `faixa_etaria` de `analytics.saude.adicionar_dimensoes`)"""
+    colunas = {coluna: df_sus[coluna] for coluna in DIMENSOES.values() if coluna != 'capitulo_cid'}
+    colunas['capitulo_cid'] = capitulos(df_sus['DIAG_PRINC'])
+    return bitmap_index.construir(colunas)
+
+
+def consulta(df_sus, indice):
+    """Todas as internações de `df_sus`, que deve ter as mesmas linhas (e na mesma ordem) do índice"""
+    return {'df': df_sus, 'indice': indice, 'linhas': bitmap_index.todas(indice)}
+
+
+def filtrar(consulta, ano=None, mes=None, sexo=None, faixa_etaria=None, capitulo=None, morte=None):
+    """Internações com os valores pedidos de cada dimensão (valor ou lista; None = todos)"""
+    pedidos = {'ano': ano, 'mes': mes, 'sexo': sexo, 'faixa_etaria': faixa_etaria, 'capitulo': capitulo, 'morte': morte}
+    selecao = bitmap_index.selecionar(consulta['indice'], **{DIMENSOES[dim]: valor for dim, valor in pedidos.items()})
+    return {**consulta, 'linhas': np.bitwise_and(consulta['linhas'], selecao)}
+
+
+def indicadores(consulta):
+    """Total de internações, média de idade, taxa de mortalidade (%) e média de permanência"""
+    indice, linhas, df_sus = consulta['indice'], consulta['linhas'], consulta['df']
+    total = bitmap_index.contar(linhas)
+    if total == 0:
+        return {'total_internacoes': 0, 'media_idade': np.nan, 'taxa_mortalidade': 0, 'media_permanencia': np.nan}
+    obitos = bitmap_index.contar(np.bitwise_and(linhas, bitmap_index.selecionar(indice, MORTE=1)))
+    return {
+        'total_internacoes': total,
+        'media_idade': bitmap_index.somar(indice, linhas, df_sus['IDADE'].to_numpy()) / total,
+        'taxa_mortalidade': obitos / total * 100,
+        'media_permanencia': bitmap_index.somar(indice, linhas, df_sus['DIAS_PERM'].to_numpy()) / total,
+    }
+
+
+def valores_distintos(consulta, coluna):
+    """Valores de uma coluna indexada, em ordem"""
+    return bitmap_index.valores(consulta['indice'], coluna)
+
+
+def amostra(consulta, n=100):
+    return consulta['df'].iloc[bitmap_index.posicoes(consulta['indice'], consulta['linhas'], n)]
+
+
+def para_csv(consulta):
+    """CSV das internações selecionadas (as linhas só são copiadas aqui, quando o download é pedido)"""
+    linhas = bitmap_index.posicoes(consulta['indice'], consulta['linhas'])
+    return consulta['df'].iloc[linhas].to_csv(index=False).encode('utf-8')
@@ -0,0 +1,144 @@
+"""
+Cálculos das internações (`pages/sus/Dados_Saude.py`) no backend DuckDB.
+
+Mesmas funções de `analytics/saude.py`, sobre a view `sus` de `utils/duckdb_backend.py`
+em vez do DataFrame das internações. O DataFrame filtrado vira uma consulta:
+um dicionário com a conexão e a condição SQL (`onde`), que `filtrar` estreita.
+"""
+import os
+import tempfile
+import pandas as pd
+from utils.duckdb_backend import consultar, lista
+from analytics.saude import FAIXAS_ETARIAS, ROTULOS_FAIXAS, SEXO_DESCRICAO
+
+FAIXA_ETARIA = 'CASE ' + ' '.join(
+    f"WHEN IDADE >= {inicio} AND IDADE < {fim} THEN '{rotulo}'"
+    for inicio, fim, rotulo in zip(FAIXAS_ETARIAS[:-1], FAIXAS_ETARIAS[1:], ROTULOS_FAIXAS)) + ' END'
+SEXO_DESC = 'CASE SEXO ' + ' '.join(f"WHEN {codigo} THEN '{descricao}'"
+                                    for codigo, descricao in SEXO_DESCRICAO.items()) + ' END'
+
+
+def consulta(conexao, onde='TRUE'):
+    """Internações da view `sus` que satisfazem `onde`"""
+    return {'conexao': conexao, 'onde': onde}
+
+
+def filtrar(consulta, ano=None, mes=None, sexo=None):
+    """Internações do ano e mês de competência e do sexo pedidos (None = todos)"""
+    condicoes = [consulta['onde']]
+    for coluna, valor in (('ANO_CMPT', ano), ('MES_CMPT', mes), ('SEXO', sexo)):
+        if valor is not None:
+            condicoes.append(f'{coluna} IN ({lista([valor])})')
+    return {**consulta, 'onde': ' AND '.join(condicoes)}
+
+
+def indicadores(consulta):
+    """Total de internações, média de idade, taxa de mortalidade (%) e média de permanência"""
+    linha = consultar(consulta['conexao'], f"""
+        SELECT count(*) AS total, avg(IDADE) AS idade, avg(MORTE) AS morte, avg(DIAS_PERM) AS permanencia
+        FROM sus WHERE {consulta['onde']}
+    """).iloc[0]
+    total = int(linha['total'])
+    return {
+        'total_internacoes': total,
+        'media_idade': linha['idade'],
+        'taxa_mortalidade': linha['morte'] * 100 if total > 0 else 0,
+        'media_permanencia': linha['permanencia'],
+    }
+
+
+def internacoes_mensais(consulta):
+    """Internações por mês da data de internação (o `df_sus_aggregated` de `load_sus_data`)"""
+    df = consultar(consulta['conexao'], f"""
+        SELECT ano, mes, count(DT_INTER) AS num_internacoes
+        FROM sus WHERE {consulta['onde']}
+        GROUP BY ano, mes ORDER BY ano, mes
+    """)
+    df['mes_ano'] = df['ano'].astype(str) + '-' + df['mes'].astype(str)
+    return df
+
+
+def internacoes_por_faixa_etaria(consulta):
+    df = consultar(consulta['conexao'], f"""
+        SELECT {FAIXA_ETARIA} AS faixa_etaria, count(*) AS count
+        FROM sus WHERE {consulta['onde']}
+        GROUP BY 1 HAVING faixa_etaria IS NOT NULL
+    """)
+    df['faixa_etaria'] = pd.Categorical(df['faixa_etaria'], categories=ROTULOS_FAIXAS, ordered=True)
+    return df.sort_values('faixa_etaria', ignore_index=True)
+
+
+def internacoes_por_sexo(consulta):
+    return consultar(consulta['conexao'], f"""
+        SELECT {SEXO_DESC} AS sexo_desc, count(*) AS count
+        FROM sus WHERE {consulta['onde']}
+        GROUP BY 1 HAVING sexo_desc IS NOT NULL ORDER BY min(SEXO)
+    """)
+
+
+def internacoes_por_diagnostico(consulta):
+    """Internações e óbitos por diagnóstico principal, em ordem de código"""
+    return consultar(consulta['conexao'], f"""
+        SELECT DIAG_PRINC AS diagnostico, count(*) AS total_internacoes, CAST(sum(MORTE) AS BIGINT) AS obitos
+        FROM sus WHERE {consulta['onde']} AND DIAG_PRINC IS NOT NULL
+        GROUP BY 1 ORDER BY 1
+    """)
+
+
+def mortalidade_mensal(consulta):
+    """Internações, óbitos e taxa de mortalidade (%) por mês de competência"""
+    df_mortalidade = consultar(consulta['conexao'], f"""
+        SELECT ANO_CMPT, MES_CMPT, count(*) AS total_internacoes, CAST(sum(MORTE) AS BIGINT) AS total_obitos
+        FROM sus WHERE {consulta['onde']}
+        GROUP BY ANO_CMPT, MES_CMPT ORDER BY ANO_CMPT, MES_CMPT
+    """)
+    df_mortalidade['taxa_mortalidade'] = (df_mortalidade['total_obitos'] / df_mortalidade['total_internacoes']) * 100
+    df_mortalidade['mes_ano'] = df_mortalidade['ANO_CMPT'].astype(str) + '-' + df_mortalidade['MES_CMPT'].astype(str)
+    return df_mortalidade
+
+
+def contagens(consulta):
+    """Tabelas das abas, como `analytics.saude.contagens` (os top 10 saem da tabela de diagnósticos)"""
+    return {
+        'indicadores': indicadores(consulta),
+        'faixa_etaria': internacoes_por_faixa_etaria(consulta),
+        'sexo': internacoes_por_sexo(consulta),
+        'diagnosticos': internacoes_por_diagnostico(consulta),
+        'mortalidade': mortalidade_mensal(consulta),
+    }
+
+
+def valores_distintos(consulta, coluna):
+    """Valores de uma coluna (ANO_CMPT, MES_CMPT ou SEXO), em ordem"""
+    if coluna not in ('ANO_CMPT', 'MES_CMPT', 'SEXO'):
+        raise ValueError(f"Coluna desconhecida: {coluna!r}")
+    df = consultar(consulta['conexao'], f"""
+        SELECT DISTINCT {coluna} FROM sus WHERE {consulta['onde']} AND {coluna} IS NOT NULL ORDER BY 1
+    """)
+    return [int(valor) for valor in df[coluna]]
+
+
+def _com_dimensoes(consulta, limite=None):
+    return f"""
+        SELECT *, {FAIXA_ETARIA} AS faixa_etaria, {SEXO_DESC} AS sexo_desc
+        FROM sus WHERE {consulta['onde']}
+        ORDER BY DT_INTER {f'LIMIT {int(limite)}' if limite is not None else ''}
+    """
+
+
+def amostra(consulta, n=100):
+    """Primeiras `n` internações (por data de internação), com a faixa etária e a descrição do sexo"""
+    return consultar(consulta['conexao'], _com_dimensoes(consulta, n))
+
+
+def para_csv(consulta):
+    """CSV das internações da consulta (o DuckDB escreve em blocos, sem montar o DataFrame)"""
+    descritor, caminho = tempfile.mkstemp(suffix='.csv')
+    os.close(descritor)
+    try:
+        with consulta['conexao'].cursor() as cursor:
+            cursor.execute(f"COPY ({_com_dimensoes(consulta)}) TO '{caminho}' (HEADER, DELIMITER ',')")
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    finally:
+        os.remove(caminho)
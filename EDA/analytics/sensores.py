@@ -0,0 +1,97 @@
+"""
+Cálculos da visão geral da cidade (`pages/sensores/Geral.py`).
+
+As agregações por período vêm do cubo de `utils/rollup.py`; só a correlação e o
+detalhamento de um dia usam as linhas diárias de `load_sensor_data`. As médias
+móveis vêm dos máximos diários de `load_sensor_windows`.
+"""
+import pandas as pd
+from utils.rollup import resumo_por_estacao, resumo_cidade, serie_diaria_cidade
+from utils.stations import load_station_registry
+from utils.time_index import slice_date, slice_period
+
+METEOROLOGICAS = ['temp', 'ur', 'chuva']
+
+COLUNAS_ESTATISTICAS = {
+    'count': 'Contagem', 'mean': 'Média', 'std': 'Desvio Padrão', 'min': 'Mínimo',
+    '25%': '25%', '50%': 'Mediana', '75%': '75%', 'max': 'Máximo'
+}
+
+
+def filtrar_periodo(df_sensor, anos, meses=None, variaveis=()):
+    """Linhas dos anos e meses pedidos, com as variáveis convertidas para numérico"""
+    df_filtered = slice_period(df_sensor, anos, meses).copy()
+    for var in variaveis:
+        if var in df_filtered.columns:
+            df_filtered[var] = pd.to_numeric(df_filtered[var], errors='coerce')
+    return df_filtered
+
+
+def dados_do_dia(df_sensor, data, anos, meses=None):
+    """Linhas de uma data, vazio se a data estiver fora do período selecionado"""
+    data = pd.to_datetime(data)
+    no_periodo = data.year in anos and (not meses or data.month in meses)
+    return slice_date(df_sensor, data) if no_periodo else df_sensor.iloc[:0]
+
+
+def estatisticas_do_dia(df_station_day, poluentes, traducao):
+    """Estatísticas descritivas de cada poluente (uma linha por poluente)"""
+    stats_list = []
+    for poluente in poluentes:
+        stats = df_station_day[poluente].describe().to_dict()
+        stats['Poluente'] = traducao[poluente]
+        stats_list.append(stats)
+
+    df_stats = pd.DataFrame(stats_list)
+    df_stats = df_stats[['Poluente'] + list(COLUNAS_ESTATISTICAS)]
+    df_stats.columns = ['Poluente'] + list(COLUNAS_ESTATISTICAS.values())
+    return df_stats
+
+
+def media_por_estacao(rollup, anos, meses, poluente, registry=None):
+    """Média do poluente por estação no período, com latitude e longitude do cadastro"""
+    coords = (registry if registry is not None else load_station_registry())[['latitude', 'longitude']]
+    medias = resumo_por_estacao(rollup, anos, meses)[poluente, 'mean'].rename(poluente)
+    df_map = coords.join(medias, how='inner').dropna(subset=['latitude', 'longitude'])
+    return df_map.rename_axis('nome_estacao').reset_index()
+
+
+def serie_temporal(rollup, anos, meses, poluentes):
+    """Média diária entre as estações, com a data em datetime64"""
+    df_ts = serie_diaria_cidade(rollup, anos, meses, poluentes).reset_index()
+    df_ts['data_formatada'] = pd.to_datetime(df_ts['data_formatada'])
+    return df_ts
+
+
+def comparacao_estacoes(rollup, anos, meses, poluente):
+    """Média, máximo e mínimo do poluente por estação, da maior para a menor média"""
+    df_estacoes = resumo_por_estacao(rollup, anos, meses)[poluente][['mean', 'max', 'min']].reset_index()
+    return df_estacoes.sort_values('mean', ascending=False)
+
+
+def maximos_medias_moveis(df_janelas, anos, meses, poluente, janela):
+    """Maior média móvel do dia (`janela` '1h', '8h' ou '24h') de cada estação no período: datas × estações"""
+    df = slice_period(df_janelas, anos, meses)
+    return df.pivot(index='data_formatada', columns='nome_estacao', values=f'{poluente}_{janela}_max')
+
+
+def matriz_correlacao(df_filtered, poluentes):
+    """Correlação entre as variáveis meteorológicas e os poluentes (sem repetir colunas)"""
+    variaveis_corr = list(dict.fromkeys(METEOROLOGICAS + list(poluentes)))
+    return df_filtered[variaveis_corr].corr()
+
+
+def resumo_periodo(rollup, anos, meses, poluentes):
+    """Valor de cada poluente no período (acumulado para chuva, média para os demais) e número de dias"""
+    resumo = resumo_cidade(rollup, anos, meses)
+    valores = {poluente: resumo[poluente, 'sum' if poluente == 'chuva' else 'mean'] for poluente in poluentes}
+    return valores, int(resumo['n_dias', ''])
+
+
+def descrever_periodo(anos, meses, month_names):
+    """Texto do período selecionado"""
+    if meses:
+        if len(meses) == len(month_names):
+            return f"Todos os meses de {', '.join(map(str, anos))}"
+        return f"{', '.join([month_names[m] for m in meses])} de {', '.join(map(str, anos))}"
+    return f"Ano(s) {', '.join(map(str, anos))}"
@@ -0,0 +1,140 @@
+"""
+Cálculos da visão geral da cidade (`pages/sensores/Geral.py`) no backend DuckDB.
+
+Mesmos resultados de `analytics/sensores.py` (e do cubo de `utils/rollup.py`), com a
+conexão de `utils/duckdb_backend.py` no lugar do cubo e do DataFrame diário: cada
+função pede só as colunas e o período que usa e recebe o resultado já agregado.
+"""
+import pandas as pd
+from utils.duckdb_backend import consultar, coluna, filtro_periodo, lista
+from utils.rolling_windows import JANELAS, MINIMO_HORAS
+from utils.stations import load_station_registry
+from analytics.sensores import METEOROLOGICAS
+
+
+def estacoes(conexao):
+    return consultar(conexao, "SELECT DISTINCT nome_estacao FROM sensores ORDER BY 1")['nome_estacao'].tolist()
+
+
+def anos_disponiveis(conexao):
+    return [int(ano) for ano in consultar(conexao, "SELECT DISTINCT ano FROM sensores ORDER BY 1")['ano']]
+
+
+def limites_datas(conexao):
+    """Primeira e última data com medição"""
+    limites = consultar(conexao, "SELECT min(data_formatada) AS inicio, max(data_formatada) AS fim FROM sensores")
+    if limites['inicio'].isna().iloc[0]:
+        return None, None
+    return pd.Timestamp(limites['inicio'].iloc[0]), pd.Timestamp(limites['fim'].iloc[0])
+
+
+def dados_do_dia(conexao, data, anos, meses=None):
+    """Médias do dia de cada estação, vazio se a data estiver fora do período selecionado"""
+    data = pd.to_datetime(data)
+    no_periodo = data.year in anos and (not meses or data.month in meses)
+    df = consultar(conexao, f"""
+        SELECT * FROM sensores_diarios
+        WHERE ano = {int(data.year)} AND data_formatada = ? AND {'TRUE' if no_periodo else 'FALSE'}
+        ORDER BY nome_estacao
+    """, [data.date()])
+    df['data_formatada'] = pd.to_datetime(df['data_formatada'])
+    return df
+
+
+def _por_estacao(conexao, anos, meses, poluente):
+    var = coluna(poluente)
+    return consultar(conexao, f"""
+        SELECT nome_estacao, avg({var}) AS mean, max({var}) AS max, min({var}) AS min
+        FROM sensores_diarios
+        WHERE {filtro_periodo(anos, meses)}
+        GROUP BY nome_estacao
+        ORDER BY nome_estacao
+    """)
+
+
+def media_por_estacao(conexao, anos, meses, poluente, registry=None):
+    """Média do poluente por estação no período, com latitude e longitude do cadastro"""
+    coords = (registry if registry is not None else load_station_registry())[['latitude', 'longitude']]
+    medias = _por_estacao(conexao, anos, meses, poluente).set_index('nome_estacao')['mean'].rename(poluente)
+    df_map = coords.join(medias, how='inner').dropna(subset=['latitude', 'longitude'])
+    return df_map.rename_axis('nome_estacao').reset_index()
+
+
+def serie_temporal(conexao, anos, meses, poluentes):
+    """Média diária entre as estações, com a data em datetime64"""
+    medias = ', '.join(f'avg({coluna(var)}) AS {var}' for var in poluentes)
+    df_ts = consultar(conexao, f"""
+        SELECT data_formatada, {medias}
+        FROM sensores_diarios
+        WHERE {filtro_periodo(anos, meses)}
+        GROUP BY data_formatada
+        ORDER BY data_formatada
+    """)
+    df_ts['data_formatada'] = pd.to_datetime(df_ts['data_formatada'])
+    return df_ts
+
+
+def comparacao_estacoes(conexao, anos, meses, poluente):
+    """Média, máximo e mínimo do poluente por estação, da maior para a menor média"""
+    return _por_estacao(conexao, anos, meses, poluente).sort_values('mean', ascending=False)
+
+
+def resumo_periodo(conexao, anos, meses, poluentes):
+    """Valor de cada poluente no período (acumulado para chuva, média para os demais) e número de dias"""
+    valores = ', '.join(f"coalesce(sum({coluna(var)}), 0) AS {var}" if var == 'chuva' else f'avg({coluna(var)}) AS {var}'
+                        for var in poluentes)
+    resumo = consultar(conexao, f"""
+        SELECT {valores + ', ' if valores else ''}count(DISTINCT data_formatada) AS n_dias
+        FROM sensores_diarios
+        WHERE {filtro_periodo(anos, meses)}
+    """).iloc[0]
+    return {var: resumo[var] for var in poluentes}, int(resumo['n_dias'])
+
+
+def matriz_correlacao(conexao, anos, meses, poluentes):
+    """Correlação entre as variáveis meteorológicas e os poluentes nas médias diárias do período (pares completos)"""
+    variaveis = [coluna(var) for var in dict.fromkeys(METEOROLOGICAS + list(poluentes))]
+    pares = [(a, b) for i, a in enumerate(variaveis) for b in variaveis[i:]]
+    correlacoes = consultar(conexao, f"""
+        SELECT {', '.join(f'corr({a}, {b}) AS "{a}|{b}"' for a, b in pares)}
+        FROM sensores_diarios
+        WHERE {filtro_periodo(anos, meses)}
+    """).iloc[0]
+    matriz = pd.DataFrame(index=variaveis, columns=variaveis, dtype='float64')
+    for a, b in pares:
+        matriz.loc[a, b] = matriz.loc[b, a] = correlacoes[f'{a}|{b}']
+    return matriz
+
+
+def maximos_medias_moveis(conexao, anos, meses, poluente, janela):
+    """
+    Maior média móvel do dia (`janela` '1h', '8h' ou '24h') de cada estação no período:
+    datas × estações. Mesma regra de `utils/rolling_windows.py`: janela (fim − h, fim]
+    da mesma estação, com pelo menos `MINIMO_HORAS` horas válidas.
+    """
+    var = coluna(poluente)
+    horas = JANELAS[janela]
+    minimo = MINIMO_HORAS.get(janela, horas)
+    # As janelas do primeiro dia de cada ano começam no ano anterior
+    anos_lidos = sorted({int(ano) for ano in anos} | {int(ano) - 1 for ano in anos})
+    maximos = consultar(conexao, f"""
+        WITH medias AS (
+            SELECT nome_estacao, hora,
+                   avg(valor) OVER janela AS media,
+                   count(valor) OVER janela AS validas
+            FROM (
+                SELECT nome_estacao, date_trunc('hour', data) AS hora, {var} AS valor
+                FROM sensores
+                WHERE ano IN ({lista(anos_lidos) or 'NULL'})
+            )
+            WINDOW janela AS (PARTITION BY nome_estacao ORDER BY hora
+                              RANGE BETWEEN INTERVAL {horas - 1} HOUR PRECEDING AND CURRENT ROW)
+        )
+        SELECT nome_estacao, CAST(hora AS DATE) AS data_formatada,
+               max(CASE WHEN validas >= {int(minimo)} THEN media END) AS maximo
+        FROM medias
+        WHERE {filtro_periodo(anos, meses, ano='year(hora)', mes='month(hora)')}
+        GROUP BY 1, 2
+    """)
+    maximos['data_formatada'] = pd.to_datetime(maximos['data_formatada'])
+    return maximos.pivot(index='data_formatada', columns='nome_estacao', values='maximo')
@@ -0,0 +1,10 @@
+"""
+Benchmarks dos loaders, dos agregados e das páginas do dashboard.
+
+Execução (a partir da raiz do repositório, com os dados em `data/`):
+
+    PYTHONPATH=EDA python -m benchmarks.run
+    PYTHONPATH=EDA python -m benchmarks.compare benchmarks/antes.json benchmarks/depois.json
+
+Ver `benchmarks/run.py` para as opções (escalas, armazenamento Parquet, arquivo de saída).
+"""
@@ -0,0 +1,29 @@
+"""
+Compara dois resultados de `benchmarks.run` etapa a etapa.
+
+    PYTHONPATH=EDA python -m benchmarks.compare antes.json depois.json
+"""
+import json
+import sys
+import pandas as pd
+
+
+def carregar(path):
+    with open(path, encoding='utf-8') as arquivo:
+        relatorio = json.load(arquivo)
+    return relatorio, pd.DataFrame(relatorio['resultados']).set_index(['etapa', 'escala'])
+
+
+def comparar(antes, depois):
+    tabela = antes[['segundos', 'pico_mb']].join(depois[['segundos', 'pico_mb']], lsuffix='_antes',
+                                                   rsuffix='_depois', how='outer')
+    tabela['tempo_x'] = (tabela['segundos_antes'] / tabela['segundos_depois']).round(2)
+    tabela['memoria_x'] = (tabela['pico_mb_antes'] / tabela['pico_mb_depois']).round(2)
+    return tabela
+
+
+if __name__ == '__main__':
+    relatorio_antes, antes = carregar(sys.argv[1])
+    relatorio_depois, depois = carregar(sys.argv[2])
+    print(f"{relatorio_antes['commit']} -> {relatorio_depois['commit']} (x > 1: mais rápido / menos memória)")
+    print(comparar(antes, depois).to_string())
@@ -0,0 +1,63 @@
+"""
+Cópias ampliadas dos dados do repositório para os benchmarks.
+
+Os arquivos são gravados em uma pasta temporária com o mesmo layout relativo de
+`data/` (os loaders usam caminhos relativos à raiz do repositório). Na escala N:
+
+- cada CSV de estação recebe N cópias das medições, como N estações diferentes
+  (`ESTAÇÃO BANGU`, `ESTAÇÃO BANGU #2`, ...), também acrescentadas ao cadastro;
+- cada CSV anual do SUS e o CSV Box-Cox recebem N cópias das linhas.
+
+As cópias são feitas sobre o texto dos CSVs, sem passar pelo pandas.
+"""
+import os
+import pandas as pd
+from utils.config import SENSOR_CSV_PATHS, SUS_CSV_PATHS, SENSOR_STATIONS_PATH, SENSOR_BOXCOX_PATH
+
+
+def _nome_copia(nome, copia):
+    return nome if copia == 0 else f'{nome} #{copia + 1}'
+
+
+def _ler(origem, encoding='utf-8'):
+    with open(origem, encoding=encoding, newline='') as arquivo:
+        cabecalho = arquivo.readline()
+        return cabecalho, arquivo.read()
+
+
+def _gravar(destino, cabecalho, corpos, encoding='utf-8'):
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with open(destino, 'w', encoding=encoding, newline='') as arquivo:
+        arquivo.write(cabecalho)
+        for corpo in corpos:
+            if corpo and not corpo.endswith('\n'):
+                corpo += '\n'
+            arquivo.write(corpo)
+
+
+def _renomear(corpo, nomes, copia):
+    for nome in nomes:
+        corpo = corpo.replace(nome, _nome_copia(nome, copia))
+    return corpo
+
+
+def _replicar_linhas(origem, destino, escala):
+    cabecalho, corpo = _ler(origem)
+    _gravar(destino, cabecalho, [corpo] * escala)
+
+
+def _replicar_com_nomes(origem, destino, escala, coluna, encoding='utf-8'):
+    cabecalho, corpo = _ler(origem, encoding)
+    nomes = pd.read_csv(origem, sep=',', usecols=[coluna], encoding=encoding)[coluna].dropna().unique()
+    _gravar(destino, cabecalho, (_renomear(corpo, nomes, copia) for copia in range(escala)), encoding)
+
+
+def preparar_dados(origem, destino, escala):
+    """Grava em `destino` os dados de `origem` (raiz do repositório) multiplicados por `escala`"""
+    for path in SENSOR_CSV_PATHS.values():
+        _replicar_com_nomes(os.path.join(origem, path), os.path.join(destino, path), escala, 'nome_estacao')
+    _replicar_com_nomes(os.path.join(origem, SENSOR_STATIONS_PATH), os.path.join(destino, SENSOR_STATIONS_PATH),
+                        escala, 'nome', encoding='utf-8-sig')
+    for path in SUS_CSV_PATHS.values():
+        _replicar_linhas(os.path.join(origem, path), os.path.join(destino, path), escala)
+    _replicar_linhas(os.path.join(origem, SENSOR_BOXCOX_PATH), os.path.join(destino, SENSOR_BOXCOX_PATH), escala)
@@ -0,0 +1,376 @@
+"""
+Mede tempo e pico de memória de cada etapa do dashboard em várias escalas de dados.
+
+    PYTHONPATH=EDA python -m benchmarks.run [--origem .] [--escalas 1 10 100] [--store] [--saida arquivo.json]
+
+Para cada escala, os dados de `--origem` são multiplicados em uma pasta temporária
+(ver `benchmarks/datasets.py`) e as etapas rodam com o diretório de trabalho nessa
+pasta, sem o cache do Streamlit nem o cache em disco. As páginas rodam em modo
+"bare" do Streamlit, com os valores padrão dos widgets. Cada etapa roda duas vezes:
+a primeira mede o pico de memória com `tracemalloc` (memória alocada pelo Python,
+numpy e pandas durante a etapa) e a segunda, já aquecida, mede o tempo. As etapas
+`calculos_*` medem só as funções de `analytics/`, sem o Streamlit.
+
+Com o `duckdb` instalado, `consultas_duckdb` mede os mesmos cálculos de sensores e
+saúde no backend SQL (`utils/duckdb_backend.py`) e `pagina_*_duckdb`, as páginas nesse
+modo. A memória do DuckDB é nativa e não aparece no `tracemalloc`: nessas etapas, o
+pico medido é só o dos resultados já agregados. Uma etapa do DuckDB que falha (por
+exemplo, sem `--store` e com CSVs que o DuckDB não consegue ler) sai com o erro na
+linha, no lugar do tempo, e as outras continuam.
+
+As etapas `importacao_*` medem a partida a frio: o tempo de importar, em um
+interpretador novo, o que `main.py` importa antes de escolher a página e, em cada
+página, também o módulo dela (o melhor de `REPETICOES_IMPORTACAO` execuções). Elas
+não dependem dos dados e saem com escala 0; acima de `--orcamento-importacao`
+segundos, a etapa é marcada e o comando termina com código 1.
+
+O resultado é um JSON com os metadados da execução (commit, versões, CPUs) e uma
+linha por (etapa, escala); dois arquivos podem ser comparados com `benchmarks.compare`.
+O JSON é regravado a cada etapa, então uma execução interrompida guarda o que já mediu;
+se alguma etapa falhar, o comando termina com código 1.
+"""
+import os
+
+# Sem cache em disco: cada etapa mede o processamento completo
+os.environ['QUALIAR_DISK_CACHE'] = '0'
+
+import argparse
+import importlib.util
+import json
+import logging
+import platform
+import sys
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+import pandas as pd
+from benchmarks.datasets import preparar_dados
+
+ESCALAS = [1, 10, 100]
+ORCAMENTO_IMPORTACAO = 1.5  # segundos
+REPETICOES_IMPORTACAO = 3
+# O que main.py importa antes do roteamento e o módulo de cada página
+IMPORTACOES = {
+    'importacao_main': ['streamlit', 'utils.config', 'utils.datasets', 'utils.profiling'],
+    'importacao_analise_sensores': ['pages.sensores.Analise_Sensores'],
+    'importacao_dados_saude': ['pages.sus.Dados_Saude'],
+    'importacao_poluentes_doencas': ['pages.poluentes_doencas.Poluentes_Doencas'],
+}
+# Bibliotecas que nenhuma página deveria importar só por ser carregada
+PESADAS = ['matplotlib', 'seaborn', 'sklearn', 'scipy.stats', 'statsmodels']
+
+
+def medir(etapa, escala, funcao, *args):
+    """
+    Executa `funcao(*args)` duas vezes: a primeira com `tracemalloc` (pico de memória, e
+    aquece imports e caches do sistema operacional), a segunda só cronometrada.
+
+    Retorna o resultado da segunda execução e a linha do relatório.
+    """
+    tracemalloc.start()
+    try:
+        funcao(*args)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+
+    linha = {'etapa': etapa, 'escala': escala, 'segundos': round(segundos, 4), 'pico_mb': round(pico / 2**20, 2)}
+    print(f"{etapa:<28} {escala:>4}x {segundos:>9.3f}s {linha['pico_mb']:>10.1f} MB", flush=True)
+    return resultado, linha
+
+
+def cronometrar(etapa, escala, funcao, *args):
+    """Executa `funcao(*args)` uma vez, só cronometrada (etapas de preparação)"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    linha = {'etapa': etapa, 'escala': escala, 'segundos': round(time.perf_counter() - inicio, 4)}
+    print(f"{etapa:<28} {escala:>4}x {linha['segundos']:>9.3f}s", flush=True)
+    return resultado, linha
+
+
+def _falha(etapa, escala, erro):
+    """Linha do relatório de uma etapa que falhou"""
+    linha = {'etapa': etapa, 'escala': escala, 'erro': f'{type(erro).__name__}: {erro}'}
+    print(f"{etapa:<28} {escala:>4}x  falhou: {linha['erro']}", flush=True)
+    return linha
+
+
+def _importar(modulos):
+    """Segundos para importar `modulos` em um interpretador novo e as bibliotecas pesadas que vieram junto"""
+    eda = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    codigo = (
+        "import json, sys, time\n"
+        "inicio = time.perf_counter()\n"
+        f"for nome in {modulos!r}: __import__(nome)\n"
+        "segundos = time.perf_counter() - inicio\n"
+        f"print(json.dumps([segundos, [m for m in {PESADAS!r} if m in sys.modules]]))\n"
+    )
+    ambiente = dict(os.environ, PYTHONPATH=eda, PYTHONWARNINGS='ignore')
+    saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True, cwd=eda,
+                           env=ambiente).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def _importacoes(orcamento):
+    linhas = []
+    for etapa, modulos in IMPORTACOES.items():
+        if etapa != 'importacao_main':
+            modulos = IMPORTACOES['importacao_main'] + modulos
+        medidas = [_importar(modulos) for _ in range(REPETICOES_IMPORTACAO)]
+        segundos, pesadas = min(medidas)
+        linha = {'etapa': etapa, 'escala': 0, 'segundos': round(segundos, 4), 'orcamento': orcamento,
+                 'acima_do_orcamento': segundos > orcamento, 'pesadas': pesadas}
+        aviso = '  acima do orçamento' if linha['acima_do_orcamento'] else ''
+        extras = f"  ({', '.join(pesadas)})" if pesadas else ''
+        print(f"{etapa:<28} {'-':>5} {segundos:>9.3f}s{aviso}{extras}", flush=True)
+        linhas.append(linha)
+    return linhas
+
+
+def _calculos_sensores(df_sensor, rollup, poluentes):
+    from analytics import sensores
+    anos = sorted(rollup['ano'].index.get_level_values('ano').unique())
+    df_filtered = sensores.filtrar_periodo(df_sensor, anos, None, sensores.METEOROLOGICAS + poluentes)
+    sensores.media_por_estacao(rollup, anos, None, poluentes[0])
+    sensores.serie_temporal(rollup, anos, None, poluentes)
+    sensores.comparacao_estacoes(rollup, anos, None, poluentes[0])
+    sensores.matriz_correlacao(df_filtered, poluentes)
+    sensores.resumo_periodo(rollup, anos, None, poluentes)
+
+
+def _calculos_saude(df_sus):
+    from analytics import saude
+    tabelas = saude.contagens(df_sus)
+    saude.top_diagnosticos(tabelas['diagnosticos'])
+    saude.top_causas_morte(tabelas['diagnosticos'])
+
+
+def _filtros_saude(df_sus, indice):
+    # Cada combinação de ano e sexo dos filtros interativos, com os indicadores e a amostra exibida
+    from analytics import saude_indice
+    consulta = saude_indice.consulta(df_sus, indice)
+    for ano in saude_indice.valores_distintos(consulta, 'ANO_CMPT'):
+        for sexo in [None] + saude_indice.valores_distintos(consulta, 'SEXO'):
+            filtrada = saude_indice.filtrar(consulta, ano=ano, sexo=sexo)
+            saude_indice.indicadores(filtrada)
+            saude_indice.amostra(filtrada, 100)
+
+
+def _calculos_poluentes_doencas(df_boxcox, df_sus_aggregated):
+    from analytics import poluentes_doencas
+    df_merged = poluentes_doencas.juntar_mensal(df_boxcox, df_sus_aggregated)
+    poluentes_doencas.matriz_correlacao(df_merged)
+    for variavel in ['pm10', 'nox', 'o3', 'temp']:
+        poluentes_doencas.regressao_linear(df_merged, variavel)
+
+
+def _calculos_defasagens(df_sensor, df_sus, poluentes):
+    from analytics import defasagens, juncao
+    defasagens.correlacao_defasada(df_sensor, juncao.internacoes_por_dia(df_sus), poluentes)
+
+
+def _calculos_juncao(df_sensor, df_sus, poluentes):
+    from analytics import juncao
+    juncao.agregar_mensal(juncao.juntar_diario(df_sensor, df_sus, poluentes, defasagens=range(8)))
+    juncao.juntar_diario(df_sensor, df_sus, poluentes, por_estacao=True)
+
+
+def _consultas_duckdb(conexao, poluentes):
+    from analytics import sensores_sql, saude_sql
+    anos = sensores_sql.anos_disponiveis(conexao)
+    sensores_sql.media_por_estacao(conexao, anos, None, poluentes[0])
+    sensores_sql.serie_temporal(conexao, anos, None, poluentes)
+    sensores_sql.comparacao_estacoes(conexao, anos, None, poluentes[0])
+    sensores_sql.matriz_correlacao(conexao, anos, None, poluentes)
+    sensores_sql.resumo_periodo(conexao, anos, None, poluentes)
+    saude_sql.contagens(saude_sql.consulta(conexao))
+
+
+def _consultas_horarias(armazem, poluentes):
+    from utils import hourly_store
+    inicio, fim = hourly_store.intervalo(armazem)
+    for variavel in poluentes:
+        hourly_store.perfil_diurno(armazem, variavel)
+        hourly_store.serie_horaria(armazem, variavel, fim - pd.Timedelta(days=31), fim)
+
+
+def _etapas(escala, store):
+    # Importados aqui para que os caminhos relativos valham a partir da pasta temporária
+    from utils.config import POLUENTES_TRADUCAO, month_names
+    from utils import data_loader
+    from utils.rollup import build_rollup
+    from utils.columnar_store import build_sensor_store, build_sus_store
+    from utils import hourly_store
+    from analytics.saude import contagens
+    from analytics.saude_indice import indexar
+    import pages.sensores.Geral as geral
+    import pages.sus.Dados_Saude as dados_saude
+    import pages.poluentes_doencas.Poluentes_Doencas as poluentes_doencas
+
+    if store:
+        _, linha = cronometrar('build_sensor_store', escala, build_sensor_store)
+        yield linha
+        _, linha = cronometrar('build_sus_store', escala, build_sus_store)
+        yield linha
+
+    (df_sensor, _), linha = medir('load_sensor_data', escala, data_loader.build_sensor_data)
+    linha['linhas'] = len(df_sensor)
+    yield linha
+    df_boxcox, linha = medir('load_sensor_boxcox_data', escala, data_loader.build_sensor_boxcox_data)
+    yield linha
+    (df_sus, df_sus_aggregated), linha = medir('load_sus_data', escala, data_loader.build_sus_data)
+    linha['linhas'] = len(df_sus)
+    yield linha
+    rollup, linha = medir('sensor_rollup', escala, build_rollup, df_sensor, list(POLUENTES_TRADUCAO.keys()))
+    yield linha
+    janelas, linha = medir('sensor_medias_moveis', escala, data_loader.build_sensor_windows)
+    yield linha
+    indice_sus, linha = medir('sus_indice', escala, indexar, df_sus)
+    yield linha
+    armazem, linha = cronometrar('build_sensor_hourly_store', escala, hourly_store.construir)
+    yield linha
+
+    # Só os cálculos das páginas (analytics/), com todos os anos e variáveis
+    poluentes = list(POLUENTES_TRADUCAO.keys())
+    _, linha = medir('calculos_sensores', escala, _calculos_sensores, df_sensor, rollup, poluentes)
+    yield linha
+    _, linha = medir('calculos_saude', escala, _calculos_saude, df_sus)
+    yield linha
+    _, linha = medir('filtros_saude', escala, _filtros_saude, df_sus, indice_sus)
+    yield linha
+    _, linha = medir('calculos_poluentes_doencas', escala, _calculos_poluentes_doencas, df_boxcox, df_sus_aggregated)
+    yield linha
+    _, linha = medir('calculos_juncao', escala, _calculos_juncao, df_sensor, df_sus, poluentes)
+    yield linha
+    _, linha = medir('calculos_defasagens', escala, _calculos_defasagens, df_sensor, df_sus, poluentes)
+    yield linha
+    _, linha = medir('consultas_horarias', escala, _consultas_horarias, armazem, poluentes)
+    yield linha
+
+    _, linha = medir('pagina_geral', escala, geral.show, df_sensor, POLUENTES_TRADUCAO, month_names, rollup,
+                     janelas)
+    yield linha
+    # Como no dashboard, a página recebe as tabelas de contagem e o índice já calculados pelos loaders
+    _, linha = medir('pagina_dados_saude', escala, dados_saude.show, df_sus, df_sus_aggregated, month_names, None,
+                     contagens(df_sus), indice_sus)
+    yield linha
+    _, linha = medir('pagina_poluentes_doencas', escala, poluentes_doencas.show, df_boxcox, df_sus_aggregated,
+                     df_sensor, df_sus)
+    yield linha
+
+    # Backend DuckDB (opcional): consultas sobre os arquivos, sem os DataFrames. Cada etapa é
+    # independente das outras: uma falha fica registrada na linha e o benchmark continua
+    if importlib.util.find_spec('duckdb') is not None:
+        from utils import duckdb_backend
+        etapas_duckdb = {
+            'consultas_duckdb': lambda conexao: _consultas_duckdb(conexao, poluentes),
+            'pagina_geral_duckdb': lambda conexao: geral.show(None, POLUENTES_TRADUCAO, month_names, None, None,
+                                                              None, conexao),
+            'pagina_dados_saude_duckdb': lambda conexao: dados_saude.show(None, None, month_names, conexao),
+        }
+        try:
+            conexao = duckdb_backend.conectar()
+        except Exception as erro:
+            for etapa in etapas_duckdb:
+                yield _falha(etapa, escala, erro)
+        else:
+            for etapa, funcao in etapas_duckdb.items():
+                try:
+                    _, linha = medir(etapa, escala, funcao, conexao)
+                except Exception as erro:
+                    linha = _falha(etapa, escala, erro)
+                yield linha
+            conexao.close()
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _gravar(saida, relatorio):
+    # Grava em um arquivo temporário e renomeia, para nunca deixar um JSON pela metade
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2)
+    os.replace(saida + '.tmp', saida)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do dashboard')
+    parser.add_argument('--origem', default='.', help='raiz com a pasta data/ original (padrão: diretório atual)')
+    parser.add_argument('--escalas', nargs='+', type=int, default=ESCALAS)
+    parser.add_argument('--store', action='store_true', help='converte para o armazenamento Parquet antes de carregar')
+    parser.add_argument('--orcamento-importacao', type=float, default=ORCAMENTO_IMPORTACAO,
+                        help='segundos máximos das etapas importacao_* (padrão: %(default)s)')
+    parser.add_argument('--saida', help='arquivo JSON de saída (padrão: benchmarks/resultados/<commit>-<data>.json)')
+    args = parser.parse_args(argv)
+
+    # O modo "bare" do Streamlit avisa a cada widget; os avisos não interessam aqui
+    warnings.filterwarnings('ignore')
+    logging.disable(logging.WARNING)
+
+    origem = os.path.abspath(args.origem)
+    commit = _commit()
+    saida = args.saida or os.path.join(origem, 'benchmarks', 'resultados',
+                                       f"{commit or 'sem-commit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    saida = os.path.abspath(saida)
+    diretorio_inicial = os.getcwd()
+
+    resultados = []
+    relatorio = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpus': os.cpu_count(),
+        'store': args.store,
+        'resultados': resultados,
+    }
+
+    def registrar(linha):
+        # O JSON é regravado a cada etapa: uma execução interrompida mantém o que já foi medido
+        resultados.append(linha)
+        _gravar(saida, relatorio)
+
+    for linha in _importacoes(args.orcamento_importacao):
+        registrar(linha)
+    for escala in args.escalas:
+        pasta = tempfile.mkdtemp(prefix=f'qualiar-bench-{escala}x-')
+        try:
+            _, linha = cronometrar('preparar_dados', escala, preparar_dados, origem, pasta, escala)
+            registrar(linha)
+            os.chdir(pasta)
+            for linha in _etapas(escala, args.store):
+                registrar(linha)
+        except Exception as erro:
+            # As etapas de uma escala dependem umas das outras; a falha encerra só esta escala
+            registrar(_falha('etapas', escala, erro))
+        finally:
+            os.chdir(diretorio_inicial)
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Resultados gravados em {saida}")
+    if any(linha.get('acima_do_orcamento') for linha in resultados):
+        print(f"Importação acima do orçamento de {args.orcamento_importacao}s")
+        return 1
+    if any('erro' in linha for linha in resultados):
+        print("Etapas com falha: " + ', '.join(f"{linha['etapa']} ({linha['escala']}x)" for linha in resultados
+                                                 if 'erro' in linha))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
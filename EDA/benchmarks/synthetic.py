@@ -0,0 +1,263 @@
+"""
+Gerador de dados sintéticos nos formatos lidos por `utils/data_loader.py`.
+
+Gera medições horárias de N estações ao longo de um intervalo de anos e
+internações do SIH no mesmo layout dos CSVs do repositório:
+
+- `data/Sensors/por_estacao/df_sensor_*_preenchido.csv` (as estações são
+  distribuídas entre os oito arquivos de `SENSOR_CSV_PATHS`; com menos de oito
+  estações, os arquivos que sobram ficam só com o cabeçalho);
+- `data/Sensors/medicoes-sensores-boxcox.csv` e `data/Sensors/estacoes.csv`;
+- `data/datasus/dados_filtrados_{ano}.csv`, por ano de competência (os anos de
+  `SUS_CSV_PATHS` fora do intervalo gerado ficam só com o cabeçalho).
+
+Os dados são gerados e gravados mês a mês, então a memória usada depende do número
+de estações e não do número de anos. As séries têm sazonalidade anual e diária,
+ruído autocorrelacionado com uma parte comum a todas as estações (correlação entre
+estações), valores vazios isolados, falhas de várias horas por estação e variáveis
+que algumas estações não medem. As internações seguem a sazonalidade das doenças
+respiratórias (pico no inverno) e têm menos entradas nos fins de semana.
+
+    PYTHONPATH=EDA python -m benchmarks.synthetic /tmp/qualiar-sintetico --estacoes 80 --anos 2012 2019
+    PYTHONPATH=EDA python -m benchmarks.run --origem /tmp/qualiar-sintetico --escalas 1
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from scipy.special import ndtri
+from utils.config import SENSOR_CSV_PATHS, SENSOR_STATIONS_PATH, SENSOR_BOXCOX_PATH, SUS_CSV_PATHS
+from utils.gap_filling import VARIAVEIS
+
+SENSOR_OUTPUT_COLUMNS = ['nome_estacao', 'data'] + VARIAVEIS + ['data_formatada', 'ano', 'mes']
+SUS_OUTPUT_COLUMNS = ['UF_ZI', 'ANO_CMPT', 'MES_CMPT', 'MUNIC_RES', 'NASC', 'SEXO', 'DT_INTER', 'DT_SAIDA',
+                      'DIAG_PRINC', 'DIAG_SECUN', 'IDADE', 'DIAS_PERM', 'MORTE']
+
+# media, desvio do ruído, amplitude anual e diária, dia do ano e hora de pico;
+# log=True: a série é log-normal (amplitudes e desvio na escala do log)
+MODELOS = {
+    'temp': dict(media=24.0, desvio=1.5, anual=3.5, diurno=4.0, pico_dia=45, pico_hora=14, log=False),
+    'ur': dict(media=75.0, desvio=6.0, anual=-3.0, diurno=-12.0, pico_dia=45, pico_hora=14, log=False),
+    'co': dict(media=0.4, desvio=0.45, anual=0.25, diurno=0.3, pico_dia=196, pico_hora=8, log=True),
+    'no': dict(media=15.0, desvio=0.7, anual=0.3, diurno=0.5, pico_dia=196, pico_hora=8, log=True),
+    'no2': dict(media=30.0, desvio=0.45, anual=0.2, diurno=0.3, pico_dia=196, pico_hora=9, log=True),
+    'so2': dict(media=5.0, desvio=0.6, anual=0.15, diurno=0.2, pico_dia=196, pico_hora=11, log=True),
+    'o3': dict(media=35.0, desvio=0.5, anual=0.15, diurno=0.6, pico_dia=15, pico_hora=14, log=True),
+    'pm10': dict(media=30.0, desvio=0.45, anual=0.25, diurno=0.15, pico_dia=196, pico_hora=9, log=True),
+    'pm2_5': dict(media=15.0, desvio=0.5, anual=0.25, diurno=0.15, pico_dia=196, pico_hora=9, log=True),
+}
+# Chuva: probabilidade horária média de chover (maior no verão) e média da chuva em mm
+CHUVA_PROBABILIDADE = 0.08
+CHUVA_MEDIA_MM = 2.0
+
+DIAGNOSTICOS = ['J189', 'J180', 'J159', 'J128', 'J441', 'J449', 'J459', 'J960', 'J219', 'J069']
+PESOS_DIAGNOSTICOS = [0.3, 0.1, 0.08, 0.05, 0.1, 0.07, 0.12, 0.08, 0.06, 0.04]
+MUNICIPIOS = [330455, 330170, 330350, 330490, 330330]
+PESOS_MUNICIPIOS = [0.85, 0.05, 0.04, 0.03, 0.03]
+
+# Centro aproximado do município do Rio de Janeiro, para as coordenadas das estações
+LATITUDE_RJ, LONGITUDE_RJ = -22.92, -43.40
+
+
+def _ar1(ruido, phi, estado):
+    """Filtro AR(1) com variância unitária ao longo do eixo do tempo (último), continuando de `estado`"""
+    saida, estado = lfilter([np.sqrt(1 - phi ** 2)], [1, -phi], ruido, axis=-1, zi=estado)
+    return saida, estado
+
+
+def _arquivo_estacao(indice):
+    chaves = list(SENSOR_CSV_PATHS)
+    return SENSOR_CSV_PATHS[chaves[indice % len(chaves)]]
+
+
+def nomes_estacoes(n):
+    return [f'ESTAÇÃO SINTÉTICA {i + 1:03d}' for i in range(n)]
+
+
+def gravar_cadastro(destino, nomes, rng):
+    cadastro = pd.DataFrame({
+        'nome': nomes,
+        'código': [f'S{i + 1:03d}' for i in range(len(nomes))],
+        'lat': LATITUDE_RJ + rng.uniform(-0.1, 0.1, len(nomes)),
+        'lon': LONGITUDE_RJ + rng.uniform(-0.25, 0.25, len(nomes)),
+        'codnum': np.arange(1, len(nomes) + 1),
+    })
+    caminho = os.path.join(destino, SENSOR_STATIONS_PATH)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    cadastro.to_csv(caminho, index=False, encoding='utf-8-sig')
+
+
+def gerar_sensores(n_estacoes, inicio, fim, rng, correlacao=0.6, phi=0.9, vazio=0.02, falhas_por_ano=4,
+                   duracao_falha_h=24, sem_medicao=0.15):
+    """Gera as medições horárias mês a mês; cada item é um DataFrame com todas as estações do mês"""
+    variaveis_ruido = list(MODELOS) + ['chuva']
+    n_var = len(variaveis_ruido)
+    nomes = np.array(nomes_estacoes(n_estacoes))
+
+    # Características fixas de cada estação
+    nivel = rng.normal(0, 0.2, (n_estacoes, n_var))
+    mede = rng.random((n_estacoes, len(VARIAVEIS))) >= sem_medicao
+    mede[:, [VARIAVEIS.index(v) for v in ('chuva', 'temp', 'ur')]] = True
+
+    estado_comum = np.zeros((n_var, 1))
+    estado_estacao = np.zeros((n_estacoes, n_var, 1))
+    fim_falha = np.full(n_estacoes, -1)
+    p_falha = falhas_por_ano / (365 * 24)
+    hora_global = 0
+
+    for mes in pd.period_range(inicio, fim, freq='M'):
+        horas = pd.date_range(mes.start_time, mes.end_time.floor('h'), freq='h')
+        n_horas = len(horas)
+        dia_ano = horas.dayofyear.to_numpy()
+        hora_dia = horas.hour.to_numpy()
+
+        comum, estado_comum = _ar1(rng.standard_normal((n_var, n_horas)), phi, estado_comum)
+        proprio, estado_estacao = _ar1(rng.standard_normal((n_estacoes, n_var, n_horas)), phi, estado_estacao)
+        z = np.sqrt(correlacao) * comum[None] + np.sqrt(1 - correlacao) * proprio
+
+        valores = {}
+        for j, variavel in enumerate(MODELOS):
+            m = MODELOS[variavel]
+            sazonal = (m['anual'] * np.cos(2 * np.pi * (dia_ano - m['pico_dia']) / 365.25)
+                       + m['diurno'] * np.cos(2 * np.pi * (hora_dia - m['pico_hora']) / 24))
+            if m['log']:
+                valores[variavel] = m['media'] * np.exp(sazonal + nivel[:, [j]] + m['desvio'] * z[:, j]
+                                                        - m['desvio'] ** 2 / 2)
+            else:
+                valores[variavel] = m['media'] + sazonal + nivel[:, [j]] * m['desvio'] * 3 + m['desvio'] * z[:, j]
+        valores['ur'] = np.clip(valores['ur'], 5, 100)
+        valores['nox'] = valores['no'] + valores['no2']
+
+        p_chuva = CHUVA_PROBABILIDADE * (1 + 0.5 * np.cos(2 * np.pi * (dia_ano - 15) / 365.25))
+        chove = z[:, -1] > ndtri(1 - p_chuva)
+        valores['chuva'] = np.where(chove, rng.exponential(CHUVA_MEDIA_MM, (n_estacoes, n_horas)), 0.0)
+
+        # Falhas de várias horas: cada início marca a estação como parada até início + duração
+        t = hora_global + np.arange(n_horas)
+        inicios = rng.random((n_estacoes, n_horas)) < p_falha
+        fins = np.where(inicios, t + rng.geometric(1 / duracao_falha_h, (n_estacoes, n_horas)), -1)
+        fins = np.maximum.accumulate(np.maximum(fins, fim_falha[:, None]), axis=1)
+        em_falha = fins > t
+        fim_falha = fins[:, -1]
+        hora_global += n_horas
+
+        df_mes = pd.DataFrame({
+            'nome_estacao': np.repeat(nomes, n_horas),
+            'data': np.tile(horas.strftime('%Y-%m-%d %H:%M:%S'), n_estacoes),
+        })
+        for k, variavel in enumerate(VARIAVEIS):
+            serie = valores[variavel]
+            vazio_mask = em_falha | (rng.random((n_estacoes, n_horas)) < vazio) | ~mede[:, [k]]
+            df_mes[variavel] = np.where(vazio_mask, np.nan, serie).ravel()
+        df_mes['data_formatada'] = np.tile(horas.strftime('%Y-%m-%d'), n_estacoes)
+        df_mes['ano'] = mes.year
+        df_mes['mes'] = mes.month
+        yield df_mes
+
+
+def gerar_internacoes(inicio, fim, rng, internacoes_dia=60.0):
+    """Gera as internações mês a mês (por data de internação)"""
+    for mes in pd.period_range(inicio, fim, freq='M'):
+        dias = pd.date_range(mes.start_time, mes.end_time.normalize(), freq='D')
+        sazonal = 1 + 0.35 * np.cos(2 * np.pi * (dias.dayofyear.to_numpy() - 170) / 365.25)
+        semana = np.where(dias.dayofweek.to_numpy() >= 5, 0.75, 1.1)
+        por_dia = rng.poisson(internacoes_dia * sazonal * semana)
+        n = int(por_dia.sum())
+
+        entrada = np.repeat(dias.to_numpy(), por_dia)
+        faixa = rng.random(n)
+        idade = np.where(faixa < 0.35, rng.integers(0, 6, n),
+                         np.where(faixa < 0.7, rng.integers(60, 96, n), rng.integers(6, 60, n)))
+        permanencia = rng.geometric(1 / 6, n) - 1
+        saida = entrada + permanencia.astype('timedelta64[D]')
+        municipio = rng.choice(MUNICIPIOS, n, p=PESOS_MUNICIPIOS)
+        saida_idx = pd.DatetimeIndex(saida)
+        entrada_idx = pd.DatetimeIndex(entrada)
+
+        yield pd.DataFrame({
+            'UF_ZI': municipio,
+            'ANO_CMPT': saida_idx.year,
+            'MES_CMPT': saida_idx.month,
+            'MUNIC_RES': municipio,
+            'NASC': (entrada_idx.year - idade) * 10000 + rng.integers(1, 13, n) * 100 + rng.integers(1, 29, n),
+            'SEXO': rng.choice([1, 3], n),
+            'DT_INTER': entrada_idx.strftime('%Y%m%d').astype(int),
+            'DT_SAIDA': saida_idx.strftime('%Y%m%d').astype(int),
+            'DIAG_PRINC': rng.choice(DIAGNOSTICOS, n, p=PESOS_DIAGNOSTICOS),
+            'DIAG_SECUN': '0000',
+            'IDADE': idade,
+            'DIAS_PERM': permanencia,
+            'MORTE': (rng.random(n) < np.where(idade >= 65, 0.15, 0.03)).astype(int),
+        }, columns=SUS_OUTPUT_COLUMNS)
+
+
+class _Escritor:
+    """Acrescenta blocos a vários CSVs, gravando o cabeçalho só na primeira vez"""
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.iniciados = set()
+
+    def gravar(self, path, df):
+        caminho = os.path.join(self.destino, path)
+        primeira = caminho not in self.iniciados
+        if primeira:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            self.iniciados.add(caminho)
+        df.to_csv(caminho, index=False, mode='w' if primeira else 'a', header=primeira, float_format='%.3f')
+
+    def completar(self, paths, colunas):
+        """Grava só o cabeçalho nos arquivos de `paths` que não receberam nenhuma linha"""
+        for path in paths:
+            if os.path.join(self.destino, path) not in self.iniciados:
+                self.gravar(path, pd.DataFrame(columns=colunas))
+
+
+def gerar(destino, n_estacoes=8, ano_inicial=2012, ano_final=2019, internacoes_dia=60.0, semente=0, boxcox=True):
+    """Grava em `destino` (mesmo layout de `data/`) os sensores, o cadastro e as internações"""
+    rng = np.random.default_rng(semente)
+    inicio, fim = f'{ano_inicial}-01', f'{ano_final}-12'
+    escritor = _Escritor(destino)
+    nomes = nomes_estacoes(n_estacoes)
+    gravar_cadastro(destino, nomes, rng)
+    arquivo_de = {nome: _arquivo_estacao(i) for i, nome in enumerate(nomes)}
+
+    linhas_sensores = 0
+    for df_mes in gerar_sensores(n_estacoes, inicio, fim, rng):
+        for path, df_arquivo in df_mes.groupby(df_mes['nome_estacao'].map(arquivo_de), sort=False):
+            escritor.gravar(path, df_arquivo[SENSOR_OUTPUT_COLUMNS])
+        if boxcox:
+            escritor.gravar(SENSOR_BOXCOX_PATH, df_mes[SENSOR_OUTPUT_COLUMNS])
+        linhas_sensores += len(df_mes)
+
+    linhas_sus = 0
+    for df_mes in gerar_internacoes(inicio, fim, rng, internacoes_dia):
+        for ano, df_ano in df_mes.groupby('ANO_CMPT', sort=False):
+            escritor.gravar(f'data/datasus/dados_filtrados_{ano}.csv', df_ano)
+        linhas_sus += len(df_mes)
+
+    # Os loaders leem todos os arquivos da configuração: com menos estações que arquivos ou anos
+    # fora de SUS_CSV_PATHS, os que ficaram sem dados existem só com o cabeçalho
+    escritor.completar(SENSOR_CSV_PATHS.values(), SENSOR_OUTPUT_COLUMNS)
+    escritor.completar(SUS_CSV_PATHS.values(), SUS_OUTPUT_COLUMNS)
+    return linhas_sensores, linhas_sus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos de sensores e do SIH')
+    parser.add_argument('destino')
+    parser.add_argument('--estacoes', type=int, default=8)
+    parser.add_argument('--anos', nargs=2, type=int, default=[2012, 2019], metavar=('INICIAL', 'FINAL'))
+    parser.add_argument('--internacoes-dia', type=float, default=60.0)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--sem-boxcox', action='store_true', help='não grava medicoes-sensores-boxcox.csv')
+    args = parser.parse_args(argv)
+
+    linhas_sensores, linhas_sus = gerar(args.destino, args.estacoes, args.anos[0], args.anos[1],
+                                        args.internacoes_dia, args.semente, not args.sem_boxcox)
+    print(f"{linhas_sensores} medições e {linhas_sus} internações gravadas em {args.destino}")
+
+
+if __name__ == '__main__':
+    main()
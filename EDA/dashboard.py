@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import plotly.graph_objects as go
+from utils.ingestion import read_csvs_parallel
+from utils.charts import scatter
+from analytics.juncao import juntar_diario
 
 # Configuração inicial
 st.set_page_config(page_title="Análise Ambiental e de Saúde", layout="wide")
@@ -35,12 +39,7 @@ def load_sensor_data():
         'copacabana': 'https://raw.githubusercontent.com/AILAB-CEFET-RJ/qualiar/refs/heads/main/data/Sensors/por_estacao/df_sensor_copacabana_preenchido.csv'
     }
     
-    dfs = []
-    for name, url in urls.items():
-        df = pd.read_csv(url)
-        dfs.append(df)
-    
-    df_sensor = pd.concat(dfs, ignore_index=True)
+    df_sensor, _ = read_csvs_parallel(urls)
     
     # Processamento dos dados
     poluentes = [col for col in df_sensor.columns if col not in ['data_formatada', 'ano', 'mes', 'data', 'nome_estacao']]
@@ -61,12 +60,7 @@ def load_sus_data():
     'sus_2019': 'https://raw.githubusercontent.com/AILAB-CEFET-RJ/qualiar/refs/heads/main/data/datasus/dados_filtrados_2019.csv'
   }
 
-  dfs = []
-  for name, url in urls.items():
-      df = pd.read_csv(url)
-      dfs.append(df)
-    
-  df_sus = pd.concat(dfs, ignore_index=True)
+  df_sus, _ = read_csvs_parallel(urls)
   
   interest_columns = ['UF_ZI', 'ANO_CMPT', 'MES_CMPT', 'MUNIC_RES', 'NASC', 'SEXO', 'DT_INTER', 'DT_SAIDA', 'DIAG_PRINC', 'DIAG_SECUN', 'IDADE', 'DIAS_PERM', 'MORTE']
 
@@ -163,40 +157,42 @@ if pagina_selecionada == "🏭 Análise de Sensores":
             with main_container:
                 st.subheader(f"📊 Dados para a estação: {selected_estacao}")
                 
-                # Gráficos para cada variável selecionada
+                # Linhas de cada combinação de ano e mês, separadas uma única vez para todas as variáveis
+                grupos = dict(tuple(df_filtered.groupby(['ano', 'mes'])))
+                
+                # Gráficos interativos para cada variável selecionada (WebGL com muitos pontos, ver utils/charts.py)
                 for poluente in selected_poluentes:
-                    fig, ax = plt.subplots(figsize=(12, 5))
+                    fig = go.Figure()
                     
-                    # Plot para cada combinação de ano e mês
+                    # Uma curva para cada combinação de ano e mês
                     for year in selected_years:
                         for month in selected_months:
-                            mask = (df_filtered['ano'] == year) & (df_filtered['mes'] == month)
-                            temp_df = df_filtered[mask]
+                            temp_df = grupos.get((year, month))
                             
-                            if not temp_df.empty:
+                            if temp_df is not None and not temp_df.empty:
                                 label = f"{year} - {month_names[month]}"
-                                ax.plot(
+                                fig.add_trace(scatter(
                                     temp_df['data_formatada'], 
                                     temp_df[poluente], 
-                                    label=label, 
-                                    marker='o', 
-                                    markersize=5,
-                                    linewidth=2
-                                )
+                                    name=label, 
+                                    mode='lines+markers',
+                                    marker=dict(size=5),
+                                    line=dict(width=2)
+                                ))
                     
                     # Configurações do gráfico
-                    ax.set_title(f"{POLUENTES_TRADUCAO[poluente]} - Estação {selected_estacao}", pad=20)
-                    ax.set_xlabel("Data", labelpad=10)
-                    ax.set_ylabel(POLUENTES_TRADUCAO[poluente], labelpad=10)
-                    ax.grid(True, linestyle='--', alpha=0.7)
-                    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-                    
-                    # Formatação do eixo x
-                    plt.xticks(rotation=45, ha='right')
-                    plt.tight_layout()
+                    fig.update_layout(
+                        title=f"{POLUENTES_TRADUCAO[poluente]} - Estação {selected_estacao}",
+                        xaxis_title="Data",
+                        yaxis_title=POLUENTES_TRADUCAO[poluente],
+                        hovermode='x unified',
+                        height=450
+                    )
+                    fig.update_xaxes(tickangle=45, showgrid=True, griddash='dash')
+                    fig.update_yaxes(showgrid=True, griddash='dash')
                     
                     # Exibe o gráfico
-                    st.pyplot(fig)
+                    st.plotly_chart(fig, use_container_width=True)
                     
                     # Espaçamento entre gráficos
                     st.markdown("---")
@@ -230,11 +226,12 @@ if pagina_selecionada == "🏭 Análise de Sensores":
 elif pagina_selecionada == "📈 Poluentes x Doenças":
     st.title("📈 Relação entre Poluentes e Doenças Respiratórias")
     
-    # Merge dos dados
-    df_merged = pd.merge(df_sensor, df_sus_aggregated, on=['ano', 'mes'], how='inner')
-    
     # Seleção e cálculo da correlação
     variaveis = ['pm2_5', 'pm10', 'co', 'o3', 'no', 'no2', 'nox', 'so2', 'chuva', 'temp', 'ur', 'num_internacoes']
+    
+    # Junção pelo dia (média da cidade × internações do dia); o merge em ['ano', 'mes'] repetia
+    # a contagem do mês em todas as linhas diárias de todas as estações
+    df_merged = juntar_diario(df_sensor, df_sus, variaveis[:-1])
     correlation_matrix = df_merged[variaveis].corr()
     
     # Mapeamento de nomes amigáveis
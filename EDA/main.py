@@ -1,45 +1,51 @@
 import streamlit as st
-from utils.config import POLUENTES_TRADUCAO, month_names
-from utils.data_loader import load_sensor_data, load_sus_data, load_sensor_boxcox_data
-import pages.poluentes_doencas.Poluentes_Doencas as poluentes_doencas
-import pages.sensores.Analise_Sensores as analise_sensores
-import pages.sus.Dados_Saude as dados_saude
+from utils.config import POLUENTES_TRADUCAO, month_names, QUERY_BACKEND
+from utils.datasets import carregar, pre_carregar
+from utils.profiling import iniciar, mostrar_painel
+
+# Conjuntos de dados de cada página (nomes do registro em utils/datasets.py)
+PAGINAS = {
+  "🏭 Análise de Sensores": ['df_sensor', 'sensor_rollup', 'sensor_janelas', 'sensor_horario'],
+  "🩺 Dados de Saúde": ['df_sus', 'df_sus_aggregated', 'sus_contagens', 'sus_indice'],
+  "📈 Poluentes x Doenças": ['df_sensor_boxcox', 'df_sus_aggregated', 'df_sensor', 'df_sus'],
+}
+# Backend DuckDB (QUALIAR_BACKEND=duckdb): sensores e saúde consultam os arquivos em vez de carregar os DataFrames
+if QUERY_BACKEND == 'duckdb':
+  PAGINAS["🏭 Análise de Sensores"] = ['consultas', 'sensor_horario']
+  PAGINAS["🩺 Dados de Saúde"] = ['consultas']
 
 # Configuração inicial
 st.set_page_config(page_title="Análise Ambiental e de Saúde", layout="wide")
 
+# Tempos do rerun (QUALIAR_PROFILE=1 ou ?profile=1; ver utils/profiling.py)
+iniciar()
+
 # Sidebar - Navegação
 st.sidebar.title("Menu de Navegação")
 pagina_selecionada = st.sidebar.radio(
     "Selecione a página:",
-    ["🏭 Análise de Sensores", "🩺 Dados de Saúde", "📈 Poluentes x Doenças"]
+    list(PAGINAS)
 )
 
-# Carregar os dados 
-df_sensor, poluentes = load_sensor_data()
-df_sus, df_sus_aggregated = load_sus_data()
-df_sensor_boxcox = load_sensor_boxcox_data()
-
-# Adicionar colunas de latitude e longitude ao df_sensor
-estacoes_coords = {
-  "ESTAÇÃO BANGU": (-22.887910, -43.471074),
-  "ESTAÇÃO CAMPO GRANDE": (-22.886255, -43.556522),
-  "ESTAÇÃO CENTRO": (-22.908344, -43.178152),
-  "ESTAÇÃO COPACABANA": (-22.965004, -43.180482),
-  "ESTAÇÃO IRAJÁ": (-22.831621, -43.326845),
-  "ESTAÇÃO PEDRA DE GUARATIBA": (-23.004379, -43.629010),
-  "ESTAÇÃO SÃO CRISTÓVÃO": (-22.897771, -43.221745),
-  "ESTAÇÃO TIJUCA": (-22.924915, -43.232657),
-}
+# Carregar só os dados da página selecionada
+dados = carregar(PAGINAS[pagina_selecionada])
 
-df_sensor["latitude"] = df_sensor["nome_estacao"].map(lambda x: estacoes_coords.get(x, (None, None))[0])
-df_sensor["longitude"] = df_sensor["nome_estacao"].map(lambda x: estacoes_coords.get(x, (None, None))[1])
-
-# Roteamento para páginas
+# Roteamento para páginas: cada página (e o que ela importa) só é carregada quando é mostrada
 if pagina_selecionada == "🏭 Análise de Sensores":
-  analise_sensores.show(df_sensor, POLUENTES_TRADUCAO, month_names)
+  import pages.sensores.Analise_Sensores as analise_sensores
+  analise_sensores.show(dados.get('df_sensor'), POLUENTES_TRADUCAO, month_names, dados.get('sensor_rollup'),
+                        dados.get('sensor_janelas'), dados['sensor_horario'], dados.get('consultas'))
 elif pagina_selecionada == "🩺 Dados de Saúde":
-  dados_saude.show(df_sus, df_sus_aggregated, month_names)
+  import pages.sus.Dados_Saude as dados_saude
+  dados_saude.show(dados.get('df_sus'), dados.get('df_sus_aggregated'), month_names, dados.get('consultas'),
+                   dados.get('sus_contagens'), dados.get('sus_indice'))
   # dados_saude.show(df_sus, df_sus_aggregated)
 elif pagina_selecionada == "📈 Poluentes x Doenças":
-  poluentes_doencas.show(df_sensor_boxcox, df_sus_aggregated)
\ No newline at end of file
+  import pages.poluentes_doencas.Poluentes_Doencas as poluentes_doencas
+  poluentes_doencas.show(dados['df_sensor_boxcox'], dados['df_sus_aggregated'], dados['df_sensor'],
+                         dados['df_sus'])
+
+mostrar_painel()
+
+# Com a página já desenhada, aquece o cache das outras em segundo plano
+pre_carregar([nome for entradas in PAGINAS.values() for nome in entradas if nome not in dados])
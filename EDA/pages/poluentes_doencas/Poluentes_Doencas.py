@@ -1,11 +1,17 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-
-def show(df_sensor_boxcox, df_sus_aggregated):
+from utils.profiling import perfilar, etapa
+from analytics.poluentes_doencas import (juntar_mensal, matriz_correlacao, regressao_linear, medias,
+                                         VARIAVEIS_CORRELACAO, NOMES_CORRELACAO)
+from analytics.defasagens import correlacao_defasada, matriz_defasagens, pico_por_variavel, DEFASAGEM_MAXIMA
+from analytics.juncao import internacoes_por_dia
+from analytics.downsampling import reduzir
+from utils.charts import scatter
+
+@perfilar('Poluentes x Doenças')
+def show(df_sensor_boxcox, df_sus_aggregated, df_sensor=None, df_sus=None):
     st.title("📈 Relação entre Poluentes e Doenças Respiratórias")
     
     # Adicionando informações sobre os datasets
@@ -136,30 +142,12 @@ def show(df_sensor_boxcox, df_sus_aggregated):
             }
         </style>
         """, unsafe_allow_html=True)
-    df_merged = pd.merge(df_sensor_boxcox, df_sus_aggregated, on=['ano', 'mes'], how='inner')
+    etapa('junção')
+    df_merged = juntar_mensal(df_sensor_boxcox, df_sus_aggregated)
     
-    # Seleção e cálculo da correlação
-    variaveis = ['pm2_5', 'pm10', 'co', 'o3', 'no', 'no2', 'nox', 'so2', 'chuva', 'temp', 'ur', 'num_internacoes']
-    correlation_matrix = df_merged[variaveis].corr()
-
-    # Mapeamento de nomes amigáveis
-    nome_colunas = {
-        'pm2_5': 'PM2.5', 
-        'pm10': 'PM10',
-        'co': 'CO',
-        'o3': 'Ozônio',
-        'no': 'NO',
-        'no2': 'NO₂',
-        'nox': 'NOx',
-        'so2': 'SO₂',
-        'chuva': 'Chuva',
-        'temp': 'Temperatura',
-        'ur': 'Umidade',
-        'num_internacoes': 'Internações'
-    }
-
-    # Aplica os nomes amigáveis
-    correlation_matrix = correlation_matrix.rename(columns=nome_colunas, index=nome_colunas)
+    # Correlação entre poluentes e internações, com nomes amigáveis
+    etapa('correlação')
+    correlation_matrix = matriz_correlacao(df_merged)
 
     # Criação do heatmap interativo com Plotly
     fig = go.Figure(data=go.Heatmap(
@@ -245,7 +233,13 @@ def show(df_sensor_boxcox, df_sus_aggregated):
     </div>
     """, unsafe_allow_html=True)
     
+    # --- NOVA SEÇÃO: Correlação com Defasagem (dados diários) ---
+    if df_sensor is not None and df_sus is not None:
+        etapa('defasagens')
+        mostrar_defasagens(df_sensor, df_sus)
+    
     # --- NOVA SEÇÃO: Análise Individual por Poluente ---
+    etapa('análise individual')
     st.header("🔍 Análise Individual por Poluente")
 
     # Dicionário de poluentes básicos disponíveis
@@ -275,67 +269,64 @@ def show(df_sensor_boxcox, df_sus_aggregated):
     if poluente_selecionado == 'pm2_5' and df_merged['pm2_5'].isnull().any():
         st.warning("⚠️ O poluente PM2.5 contém valores vazios e não pode ser plotado.")
     else:
-        # Criação do gráfico de dispersão
-        plt.figure(figsize=(12, 7))
+        # Gráfico de dispersão interativo (WebGL quando há muitos pontos, ver utils/charts.py)
+        fig = go.Figure()
         
-        # Scatter plot
-        plt.scatter(
-            x=df_merged[poluente_selecionado],
-            y=df_merged['num_internacoes'],
-            color='#1f77b4',  # Azul padrão do matplotlib
-            s=60,
-            alpha=0.7,
-            edgecolor='white',
-            linewidth=0.8,
-            label='Dados Observados'
-        )
+        fig.add_trace(scatter(
+            df_merged[poluente_selecionado],
+            df_merged['num_internacoes'],
+            mode='markers',
+            name='Dados Observados',
+            marker=dict(color='#1f77b4', size=9, opacity=0.7, line=dict(color='white', width=0.8))
+        ))
         
-        # Linha de tendência (regressão linear)
-        from sklearn.linear_model import LinearRegression
-        X = df_merged[[poluente_selecionado]].dropna()
-        y = df_merged.loc[X.index, 'num_internacoes']
+        # Linha de tendência (regressão linear) com intervalo de confiança de 95%
+        regressao = regressao_linear(df_merged, poluente_selecionado)
         
-        if not X.empty:
-            reg = LinearRegression().fit(X, y)
-            y_pred = reg.predict(X)
+        if regressao is not None:
+            linha = regressao['linha']
             
-            plt.plot(X, y_pred, 
-                    color='#d62728',  # Vermelho padrão
-                    linewidth=2.5, 
-                    linestyle='--',
-                    label=f'Linha de Tendência (R²={reg.score(X,y):.2f})')
+            fig.add_trace(scatter(
+                pd.concat([linha['x'], linha['x'][::-1]]),
+                pd.concat([linha['ic_superior'], linha['ic_inferior'][::-1]]),
+                fill='toself',
+                fillcolor='rgba(214, 39, 40, 0.2)',
+                line=dict(width=0),
+                hoverinfo='skip',
+                showlegend=False
+            ))
             
-            # Intervalo de confiança
-            sns.regplot(x=X[poluente_selecionado], y=y,
-                        scatter=False, ci=95,
-                        line_kws={'color':'#d62728', 'alpha':0.2})
+            fig.add_trace(scatter(
+                linha['x'],
+                linha['previsto'],
+                mode='lines',
+                name=f'Linha de Tendência (R²={regressao["r2"]:.2f})',
+                line=dict(color='#d62728', width=2.5, dash='dash')
+            ))
             
             # Estatísticas
-            correlacao = X[poluente_selecionado].corr(y)
-            stats_text = f'''
-            Estatísticas:
-            Correlação: {correlacao:.2f}
-            Equação: y = {reg.coef_[0]:.2f}x + {reg.intercept_:.2f}
-            '''
-            plt.gcf().text(0.15, 0.82, stats_text,
-                        bbox=dict(facecolor='white', alpha=0.8, 
-                                    edgecolor='lightgray'),
-                        fontsize=10)
+            fig.add_annotation(
+                text=(f"<b>Estatísticas:</b><br>Correlação: {regressao['correlacao']:.2f}<br>"
+                      f"Equação: y = {regressao['coeficiente']:.2f}x + {regressao['intercepto']:.2f}"),
+                xref='paper', yref='paper', x=0.02, y=0.98, xanchor='left', yanchor='top',
+                showarrow=False, align='left', bgcolor='rgba(255, 255, 255, 0.8)', bordercolor='lightgray'
+            )
         
         # Formatação
-        plt.xlabel(f'Concentração de {poluentes_basicos[poluente_selecionado]}', 
-                fontsize=12, fontweight='bold')
-        plt.ylabel('Número de Internações', fontsize=12, fontweight='bold')
-        plt.title(f'Relação entre {poluentes_basicos[poluente_selecionado]} e Internações',
-                fontsize=14, pad=15, fontweight='bold')
-        
-        plt.grid(True, linestyle=':', alpha=0.4)
-        plt.legend(loc='upper right', framealpha=1)
-        plt.tight_layout()
+        fig.update_layout(
+            title=f'<b>Relação entre {poluentes_basicos[poluente_selecionado]} e Internações</b>',
+            xaxis_title=f'<b>Concentração de {poluentes_basicos[poluente_selecionado]}</b>',
+            yaxis_title='<b>Número de Internações</b>',
+            height=550,
+            legend=dict(x=0.98, y=0.98, xanchor='right', yanchor='top', bgcolor='white')
+        )
+        fig.update_xaxes(showgrid=True, gridcolor='lightgray', griddash='dot')
+        fig.update_yaxes(showgrid=True, gridcolor='lightgray', griddash='dot')
         
-    st.pyplot(plt)
+        st.plotly_chart(fig, use_container_width=True)
     
     # --- NOVA SEÇÃO: Gráficos Individuais com Plotly ---
+    etapa('gráficos individuais')
     st.header("📊 Análise Temporal por Poluente (Interativa)")
 
     # Dicionário de poluentes disponíveis
@@ -373,6 +364,12 @@ def show(df_sensor_boxcox, df_sus_aggregated):
             'o3_scaled': 'pentagon'
         }
         
+        # Média de cada poluente no período (linhas tracejadas)
+        medias_poluentes = medias(df_merged, poluentes_selecionados)
+        
+        # Séries longas vão reduzidas ao navegador (mesmos meses em todas as curvas)
+        df_grafico = reduzir(df_merged, None, poluentes_selecionados + ['num_internacoes'])
+        
         # Criar um gráfico para cada poluente selecionado
         for poluente in poluentes_selecionados:
             nome_amigavel = poluentes_disponiveis[poluente]
@@ -382,9 +379,9 @@ def show(df_sensor_boxcox, df_sus_aggregated):
             
             # Adicionar poluente (eixo primário)
             fig.add_trace(
-                go.Scatter(
-                    x=df_merged['mes_ano'],
-                    y=df_merged[poluente],
+                scatter(
+                    df_grafico['mes_ano'],
+                    df_grafico[poluente],
                     name=nome_amigavel,
                     line=dict(color=cores_poluentes[poluente], width=2),
                     marker=dict(
@@ -398,7 +395,7 @@ def show(df_sensor_boxcox, df_sus_aggregated):
             )
             
             # Adicionar linha de média do poluente
-            media_poluente = df_merged[poluente].mean()
+            media_poluente = medias_poluentes[poluente]
             fig.add_hline(
                 y=media_poluente,
                 line_dash="dot",
@@ -410,9 +407,9 @@ def show(df_sensor_boxcox, df_sus_aggregated):
             
             # Adicionar internações (eixo secundário)
             fig.add_trace(
-                go.Scatter(
-                    x=df_merged['mes_ano'],
-                    y=df_merged['num_internacoes'],
+                scatter(
+                    df_grafico['mes_ano'],
+                    df_grafico['num_internacoes'],
                     name='Internações Respiratórias',
                     line=dict(color='#FF0000', width=3),
                     marker=dict(
@@ -581,6 +578,7 @@ def show(df_sensor_boxcox, df_sus_aggregated):
         # """, unsafe_allow_html=True)
         
         # --- NOVA SEÇÃO: Gráfico Consolidado Interativo ---
+        etapa('visão consolidada')
         st.header("📊 Visão Consolidada Interativa")
 
         # Criar figura com eixo secundário
@@ -597,9 +595,9 @@ def show(df_sensor_boxcox, df_sus_aggregated):
 
         for poluente in poluentes_selecionados:
                 fig.add_trace(
-                        go.Scatter(
-                                x=df_merged['mes_ano'],
-                                y=df_merged[poluente],
+                        scatter(
+                                df_grafico['mes_ano'],
+                                df_grafico[poluente],
                                 name=poluentes_disponiveis[poluente],
                                 line=dict(color=cores_plotly[poluente], width=2),
                                 mode='lines+markers',
@@ -610,7 +608,7 @@ def show(df_sensor_boxcox, df_sus_aggregated):
                 
                 # Linha de média
                 fig.add_hline(
-                        y=df_merged[poluente].mean(),
+                        y=medias_poluentes[poluente],
                         line_dash="dot",
                         line_color=cores_plotly[poluente],
                         opacity=0.5,
@@ -620,9 +618,9 @@ def show(df_sensor_boxcox, df_sus_aggregated):
 
         # Adicionar internações (eixo secundário)
         fig.add_trace(
-                go.Scatter(
-                        x=df_merged['mes_ano'],
-                        y=df_merged['num_internacoes'],
+                scatter(
+                        df_grafico['mes_ano'],
+                        df_grafico['num_internacoes'],
                         name='Internações',
                         line=dict(color='#FF0000', width=3),
                         mode='lines+markers',
@@ -652,4 +650,55 @@ def show(df_sensor_boxcox, df_sus_aggregated):
 
         
     
-    st.write("Gráficos de correlação e análises estatísticas...")
\ No newline at end of file
+    st.write("Gráficos de correlação e análises estatísticas...")
+
+def mostrar_defasagens(df_sensor, df_sus):
+    """Heatmap da correlação entre cada variável no dia t e as internações no dia t + defasagem"""
+    st.header("⏳ Correlação com Defasagem")
+    st.markdown(f"""
+    O efeito da poluição nas internações pode aparecer alguns dias depois. Cada célula é a correlação
+    entre a média diária da variável e o número de internações **k dias depois** (k de 0 a {DEFASAGEM_MAXIMA}),
+    usando os dias em que os dois têm dados.
+    """)
+
+    variaveis = [v for v in VARIAVEIS_CORRELACAO if v in df_sensor.columns]
+    correlacoes = correlacao_defasada(df_sensor, internacoes_por_dia(df_sus), variaveis)
+    if correlacoes.empty:
+        st.warning("Não há dias em comum entre os sensores e as internações.")
+        return
+
+    estacao_selecionada = st.selectbox(
+        'Selecione a estação (ou a média da cidade):',
+        options=list(correlacoes['nome_estacao'].unique()),
+        key='estacao_defasagem'
+    )
+    matriz = matriz_defasagens(correlacoes, estacao_selecionada, variaveis)
+    nomes = [NOMES_CORRELACAO[v] for v in matriz.index]
+
+    fig = go.Figure(data=go.Heatmap(
+        z=matriz.values,
+        x=matriz.columns,
+        y=nomes,
+        colorscale='RdBu_r',
+        zmin=-1,
+        zmax=1,
+        hoverongaps=False,
+        colorbar=dict(title='Correlação', thickness=15, len=0.75),
+        hovertemplate="<b>%{y}</b><br>Defasagem: %{x} dias<br>Correlação: %{z:.3f}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f'<b>Correlação com as internações k dias depois — {estacao_selecionada}</b>',
+        xaxis_title='Defasagem (dias)',
+        yaxis=dict(autorange='reversed'),
+        height=500,
+        margin=dict(l=100, r=50, t=80, b=50)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Defasagem de maior correlação (em valor absoluto) por variável
+    picos = pico_por_variavel(correlacoes, estacao_selecionada)
+    with st.expander("📊 Defasagem de maior correlação por variável"):
+        st.dataframe(picos.assign(variavel=picos['variavel'].map(NOMES_CORRELACAO))
+                     .rename(columns={'variavel': 'Variável', 'defasagem': 'Defasagem (dias)',
+                                      'correlacao': 'Correlação', 'n': 'Dias em comum'}),
+                     hide_index=True)
@@ -1,13 +1,7 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
-import numpy as np
-from scipy import stats
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pages.sensores.Geral as geral
-import pages.sensores.Estacoes as estacoes_page
+from utils.profiling import perfilar
 
 def aggregate_general_data(df, poluentes):
     """Agrega dados de todas as estações para a opção 'Geral'"""
@@ -16,9 +10,12 @@ def aggregate_general_data(df, poluentes):
     df_agg['nome_estacao'] = 'GERAL (Média RJ)'
     return df_agg
 
-def show(df_sensor, POLUENTES_TRADUCAO, month_names):
+@perfilar('Análise de Sensores')
+def show(df_sensor, POLUENTES_TRADUCAO, month_names, rollup=None, janelas=None, horario=None, consultas=None):
     st.title("🏭 Análise Comparativa de Sensores Ambientais")
-    df_sensor['ano'] = df_sensor['ano'].astype(int)
+    # Com o backend DuckDB (consultas), a página não recebe o DataFrame dos sensores
+    if df_sensor is not None:
+        df_sensor['ano'] = df_sensor['ano'].astype(int)
     
     # Adicionando informações sobre o dataset
     with st.expander("ℹ️ Sobre os dados"):
@@ -62,7 +59,11 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         st.header("⚙️ Configurações de Filtro")
         
         # Seleção de estações (incluindo opção 'Geral')
-        estacoes = sorted(df_sensor['nome_estacao'].unique())
+        if consultas is not None:
+            import analytics.sensores_sql as sensores_sql
+            estacoes = sensores_sql.estacoes(consultas)
+        else:
+            estacoes = sorted(df_sensor['nome_estacao'].unique())
         selected_estacoes = st.multiselect(
             'Selecione as estações para comparação:', 
             ['GERAL (Média RJ)'] + estacoes,
@@ -72,7 +73,7 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         
     if 'GERAL (Média RJ)' in selected_estacoes:
         st.warning("A opção 'GERAL (Média RJ)' agregará os dados de todas as estações.")
-        geral.show(df_sensor, POLUENTES_TRADUCAO, month_names)
+        geral.show(df_sensor, POLUENTES_TRADUCAO, month_names, rollup, janelas, horario, consultas)
     elif 'GERAL (Média RJ)' not in selected_estacoes:
         st.error("Comparação entre estações não foi implementada ainda. Apenas a opção 'GERAL (Média RJ)' está disponível no momento.")
         # estacoes_page.show(df_sensor, POLUENTES_TRADUCAO, month_names, selected_estacoes)
@@ -4,13 +4,35 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
+from utils.rollup import build_rollup
+from utils.time_index import date_bounds
+import analytics.sensores as sensores
+from analytics.sensores import METEOROLOGICAS, filtrar_periodo, estatisticas_do_dia, descrever_periodo
+from analytics.downsampling import reduzir, recortar_intervalo
+from utils.config import DOWNSAMPLE_POINTS
+from utils.charts import scatter
+from utils.profiling import perfilar, etapa
+from utils.hourly_store import intervalo, serie_horaria, perfil_diurno
 
-def show(df_sensor, POLUENTES_TRADUCAO, month_names):
+@perfilar('Geral')
+def show(df_sensor, POLUENTES_TRADUCAO, month_names, rollup=None, janelas=None, horario=None, consultas=None):
     """Mostra análises agregadas para toda a cidade (média das estações)"""
     
+    if consultas is not None:
+        # Backend DuckDB (QUALIAR_BACKEND=duckdb): cada análise é uma consulta SQL sobre os arquivos
+        import analytics.sensores_sql as calculos
+        fonte = fonte_diaria = fonte_janelas = consultas
+    else:
+        # Mapa, série temporal, comparação e métricas são consultas ao cubo pré-agregado
+        calculos = sensores
+        if rollup is None:
+            rollup = build_rollup(df_sensor, list(POLUENTES_TRADUCAO.keys()))
+        fonte, fonte_diaria, fonte_janelas = rollup, df_sensor, janelas
+    
     st.title("🌆 Análise Avançada da Qualidade do Ar - Rio de Janeiro")
     
     # ---- FILTROS ----
+    etapa('filtros')
     with st.expander("🔍 Filtros", expanded=True):
         col1, col2, col3 = st.columns(3)
         
@@ -26,7 +48,10 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         
         with col2:
             # Seleção de anos com opção "Todos"
-            available_years = sorted(df_sensor['ano'].unique())
+            if consultas is not None:
+                available_years = calculos.anos_disponiveis(consultas)
+            else:
+                available_years = sorted(rollup['ano'].index.get_level_values('ano').unique())
             year_options = ['Todos'] + available_years
             selected_years = st.multiselect(
                 'Selecione os anos:', 
@@ -57,10 +82,8 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         col4, col5 = st.columns(2)
         
         with col4:
-            # Converter para datetime para usar no date_input
-            df_sensor['data_formatada'] = pd.to_datetime(df_sensor['data_formatada'])
-            min_date = df_sensor['data_formatada'].min()
-            max_date = df_sensor['data_formatada'].max()
+            # df_sensor vem ordenado por data (datetime64) do loader
+            min_date, max_date = calculos.limites_datas(consultas) if consultas is not None else date_bounds(df_sensor)
             
             selected_date = st.date_input(
                 "Selecione uma data específica (opcional):",
@@ -76,26 +99,17 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         return
     
     # ---- PRÉ-PROCESSAMENTO ----
-    # Filtra por anos selecionados (se não for "Todos")
-    if selected_years:
-        df_filtered = df_sensor[df_sensor['ano'].isin(selected_years)].copy()
-    else:
-        df_filtered = df_sensor.copy()
-    
-    # Filtra por meses se algum foi selecionado e não for "Todos"
-    if selected_months:
-        df_filtered = df_filtered[df_filtered['mes'].isin(selected_months)]
-    
+    etapa('pré-processamento')
     # Verifica se há uma data específica selecionada
     if selected_date:
-        # Converte para datetime64[ns] para compatibilidade
         selected_date = pd.to_datetime(selected_date)
-        df_specific_day = df_filtered[df_filtered['data_formatada'] == selected_date]
+        df_specific_day = calculos.dados_do_dia(fonte_diaria, selected_date, selected_years, selected_months)
         
         if not df_specific_day.empty:
             st.success(f"Mostrando dados para {selected_date.strftime('%d/%m/%Y')}")
             
             # ---- VISUALIZAÇÃO DOS DADOS DO DIA ESPECÍFICO ----
+            etapa('dia específico')
             st.subheader(f"📊 Análise Detalhada para {selected_date.strftime('%d/%m/%Y')}")
             
             # Selecionar estação para análise
@@ -124,16 +138,7 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
                 st.subheader("Estatísticas do Dia")
                 
                 # Calcular estatísticas para cada poluente
-                stats_list = []
-                for poluente in selected_poluentes:
-                    stats = df_station_day[poluente].describe().to_dict()
-                    stats['Poluente'] = POLUENTES_TRADUCAO[poluente]
-                    stats_list.append(stats)
-                
-                # Criar DataFrame de estatísticas
-                df_stats = pd.DataFrame(stats_list)
-                df_stats = df_stats[['Poluente', 'count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']]
-                df_stats.columns = ['Poluente', 'Contagem', 'Média', 'Desvio Padrão', 'Mínimo', '25%', 'Mediana', '75%', 'Máximo']
+                df_stats = estatisticas_do_dia(df_station_day, selected_poluentes, POLUENTES_TRADUCAO)
                 
                 # Mostrar tabela de estatísticas
                 st.dataframe(
@@ -167,15 +172,20 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         else:
             st.warning("Nenhum dado encontrado para a data selecionada. Mostrando análise agregada.")
             
-    # Verifica e converte variáveis meteorológicas para numérico
-    for var in ['temp', 'chuva', 'ur'] + selected_poluentes:
-        if var in df_filtered.columns:
-            df_filtered[var] = pd.to_numeric(df_filtered[var], errors='coerce')
+    # Filtra por anos e, se algum foi selecionado, por meses, com as variáveis em numérico (no SQL, o filtro vai na consulta)
+    if consultas is None:
+        df_filtered = filtrar_periodo(df_sensor, selected_years, selected_months, METEOROLOGICAS + selected_poluentes)
     
     # ---- VISUALIZAÇÕES ----
-    tab1, tab2, tab3, tab4 = st.tabs(["🗺️ Mapa de Distribuição", "📈 Série Temporal", "🏭 Comparação entre Estações", "🔗 Correlações"])
+    abas = ["🗺️ Mapa de Distribuição", "📈 Série Temporal", "🏭 Comparação entre Estações", "🔗 Correlações",
+            "⏱️ Médias Móveis"]
+    # A aba horária só existe no modo horário (QUALIAR_HOURLY=1)
+    if horario is not None:
+        abas.append("🕐 Horário")
+    tab1, tab2, tab3, tab4, tab5, *tab_horario = st.tabs(abas)
     
     with tab1:
+        etapa('mapa')
         st.subheader("Distribuição Espacial dos Poluentes")
         
         # Selecionar um poluente para o mapa
@@ -186,8 +196,8 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
             key='poluente_mapa_select'
         )
         
-        # Agrupar por estação para o mapa
-        df_map = df_filtered.groupby(['nome_estacao', 'latitude', 'longitude'])[poluente_mapa].mean().reset_index()
+        # Média por estação no período, com as coordenadas de cada estação
+        df_map = calculos.media_por_estacao(fonte, selected_years, selected_months, poluente_mapa)
         
         sizes = np.sqrt(df_map[poluente_mapa])
         sizes = sizes.replace([np.inf, -np.inf], np.nan).fillna(1)
@@ -217,22 +227,40 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         """)
     
     with tab2:
+        etapa('série temporal')
         st.subheader("Série Temporal dos Poluentes")
         
-        # Agrupar por data para a série temporal
-        df_ts = df_filtered.groupby(['data_formatada'])[selected_poluentes].mean().reset_index()
-        df_ts['data_formatada'] = pd.to_datetime(df_ts['data_formatada'])
+        # Média diária entre as estações
+        df_ts = calculos.serie_temporal(fonte, selected_years, selected_months, selected_poluentes)
+        
+        # Séries longas são reduzidas a DOWNSAMPLE_POINTS pontos; aproximar um intervalo
+        # recorta a série e a reduz de novo (com todos os pontos, se couber no limite)
+        if len(df_ts) > DOWNSAMPLE_POINTS:
+            primeira, ultima = df_ts['data_formatada'].iloc[0].date(), df_ts['data_formatada'].iloc[-1].date()
+            zoom = st.slider(
+                'Intervalo exibido:',
+                min_value=primeira,
+                max_value=ultima,
+                value=(primeira, ultima),
+                format='DD/MM/YYYY',
+                key='zoom_serie_temporal'
+            )
+            df_ts = recortar_intervalo(df_ts, 'data_formatada', zoom[0], zoom[1])
+            if len(df_ts) > DOWNSAMPLE_POINTS:
+                st.caption(f"{len(df_ts)} dias no intervalo: os gráficos mostram {DOWNSAMPLE_POINTS} pontos escolhidos "
+                           "preservando picos e vales. Diminua o intervalo para ver todos os dias.")
         
         # Criar um gráfico para cada poluente
         for poluente in selected_poluentes:
             st.markdown(f"### {POLUENTES_TRADUCAO[poluente]}")
+            df_plot = reduzir(df_ts, 'data_formatada', poluente)
             
             # Criar gráfico de série temporal individual
             fig = go.Figure()
             
-            fig.add_trace(go.Scatter(
-                x=df_ts['data_formatada'],
-                y=df_ts[poluente],
+            fig.add_trace(scatter(
+                df_plot['data_formatada'],
+                df_plot[poluente],
                 name=POLUENTES_TRADUCAO[poluente],
                 mode='lines+markers',
                 line=dict(width=2)
@@ -257,6 +285,7 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         """)
     
     with tab3:
+        etapa('comparação entre estações')
         st.subheader("Comparação entre Estações de Monitoramento")
         
         # Selecionar um poluente para comparação
@@ -268,8 +297,7 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         )
         
         # Agrupar por estação
-        df_estacoes = df_filtered.groupby('nome_estacao')[poluente_comp].agg(['mean', 'max', 'min']).reset_index()
-        df_estacoes = df_estacoes.sort_values('mean', ascending=False)
+        df_estacoes = calculos.comparacao_estacoes(fonte, selected_years, selected_months, poluente_comp)
         
         # Criar gráfico de barras
         fig = px.bar(df_estacoes, 
@@ -289,13 +317,14 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
                     use_container_width=True)
     
     with tab4:
+        etapa('correlações')
         st.subheader("Análise de Correlação entre Variáveis")
         
-        # Selecionar variáveis para correlação
-        variaveis_corr = ['temp', 'ur', 'chuva'] + selected_poluentes
-        # Remover duplicatas mantendo a ordem
-        variaveis_corr = list(dict.fromkeys(variaveis_corr))
-        df_corr = df_filtered[variaveis_corr].corr()
+        # Correlação entre variáveis meteorológicas e poluentes selecionados
+        if consultas is not None:
+            df_corr = calculos.matriz_correlacao(consultas, selected_years, selected_months, selected_poluentes)
+        else:
+            df_corr = calculos.matriz_correlacao(df_filtered, selected_poluentes)
         
         # Mapear nomes para exibição
         cols_display = [POLUENTES_TRADUCAO.get(col, col) for col in df_corr.columns]
@@ -324,35 +353,82 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
         - Umidade vs Material Particulado: correlação negativa comum
         """)
 
+    with tab5:
+        etapa('médias móveis')
+        st.subheader("Maiores Médias Móveis do Dia por Estação")
+        
+        if fonte_janelas is None:
+            st.info("Os máximos diários das médias móveis não foram carregados.")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                poluente_janela = st.selectbox(
+                    'Selecione o poluente:',
+                    options=selected_poluentes,
+                    format_func=lambda x: POLUENTES_TRADUCAO[x],
+                    key='poluente_medias_moveis'
+                )
+            with col2:
+                janela = st.radio('Janela:', ['1h', '8h', '24h'], index=1, horizontal=True, key='janela_medias_moveis')
+            
+            df_janela = calculos.maximos_medias_moveis(fonte_janelas, selected_years, selected_months, poluente_janela, janela)
+            
+            fig = go.Figure()
+            for estacao in df_janela.columns:
+                serie = reduzir(df_janela[[estacao]].dropna().reset_index(), 'data_formatada', estacao)
+                fig.add_trace(scatter(serie['data_formatada'], serie[estacao], name=estacao, mode='lines'))
+            
+            fig.update_layout(
+                xaxis_title='Data',
+                yaxis_title=f'Maior média de {janela} no dia',
+                hovermode='x unified',
+                height=450
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Dia e estação com a maior média no período
+            if df_janela.notna().any().any():
+                pico = df_janela.stack().idxmax()
+                st.metric(f"Maior média de {janela} no período",
+                          f"{df_janela.loc[pico]:.2f}",
+                          help=f"{pico[1]} em {pico[0].strftime('%d/%m/%Y')}")
+            
+            st.markdown("""
+            **Como ler:** cada ponto é a maior média das últimas 1, 8 ou 24 horas medidas
+            pela estação naquele dia (médias de 8h são as usadas para CO e Ozônio no índice
+            de qualidade do ar). Janelas com menos de 75% das horas medidas ficam de fora.
+            """)
+
+    if tab_horario:
+        with tab_horario[0]:
+            etapa('horário')
+            mostrar_horario(horario, selected_poluentes, selected_years, selected_months, POLUENTES_TRADUCAO)
+
     # ---- MÉTRICAS GERAIS ----
+    etapa('métricas')
     st.subheader("📊 Resumo do Período")
 
     # Determina o texto do período
-    if selected_months:
-        if len(selected_months) == len(month_names):
-            period_text = f"Todos os meses de {', '.join(map(str, selected_years))}"
-        else:
-            period_text = f"{', '.join([month_names[m] for m in selected_months])} de {', '.join(map(str, selected_years))}"
-    else:
-        period_text = f"Ano(s) {', '.join(map(str, selected_years))}"
+    period_text = descrever_periodo(selected_years, selected_months, month_names)
 
     st.markdown(f"**Período selecionado:** {period_text}")
 
     # Cria métricas para cada poluente selecionado
+    valores, n_dias = calculos.resumo_periodo(fonte, selected_years, selected_months, selected_poluentes)
     metrics = {}
     for poluente in selected_poluentes:
         if poluente in ['temp', 'ur']:
             # Para temperatura e umidade, mostra média com unidade
-            metrics[POLUENTES_TRADUCAO[poluente]] = f"{df_filtered[poluente].mean():.1f} {'°C' if poluente == 'temp' else '%'}"
+            metrics[POLUENTES_TRADUCAO[poluente]] = f"{valores[poluente]:.1f} {'°C' if poluente == 'temp' else '%'}"
         elif poluente == 'chuva':
             # Para chuva, mostra acumulado
-            metrics[POLUENTES_TRADUCAO[poluente]] = f"{df_filtered[poluente].sum():.1f} mm"
+            metrics[POLUENTES_TRADUCAO[poluente]] = f"{valores[poluente]:.1f} mm"
         else:
             # Para poluentes, mostra média com unidade
-            metrics[POLUENTES_TRADUCAO[poluente]] = f"{df_filtered[poluente].mean():.1f} {POLUENTES_TRADUCAO[poluente].split('(')[-1].split(')')[0]}"
+            metrics[POLUENTES_TRADUCAO[poluente]] = f"{valores[poluente]:.1f} {POLUENTES_TRADUCAO[poluente].split('(')[-1].split(')')[0]}"
 
     # Adiciona métrica de dias analisados
-    metrics['Dias Analisados'] = len(df_filtered['data_formatada'].unique())
+    metrics['Dias Analisados'] = n_dias
 
     # Organiza em colunas (4 métricas por linha)
     num_metrics = len(metrics)
@@ -371,4 +447,83 @@ def show(df_sensor, POLUENTES_TRADUCAO, month_names):
                     num_value = float(value.split()[0])
                     col.metric(name, value, delta=f"{num_value:.1f}")
                 except:
-                    col.metric(name, value)
\ No newline at end of file
+                    col.metric(name, value)
+
+
+def mostrar_horario(horario, selected_poluentes, selected_years, selected_months, POLUENTES_TRADUCAO):
+    """Perfil diurno e medições hora a hora, lidos do armazém horário mapeado em memória"""
+    st.subheader("Medições Hora a Hora")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        poluente_horario = st.selectbox(
+            'Selecione o poluente:',
+            options=selected_poluentes,
+            format_func=lambda x: POLUENTES_TRADUCAO[x],
+            key='poluente_horario'
+        )
+    with col2:
+        estacoes_horario = st.multiselect(
+            'Estações:',
+            options=horario['estacoes'],
+            default=horario['estacoes'],
+            key='estacoes_horario'
+        )
+    
+    if not estacoes_horario:
+        st.warning("Selecione pelo menos uma estação.")
+        return
+    
+    # Perfil diurno: cada hora do dia no período dos filtros
+    estatistica = st.radio('Perfil diurno:', ['media', 'maximo'], horizontal=True,
+                           format_func={'media': 'Média', 'maximo': 'Máximo'}.get, key='estatistica_perfil_diurno')
+    df_perfil = perfil_diurno(horario, poluente_horario, selected_years, selected_months, estacoes_horario, estatistica)
+    
+    fig = go.Figure()
+    for estacao in df_perfil.columns:
+        fig.add_trace(go.Scatter(x=df_perfil.index, y=df_perfil[estacao], name=estacao, mode='lines+markers'))
+    fig.update_layout(
+        title=f'Perfil Diurno de {POLUENTES_TRADUCAO[poluente_horario]}',
+        xaxis=dict(title='Hora do dia', tickmode='linear', dtick=2),
+        yaxis_title='Concentração',
+        hovermode='x unified',
+        height=400
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Janela hora a hora (até 31 dias), para os picos de exposição
+    primeira, ultima = intervalo(horario)
+    fim_padrao = min(pd.Timestamp(max(selected_years), 12, 31), ultima.normalize())
+    inicio_padrao = max(fim_padrao - pd.Timedelta(days=6), primeira)
+    periodo = st.date_input(
+        'Dias exibidos (até 31):',
+        value=(inicio_padrao.date(), fim_padrao.date()),
+        min_value=primeira.date(),
+        max_value=ultima.date(),
+        format='DD/MM/YYYY',
+        key='dias_horario'
+    )
+    if len(periodo) != 2:
+        st.info("Selecione o primeiro e o último dia.")
+        return
+    inicio = pd.Timestamp(periodo[0])
+    fim = min(pd.Timestamp(periodo[1]), inicio + pd.Timedelta(days=30)) + pd.Timedelta(days=1)
+    df_horas = serie_horaria(horario, poluente_horario, inicio, fim, estacoes_horario)
+    
+    fig = go.Figure()
+    for estacao in df_horas.columns:
+        fig.add_trace(scatter(df_horas.index, df_horas[estacao], name=estacao, mode='lines'))
+    fig.update_layout(
+        title=f'{POLUENTES_TRADUCAO[poluente_horario]} Hora a Hora',
+        xaxis_title='Data e hora',
+        yaxis_title='Concentração',
+        hovermode='x unified',
+        height=450
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Hora e estação com o maior valor na janela
+    if df_horas.notna().any().any():
+        pico = df_horas.stack().idxmax()
+        st.metric("Maior valor horário na janela", f"{df_horas.loc[pico]:.2f}",
+                  help=f"{pico[1]} em {pico[0].strftime('%d/%m/%Y %H:%M')}")
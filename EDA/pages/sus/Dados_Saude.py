@@ -4,8 +4,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
+from functools import partial
+from utils.profiling import perfilar, etapa
+import analytics.saude as saude
+import analytics.saude_indice as saude_indice
 
-def show(df_sus, df_sus_aggregated, month_names):
+@perfilar('Dados de Saúde')
+def show(df_sus, df_sus_aggregated, month_names, consultas=None, contagens=None, indice=None):
     st.title("🩺 Dados de Saúde - Internações por Doenças Respiratórias")
     
     # Adicionando informações sobre o dataset
@@ -21,16 +26,31 @@ def show(df_sus, df_sus_aggregated, month_names):
         """)
     
     # --- SEÇÃO 1: VISÃO GERAL ---
+    etapa('visão geral')
     st.header("📊 Visão Geral das Internações")
     
     # Criar colunas para os KPIs
     col1, col2, col3, col4 = st.columns(4)
     
+    if consultas is not None:
+        # Backend DuckDB (QUALIAR_BACKEND=duckdb): as internações ficam nos arquivos e cada gráfico é uma consulta SQL
+        import analytics.saude_sql as calculos
+        fonte = calculos.consulta(consultas)
+        df_sus_aggregated = calculos.internacoes_mensais(fonte)
+        tabelas = calculos.contagens(fonte)
+    else:
+        # Faixa etária e descrição do sexo já vêm do loader; as tabelas das abas também (load_sus_counts)
+        tabelas = contagens if contagens is not None else saude.contagens(df_sus)
+        # Os filtros interativos selecionam linhas pelo índice de bitmaps (load_sus_index), sem copiar o DataFrame
+        calculos = saude_indice
+        fonte = calculos.consulta(df_sus, indice if indice is not None else calculos.indexar(df_sus))
+    
     # Calcular métricas
-    total_internacoes = df_sus.shape[0]
-    media_idade = df_sus['IDADE'].mean()
-    taxa_mortalidade = df_sus['MORTE'].mean() * 100
-    media_permanencia = df_sus['DIAS_PERM'].mean()
+    geral = tabelas['indicadores']
+    total_internacoes = geral['total_internacoes']
+    media_idade = geral['media_idade']
+    taxa_mortalidade = geral['taxa_mortalidade']
+    media_permanencia = geral['media_permanencia']
     
     # Exibir KPIs
     col1.metric("Total de Internações", f"{total_internacoes:,}".replace(",", "."))
@@ -39,6 +59,7 @@ def show(df_sus, df_sus_aggregated, month_names):
     col4.metric("Média de Permanência", f"{media_permanencia:.1f} dias")
     
     # --- SEÇÃO 2: ANÁLISE TEMPORAL ---
+    etapa('análise temporal')
     st.header("📈 Análise Temporal")
     
     # Gráfico de linhas - Internações por mês/ano
@@ -65,16 +86,12 @@ def show(df_sus, df_sus_aggregated, month_names):
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Por Idade", "Por Sexo", "Por Diagnóstico", "Mortalidade", "Top Causas de Morte"])
     
     with tab1:
+        etapa('por idade')
         # Análise por idade
         st.subheader("Distribuição por Idade")
         
-        # Criar faixas etárias
-        bins = [0, 5, 12, 18, 30, 50, 65, 100]
-        labels = ['0-5', '6-12', '13-18', '19-30', '31-50', '51-65', '66+']
-        df_sus['faixa_etaria'] = pd.cut(df_sus['IDADE'], bins=bins, labels=labels, right=False)
-        
         # Agrupar por faixa etária
-        df_idade = df_sus.groupby('faixa_etaria').size().reset_index(name='count')
+        df_idade = tabelas['faixa_etaria']
         
         # Gráfico de barras
         fig = px.bar(df_idade, 
@@ -86,15 +103,12 @@ def show(df_sus, df_sus_aggregated, month_names):
         st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
+        etapa('por sexo')
         # Análise por sexo
         st.subheader("Distribuição por Sexo")
         
-        # Traduzir códigos de sexo
-        sexo_map = {1: 'Masculino', 3: 'Feminino'}
-        df_sus['sexo_desc'] = df_sus['SEXO'].map(sexo_map)
-        
         # Agrupar por sexo
-        df_sexo = df_sus.groupby('sexo_desc').size().reset_index(name='count')
+        df_sexo = tabelas['sexo']
         
         # Gráfico de pizza
         fig = px.pie(df_sexo, 
@@ -106,12 +120,12 @@ def show(df_sus, df_sus_aggregated, month_names):
         st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
+        etapa('por diagnóstico')
         # Análise por diagnóstico
         st.subheader("Principais Diagnósticos")
         
         # Contar diagnósticos principais
-        top_diag = df_sus['DIAG_PRINC'].value_counts().head(10).reset_index()
-        top_diag.columns = ['diagnostico', 'count']
+        top_diag = saude.top_diagnosticos(tabelas['diagnosticos'], 10)
         
         # Gráfico de barras horizontais
         fig = px.bar(top_diag, 
@@ -125,17 +139,12 @@ def show(df_sus, df_sus_aggregated, month_names):
         st.plotly_chart(fig, use_container_width=True)
     
     with tab4:
+        etapa('mortalidade')
         # Análise de mortalidade
         st.subheader("Análise de Mortalidade")
         
         # Agrupar por mês/ano e calcular taxa de mortalidade
-        df_mortalidade = df_sus.groupby(['ANO_CMPT', 'MES_CMPT']).agg(
-            total_internacoes=('MORTE', 'size'),
-            total_obitos=('MORTE', 'sum')
-        ).reset_index()
-        
-        df_mortalidade['taxa_mortalidade'] = (df_mortalidade['total_obitos'] / df_mortalidade['total_internacoes']) * 100
-        df_mortalidade['mes_ano'] = df_mortalidade['ANO_CMPT'].astype(str) + '-' + df_mortalidade['MES_CMPT'].astype(str)
+        df_mortalidade = tabelas['mortalidade']
         
         # Gráfico de linhas
         fig = px.line(df_mortalidade, 
@@ -148,27 +157,13 @@ def show(df_sus, df_sus_aggregated, month_names):
         st.plotly_chart(fig, use_container_width=True)
     
     with tab5:
+      etapa('top causas de morte')
       st.subheader("Top 10 Causas de Morte")
       
-      # Filtrar apenas óbitos e contar diagnósticos principais
-      df_obitos = df_sus[df_sus['MORTE'] == 1]
-      top_causas_morte = df_obitos['DIAG_PRINC'].value_counts().head(10).reset_index()
-      top_causas_morte.columns = ['diagnostico', 'obitos']
+      # Diagnósticos com mais óbitos, com o total de internações e a taxa de mortalidade
+      df_mortalidade_diag = saude.top_causas_morte(tabelas['diagnosticos'], 10)
       
-      if len(top_causas_morte) > 0:
-          # Calcular total de internações por diagnóstico (incluindo não-óbitos)
-          total_internacoes_diag = df_sus['DIAG_PRINC'].value_counts().reset_index()
-          total_internacoes_diag.columns = ['diagnostico', 'total_internacoes']
-          
-          # Juntar os dados
-          df_mortalidade_diag = pd.merge(top_causas_morte, total_internacoes_diag, on='diagnostico', how='left')
-          
-          # Calcular taxa de mortalidade
-          df_mortalidade_diag['taxa_mortalidade'] = (df_mortalidade_diag['obitos'] / df_mortalidade_diag['total_internacoes']) * 100
-          
-          # Ordenar por número de óbitos
-          df_mortalidade_diag = df_mortalidade_diag.sort_values('obitos', ascending=True)
-          
+      if len(df_mortalidade_diag) > 0:
           # Criar gráfico de barras
           fig = go.Figure()
           
@@ -212,34 +207,29 @@ def show(df_sus, df_sus_aggregated, month_names):
       else:
           st.warning("Não há registros de óbitos no período selecionado.")
     # --- SEÇÃO 4: FILTROS INTERATIVOS ---
+    etapa('filtros interativos')
     st.header("🎚️ Filtros Interativos")
     
     # Criar colunas para os filtros
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        anos = sorted(df_sus['ANO_CMPT'].unique())
+        anos = calculos.valores_distintos(fonte, 'ANO_CMPT')
         ano_selecionado = st.selectbox('Selecione o ano:', ['Todos'] + anos)
     
     with col2:
-        meses = sorted(df_sus['MES_CMPT'].unique())
+        meses = calculos.valores_distintos(fonte, 'MES_CMPT')
         mes_selecionado = st.selectbox('Selecione o mês:', ['Todos'] + meses, format_func=lambda x: month_names[x] if x != 'Todos' else x)
     
     with col3:
-        sexos = ['Todos'] + sorted(df_sus['SEXO'].unique())
+        sexos = ['Todos'] + calculos.valores_distintos(fonte, 'SEXO')
         sexo_selecionado = st.selectbox('Selecione o sexo:', sexos, format_func=lambda x: {1: 'Masculino', 2: 'Feminino', 3: 'Indeterminado'}.get(x, 'Todos'))
     
     # Aplicar filtros
-    df_filtrado = df_sus.copy()
-    
-    if ano_selecionado != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['ANO_CMPT'] == ano_selecionado]
-    
-    if mes_selecionado != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['MES_CMPT'] == mes_selecionado]
-    
-    if sexo_selecionado != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['SEXO'] == sexo_selecionado]
+    fonte_filtrada = calculos.filtrar(fonte,
+                                     ano=None if ano_selecionado == 'Todos' else ano_selecionado,
+                                     mes=None if mes_selecionado == 'Todos' else mes_selecionado,
+                                     sexo=None if sexo_selecionado == 'Todos' else sexo_selecionado)
     
     # Exibir estatísticas filtradas
     st.subheader("Estatísticas Filtradas")
@@ -247,10 +237,11 @@ def show(df_sus, df_sus_aggregated, month_names):
     # Criar colunas para os KPIs filtrados
     col1, col2, col3, col4 = st.columns(4)
     
-    total_filtrado = df_filtrado.shape[0]
-    media_idade_filtrado = df_filtrado['IDADE'].mean()
-    taxa_mortalidade_filtrado = df_filtrado['MORTE'].mean() * 100 if total_filtrado > 0 else 0
-    media_permanencia_filtrado = df_filtrado['DIAS_PERM'].mean()
+    filtrado = calculos.indicadores(fonte_filtrada)
+    total_filtrado = filtrado['total_internacoes']
+    media_idade_filtrado = filtrado['media_idade']
+    taxa_mortalidade_filtrado = filtrado['taxa_mortalidade']
+    media_permanencia_filtrado = filtrado['media_permanencia']
     
     col1.metric("Total de Internações", f"{total_filtrado:,}".replace(",", "."), delta=f"{total_filtrado - total_internacoes:,}" if total_filtrado != total_internacoes else None)
     col2.metric("Média de Idade", f"{media_idade_filtrado:.1f} anos", delta=f"{media_idade_filtrado - media_idade:.1f}" if total_filtrado != total_internacoes else None)
@@ -259,18 +250,19 @@ def show(df_sus, df_sus_aggregated, month_names):
     
     # Exibir dataframe filtrado
     with st.expander("🔎 Visualizar Dados Filtrados"):
-        st.dataframe(df_filtrado.head(100))
+        st.dataframe(calculos.amostra(fonte_filtrada, 100))
     
     # --- SEÇÃO 5: DOWNLOAD DOS DADOS ---
+    etapa('download')
     st.header("📥 Download dos Dados")
     
-    # Opções de download
+    # Opções de download: o CSV só é gerado quando o botão é clicado
     col1, col2 = st.columns(2)
     
     with col1:
         st.download_button(
             label="Baixar Dados Completos (CSV)",
-            data=df_sus.to_csv(index=False).encode('utf-8'),
+            data=partial(calculos.para_csv, fonte),
             file_name='internacoes_respiratorias_rj_completo.csv',
             mime='text/csv'
         )
@@ -278,7 +270,7 @@ def show(df_sus, df_sus_aggregated, month_names):
     with col2:
         st.download_button(
             label="Baixar Dados Filtrados (CSV)",
-            data=df_filtrado.to_csv(index=False).encode('utf-8'),
+            data=partial(calculos.para_csv, fonte_filtrada),
             file_name='internacoes_respiratorias_rj_filtrado.csv',
             mime='text/csv'
         )
\ No newline at end of file
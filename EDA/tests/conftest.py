@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do dashboard importam a partir de EDA/ (como com PYTHONPATH=EDA)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
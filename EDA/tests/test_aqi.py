@@ -0,0 +1,80 @@
+"""
+AQI vetorizado (`utils/aqi.py`) contra o loop valor a valor de `notebooks/air_quality_index.ipynb`.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from utils import aqi
+
+
+def _aqi_notebook(concentracao, breakpoints):
+    for c_low, c_high, i_low, i_high in breakpoints:
+        if c_low <= concentracao <= c_high:
+            return ((i_high - i_low) / (c_high - c_low)) * (concentracao - c_low) + i_low
+    return None
+
+
+def _classificar_notebook(valor):
+    for limite, classe in zip(aqi.AQI_LIMITES_CLASSES, aqi.AQI_CLASSES):
+        if valor <= limite:
+            return classe
+    return 'Invalid AQI'
+
+
+def _concentracoes(poluente):
+    # Bordas das faixas (e vizinhanças), lacunas entre faixas, negativos, acima da tabela e valores aleatórios
+    tabela = aqi.AQI_BREAKPOINTS[poluente]
+    bordas = np.concatenate([tabela[:, 0], tabela[:, 1]])
+    passo = bordas[bordas > 0].min() / 100
+    rng = np.random.default_rng(7)
+    aleatorios = rng.uniform(0, tabela[-1, 0] * 1.2, 500)
+    return np.concatenate([bordas, bordas - passo, bordas + passo, (tabela[1:, 0] + tabela[:-1, 1]) / 2,
+                           [-1.0, 0.0, tabela[-1, 1] * 2, np.nan], aleatorios])
+
+
+@pytest.mark.parametrize('poluente', aqi.AQI_POLUENTES)
+def test_sub_indice_igual_ao_loop(poluente):
+    concentracoes = _concentracoes(poluente)
+    esperado = np.array([_aqi_notebook(c, aqi.AQI_BREAKPOINTS[poluente]) for c in concentracoes], dtype='float64')
+    np.testing.assert_allclose(aqi.sub_indice(concentracoes, poluente), esperado, rtol=1e-12, equal_nan=True)
+
+
+def test_classificacao_igual_ao_loop():
+    valores = np.array([0, 50, 50.5, 100, 100.01, 150, 199.9, 200, 300, 301, 500, 500.1, 9999, -1, np.nan])
+    esperado = [_classificar_notebook(v) for v in valores]
+    assert list(aqi.classificar_aqi(valores)) == esperado
+
+
+def test_calcular_aqi():
+    rng = np.random.default_rng(8)
+    partes = []
+    for estacao in ['a', 'b']:
+        datas = pd.date_range('2019-01-01', periods=72, freq='h')
+        partes.append(pd.DataFrame({'nome_estacao': estacao, 'data': datas, 'data_formatada': datas.strftime('%Y-%m-%d'),
+                                    'pm2_5': rng.uniform(0, 80, 72), 'pm10': rng.uniform(0, 200, 72),
+                                    'co': rng.uniform(0, 12, 72), 'no2': rng.uniform(0, 400, 72),
+                                    'o3': rng.uniform(0, 250, 72), 'so2': rng.uniform(0, 400, 72)}))
+    df_horario = pd.concat(partes, ignore_index=True).sample(frac=1, random_state=9)
+    df_horario.loc[rng.choice(df_horario.index, 20, replace=False), 'o3'] = np.nan
+
+    resultado = aqi.calcular_aqi(df_horario)
+
+    # Referência: médias de 8h por estação com `rolling`, sub-índices pelo loop do notebook
+    ordenado = df_horario.sort_values(['nome_estacao', 'data'])
+    medias_8h = ordenado.groupby('nome_estacao').rolling('8h', on='data', min_periods=6)[['co', 'o3']].mean()
+    ordenado['co_8h'] = medias_8h['co'].to_numpy()
+    ordenado['o3_8h'] = aqi.ugm3_to_ppm(medias_8h['o3'].to_numpy(), 'o3')
+    ordenado['so2_ppm'] = aqi.ugm3_to_ppm(ordenado['so2'], 'so2')
+    esperado = ordenado.groupby(['nome_estacao', 'data_formatada']).agg(
+        pm2_5=('pm2_5', 'mean'), pm10=('pm10', 'mean'), co=('co_8h', 'max'),
+        no2=('no2', 'max'), o3=('o3_8h', 'max'), so2=('so2_ppm', 'max')).reset_index()
+    for poluente in aqi.AQI_POLUENTES:
+        esperado[f'aqi_{poluente}'] = [_aqi_notebook(c, aqi.AQI_BREAKPOINTS[poluente]) for c in esperado[poluente]]
+    colunas = [f'aqi_{poluente}' for poluente in aqi.AQI_POLUENTES]
+    esperado[colunas] = esperado[colunas].astype('float64')
+    esperado['aqi_final'] = esperado[colunas].max(axis=1)
+
+    pd.testing.assert_frame_equal(resultado[['nome_estacao', 'data_formatada'] + colunas + ['aqi_final']],
+                                  esperado[['nome_estacao', 'data_formatada'] + colunas + ['aqi_final']],
+                                  check_dtype=False, rtol=1e-10)
+    assert list(resultado['classificacao']) == [_classificar_notebook(v) for v in esperado['aqi_final']]
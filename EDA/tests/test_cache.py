@@ -0,0 +1,39 @@
+"""
+Impressão digital dos arquivos de origem (`utils/cache.py`).
+"""
+import os
+from utils import cache
+
+
+def _alterar(caminho, conteudo):
+    # Garante uma data de modificação diferente mesmo em sistemas de arquivos com pouca resolução
+    stat = os.stat(caminho)
+    with open(caminho, 'w') as arquivo:
+        arquivo.write(conteudo)
+    os.utime(caminho, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_sha256_so_e_recalculado_quando_o_arquivo_muda(tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'dados.csv')
+    with open(caminho, 'w') as arquivo:
+        arquivo.write('a,b\n1,2\n')
+    primeira = cache.fingerprint([caminho], 'sha256')
+
+    lidos = []
+    monkeypatch.setattr(cache, 'open', lambda path, *args: lidos.append(path) or open(path, *args), raising=False)
+    assert cache.fingerprint([caminho], 'sha256') == primeira
+    assert lidos == []
+
+    _alterar(caminho, 'a,b\n1,3\n')
+    assert cache.fingerprint([caminho], 'sha256') != primeira
+    assert lidos == [caminho]
+
+
+def test_mtime_muda_com_o_arquivo(tmp_path):
+    caminho = str(tmp_path / 'dados.csv')
+    with open(caminho, 'w') as arquivo:
+        arquivo.write('a,b\n1,2\n')
+    primeira = cache.fingerprint([caminho], 'mtime')
+    assert cache.fingerprint([caminho], 'mtime') == primeira
+    _alterar(caminho, 'a,b\n1,3\n')
+    assert cache.fingerprint([caminho], 'mtime') != primeira
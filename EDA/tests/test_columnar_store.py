@@ -0,0 +1,37 @@
+"""
+Armazenamento colunar (`utils/columnar_store.py`).
+"""
+import os
+import pandas as pd
+from utils import columnar_store
+
+
+def _medicoes(estacoes_anos):
+    linhas = [{'nome_estacao': estacao, 'data': f'{ano}-01-01 0{hora}:00:00', 'data_formatada': f'{ano}-01-01',
+               'ano': ano, 'mes': 1, **{var: float(hora) for var in columnar_store.POLUENTES_TRADUCAO}}
+              for estacao, ano in estacoes_anos for hora in range(3)]
+    return columnar_store.tipar_sensores(pd.DataFrame(linhas))
+
+
+def test_reconstrucao_remove_particoes_antigas(tmp_path):
+    path = str(tmp_path / 'sensores')
+    columnar_store.write_store(_medicoes([('A', 2020), ('B', 2021)]), path, columnar_store.SENSOR_PARTITIONING)
+    assert sorted(columnar_store.read_sensor_store(path=path)['nome_estacao'].unique()) == ['A', 'B']
+
+    columnar_store.write_store(_medicoes([('A', 2020)]), path, columnar_store.SENSOR_PARTITIONING)
+    df = columnar_store.read_sensor_store(path=path)
+    assert df['nome_estacao'].unique().tolist() == ['A']
+    assert len(df) == 3
+    assert not os.path.exists(os.path.join(path, 'nome_estacao=B'))
+    # Nenhuma pasta temporária fica para trás
+    assert os.listdir(tmp_path) == ['sensores']
+
+
+def test_leitura_com_filtro(tmp_path):
+    path = str(tmp_path / 'sensores')
+    columnar_store.write_store(_medicoes([('A', 2020), ('A', 2021), ('B', 2021)]), path,
+                               columnar_store.SENSOR_PARTITIONING)
+    filtro = columnar_store.ds.field('ano') == 2021
+    df = columnar_store.read_sensor_store(columns=['nome_estacao', 'pm10'], filter=filtro, path=path)
+    assert sorted(df['nome_estacao'].unique()) == ['A', 'B']
+    assert len(df) == 6
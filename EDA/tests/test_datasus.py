@@ -0,0 +1,94 @@
+"""
+Download incremental do SIH (`utils/datasus.py`) com a `LocalSIHSource` no lugar do FTP.
+"""
+import os
+import pandas as pd
+import pytest
+from utils import datasus
+
+ANO = 2019
+MESES = [1, 2, 3]
+UF = 'RJ'
+
+
+def _mes(mes, n=6):
+    # Metade das AIHs com diagnóstico secundário do capítulo J; uma delas com IDENT != '1'
+    return pd.DataFrame({
+        'N_AIH': [f'{mes:02d}{i:04d}' for i in range(n)],
+        'DIAGSEC1': ['J18' if i % 2 == 0 else 'I10' for i in range(n)],
+        'IDENT': ['5' if i == 2 else '1' for i in range(n)],
+        'MES_CMPT': [str(mes)] * n,
+    })
+
+
+def _gravar_fonte(pasta, mes, df):
+    caminho = os.path.join(pasta, f'RD{UF}{ANO % 100:02d}{mes:02d}.csv')
+    df.to_csv(caminho, index=False)
+    return caminho
+
+
+@pytest.fixture
+def pastas(tmp_path):
+    fonte, cache, destino = (tmp_path / nome for nome in ('fonte', 'cache', 'destino'))
+    fonte.mkdir()
+    for mes in MESES:
+        _gravar_fonte(fonte, mes, _mes(mes))
+    return str(fonte), str(cache), str(destino)
+
+
+def _atualizar(fonte, cache):
+    return datasus.atualizar_cache([ANO], MESES, lambda: datasus.LocalSIHSource(fonte), workers=2, uf=UF,
+                                   cache_dir=cache)
+
+
+def test_primeira_execucao_baixa_todos_os_meses(pastas):
+    fonte, cache, _ = pastas
+    assert _atualizar(fonte, cache) == [f'{ANO}-{mes:02d}' for mes in MESES]
+    manifesto = datasus.ler_manifesto(cache)
+    for mes in MESES:
+        assert manifesto[f'{ANO}-{mes:02d}']['linhas'] == 2
+        assert os.path.exists(datasus.caminho_mes(ANO, mes, cache))
+
+
+def test_segunda_execucao_nao_baixa_nada(pastas):
+    fonte, cache, _ = pastas
+    _atualizar(fonte, cache)
+    assert _atualizar(fonte, cache) == []
+
+
+def test_mes_alterado_e_o_unico_baixado_de_novo(pastas):
+    fonte, cache, _ = pastas
+    _atualizar(fonte, cache)
+    caminho = _gravar_fonte(fonte, 2, _mes(2, n=10))
+    stat = os.stat(caminho)
+    os.utime(caminho, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert _atualizar(fonte, cache) == [f'{ANO}-02']
+    assert datasus.ler_manifesto(cache)[f'{ANO}-02']['linhas'] == 4
+    assert len(pd.read_parquet(datasus.caminho_mes(ANO, 2, cache))) == 4
+
+
+def test_mes_sem_internacoes_nao_e_baixado_de_novo(pastas):
+    fonte, cache, _ = pastas
+    _gravar_fonte(fonte, 3, _mes(3).assign(DIAGSEC1='I10'))
+    _atualizar(fonte, cache)
+    assert datasus.ler_manifesto(cache)[f'{ANO}-03']['linhas'] == 0
+    assert _atualizar(fonte, cache) == []
+
+
+def test_anual_e_a_concatenacao_dos_meses(pastas):
+    fonte, cache, destino = pastas
+    meses = {mes: _mes(mes) for mes in MESES}
+    meses[3] = meses[3].assign(DIAGSEC1='I10')
+    _gravar_fonte(fonte, 3, meses[3])
+    _atualizar(fonte, cache)
+
+    caminho = datasus.montar_anual(ANO, cache, destino)
+    assert caminho == os.path.join(destino, f'dados_filtrados_{ANO}.csv')
+    anual = pd.read_csv(caminho, dtype=str)
+    esperado = pd.concat([datasus.filtrar_respiratorias(df) for df in meses.values()], ignore_index=True)
+    pd.testing.assert_frame_equal(anual, esperado)
+
+
+def test_anual_sem_dados(tmp_path):
+    assert datasus.montar_anual(ANO, str(tmp_path / 'cache'), str(tmp_path / 'destino')) is None
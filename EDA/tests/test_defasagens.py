@@ -0,0 +1,109 @@
+"""
+Correlação defasada (`analytics/defasagens.py`) contra `x.corr(y.shift(-k))` do pandas.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from analytics import defasagens
+from analytics.juncao import chave_dia
+from utils.rollup import CIDADE
+
+VARIAVEIS = ['pm10', 'o3']
+DEFASAGEM_MAXIMA = 7
+
+
+@pytest.fixture
+def dados():
+    rng = np.random.default_rng(1)
+    datas = pd.date_range('2019-01-01', periods=90, freq='D')
+    partes = []
+    for estacao, dias in [('a', datas), ('b', datas[5:80]), ('constante', datas), ('curta', datas[:14])]:
+        parte = pd.DataFrame({'nome_estacao': estacao, 'data_formatada': dias.strftime('%Y-%m-%d'),
+                              'pm10': rng.normal(40, 10, len(dias)), 'o3': rng.normal(20, 5, len(dias))})
+        if estacao == 'constante':
+            parte[VARIAVEIS] = 3.0
+        partes.append(parte)
+    df_sensor = pd.concat(partes, ignore_index=True)
+    # Dias sem medição e valores vazios
+    df_sensor = df_sensor.drop(index=rng.choice(len(df_sensor), 20, replace=False)).reset_index(drop=True)
+    df_sensor.loc[rng.choice(len(df_sensor), 15, replace=False), 'pm10'] = np.nan
+    df_sensor.loc[rng.choice(len(df_sensor), 15, replace=False), 'o3'] = np.nan
+
+    # Internações começam depois e terminam antes dos sensores (o calendário é a interseção)
+    dias = np.arange(chave_dia(pd.Series(['2019-01-03']))[0], chave_dia(pd.Series(['2019-03-25']))[0] + 1)
+    internacoes = pd.Series(rng.poisson(30, len(dias)), index=pd.RangeIndex(dias[0], dias[-1] + 1))
+    return df_sensor, internacoes
+
+
+def _referencia(df_sensor, internacoes, minimo=defasagens.MINIMO_PARES):
+    chaves = chave_dia(df_sensor['data_formatada'])
+    inicio = max(chaves.min(), internacoes.index[0])
+    fim = min(chaves.max(), internacoes.index[-1])
+    calendario = np.arange(inicio, fim + 1)
+    y = internacoes.reindex(calendario).astype('float64')
+
+    series = {CIDADE: df_sensor.groupby(chaves)[VARIAVEIS].mean()}
+    for estacao, grupo in df_sensor.groupby('nome_estacao'):
+        series[estacao] = grupo.set_index(chave_dia(grupo['data_formatada']))[VARIAVEIS]
+
+    linhas = []
+    for estacao, df in series.items():
+        for variavel in VARIAVEIS:
+            x = df[variavel].reindex(calendario)
+            for k in range(DEFASAGEM_MAXIMA + 1):
+                deslocada = y.shift(-k)
+                n = int((x.notna() & deslocada.notna()).sum())
+                with np.errstate(invalid='ignore', divide='ignore'):  # série constante
+                    correlacao = x.corr(deslocada) if n >= minimo else np.nan
+                linhas.append({'nome_estacao': estacao, 'variavel': variavel, 'defasagem': k,
+                               'correlacao': correlacao, 'n': n})
+    return pd.DataFrame(linhas)
+
+
+def _comparar(resultado, esperado):
+    chaves = ['nome_estacao', 'variavel', 'defasagem']
+    juntos = esperado.merge(resultado, on=chaves, suffixes=('_esperado', ''), validate='one_to_one')
+    assert len(juntos) == len(esperado) == len(resultado)
+    assert (juntos['n'] == juntos['n_esperado']).all()
+    np.testing.assert_array_equal(juntos['correlacao'].isna(), juntos['correlacao_esperado'].isna())
+    np.testing.assert_allclose(juntos['correlacao'], juntos['correlacao_esperado'], atol=1e-10, equal_nan=True)
+    return juntos
+
+
+def test_igual_ao_shift_corr(dados):
+    df_sensor, internacoes = dados
+    resultado = defasagens.correlacao_defasada(df_sensor, internacoes, VARIAVEIS, DEFASAGEM_MAXIMA)
+    juntos = _comparar(resultado, _referencia(df_sensor, internacoes))
+
+    assert resultado['nome_estacao'].iloc[0] == CIDADE
+    for estacao in [CIDADE, 'a', 'b']:
+        assert juntos.loc[juntos['nome_estacao'] == estacao, 'correlacao'].notna().all()
+
+
+def test_serie_constante_vira_nan(dados):
+    df_sensor, internacoes = dados
+    resultado = defasagens.correlacao_defasada(df_sensor, internacoes, VARIAVEIS, DEFASAGEM_MAXIMA)
+    constante = resultado[resultado['nome_estacao'] == 'constante']
+    assert (constante['n'] > defasagens.MINIMO_PARES).all()
+    assert constante['correlacao'].isna().all()
+
+
+def test_minimo_de_pares(dados):
+    df_sensor, internacoes = dados
+    resultado = defasagens.correlacao_defasada(df_sensor, internacoes, VARIAVEIS, DEFASAGEM_MAXIMA)
+    curta = resultado[resultado['nome_estacao'] == 'curta']
+    # A estação curta tem dias suficientes nas primeiras defasagens e poucos nas últimas
+    assert curta['correlacao'].notna().any()
+    assert curta['correlacao'].isna().any()
+    assert curta.loc[curta['n'] < defasagens.MINIMO_PARES, 'correlacao'].isna().all()
+    assert curta.loc[curta['n'] >= defasagens.MINIMO_PARES, 'correlacao'].notna().all()
+
+    # Com outro mínimo, o corte acompanha
+    resultado = defasagens.correlacao_defasada(df_sensor, internacoes, VARIAVEIS, DEFASAGEM_MAXIMA, minimo=4)
+    _comparar(resultado, _referencia(df_sensor, internacoes, minimo=4))
+
+
+def test_sem_dados():
+    vazio = pd.DataFrame(columns=['nome_estacao', 'data_formatada'] + VARIAVEIS)
+    resultado = defasagens.correlacao_defasada(vazio, pd.Series(dtype='int64'), VARIAVEIS)
+    assert resultado.empty
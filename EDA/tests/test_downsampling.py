@@ -0,0 +1,64 @@
+"""
+Redução das séries dos gráficos (`analytics/downsampling.py`).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from analytics import downsampling
+
+
+@pytest.fixture
+def serie():
+    rng = np.random.default_rng(5)
+    x = pd.date_range('2019-01-01', periods=5000, freq='h').to_numpy()
+    return x, rng.normal(30, 5, len(x)).cumsum()
+
+
+@pytest.mark.parametrize('pontos', [3, 10, 101, 1000])
+def test_lttb(serie, pontos):
+    x, y = serie
+    escolhidos = downsampling.lttb(x, y, pontos)
+    assert len(escolhidos) == pontos
+    assert escolhidos[0] == 0 and escolhidos[-1] == len(y) - 1
+    assert (np.diff(escolhidos) > 0).all()
+
+
+def test_lttb_mantem_picos_isolados():
+    y = np.zeros(2000)
+    y[777], y[1500] = 100.0, -100.0
+    escolhidos = downsampling.lttb(np.arange(len(y)), y, 50)
+    assert {777, 1500} <= set(escolhidos)
+
+
+@pytest.mark.parametrize('pontos', [2, 4, 10, 101, 1000])
+def test_minmax(serie, pontos):
+    x, y = serie
+    escolhidos = downsampling.minmax(x, y, pontos)
+    # Dois pontos por intervalo, mais o primeiro e o último
+    assert len(escolhidos) == pontos - pontos % 2
+    assert escolhidos[0] == 0 and escolhidos[-1] == len(y) - 1
+    assert (np.diff(escolhidos) > 0).all()
+    if pontos > 2:
+        assert {int(np.argmax(y)), int(np.argmin(y))} <= set(escolhidos)
+
+
+@pytest.mark.parametrize('metodo', list(downsampling.METODOS))
+def test_series_curtas_voltam_inteiras(metodo):
+    df = pd.DataFrame({'x': np.arange(50), 'y': np.arange(50.0)})
+    assert downsampling.reduzir(df, 'x', 'y', pontos=50, metodo=metodo) is df
+    np.testing.assert_array_equal(downsampling.METODOS[metodo](df['x'], df['y'], 80), np.arange(50))
+
+
+@pytest.mark.parametrize('metodo', list(downsampling.METODOS))
+def test_reduzir_junta_as_colunas_e_ignora_vazios(metodo):
+    rng = np.random.default_rng(6)
+    df = pd.DataFrame({'x': np.arange(3000), 'a': rng.normal(size=3000), 'b': rng.normal(size=3000)})
+    df.loc[rng.choice(3000, 300, replace=False), 'a'] = np.nan
+    reduzido = downsampling.reduzir(df, 'x', ['a', 'b'], pontos=100, metodo=metodo)
+    assert len(reduzido) <= 200
+    assert reduzido['x'].is_monotonic_increasing
+    for coluna in ['a', 'b']:
+        validos = df[coluna].dropna()
+        assert {validos.index[0], validos.index[-1]} <= set(reduzido.index)
+        if metodo == 'minmax':
+            assert {validos.idxmax(), validos.idxmin()} <= set(reduzido.index)
@@ -0,0 +1,59 @@
+"""
+Preenchimento de vazios (`utils/gap_filling.py`) contra o `df[mask][col].interpolate()`
+de cada estação nos notebooks de `tratamento_valores_vazios/`.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from utils import gap_filling
+
+VARIAVEIS = ['temp', 'o3', 'pm10']
+
+
+@pytest.fixture
+def medicoes():
+    rng = np.random.default_rng(10)
+    partes = []
+    for estacao in ['bangu', 'centro', 'tijuca']:
+        datas = pd.date_range('2019-01-01', periods=24 * 10, freq='h')
+        parte = pd.DataFrame({'nome_estacao': estacao, 'data': datas, 'data_formatada': datas.strftime('%Y-%m-%d')})
+        for variavel in VARIAVEIS:
+            valores = rng.normal(30, 5, len(datas))
+            # Vazios soltos, dias com muitos vazios, o começo e o fim da estação vazios
+            valores[rng.choice(len(datas) - 24, 25, replace=False)] = np.nan
+            dia_ruim = rng.integers(1, 9)
+            valores[dia_ruim * 24:dia_ruim * 24 + rng.integers(5, 12)] = np.nan
+            valores[:2] = np.nan
+            valores[-3:] = np.nan
+            parte[variavel] = valores
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+
+def _notebook(df_estacao, limite):
+    df_estacao = df_estacao.copy()
+    for col in VARIAVEIS:
+        df_estacao[f'{col}_nulos_no_dia'] = df_estacao.groupby('data_formatada')[col].transform(lambda x: x.isna().sum())
+        mask = df_estacao[f'{col}_nulos_no_dia'] <= limite
+        df_estacao.loc[mask, col] = df_estacao[mask][col].interpolate()
+    return df_estacao[VARIAVEIS]
+
+
+@pytest.mark.parametrize('limite', [0, 3, gap_filling.LIMITE_NULOS_DIA, 24])
+def test_igual_ao_interpolate_dos_notebooks(medicoes, limite):
+    preenchido, estatisticas = gap_filling.preencher_lacunas(medicoes, VARIAVEIS, limite=limite)
+    esperado = pd.concat([_notebook(grupo, limite) for _, grupo in medicoes.groupby('nome_estacao', sort=False)])
+    pd.testing.assert_frame_equal(preenchido[VARIAVEIS], esperado, rtol=1e-12)
+    pd.testing.assert_frame_equal(preenchido.drop(columns=VARIAVEIS), medicoes.drop(columns=VARIAVEIS))
+
+    assert (estatisticas['vazios'] == estatisticas['preenchidos'] + estatisticas['restantes']).all()
+    restantes = preenchido[VARIAVEIS].isna().groupby(preenchido['nome_estacao']).sum().stack()
+    assert estatisticas.set_index(['nome_estacao', 'variavel'])['restantes'].to_dict() == restantes.to_dict()
+
+
+def test_nao_mistura_estacoes(medicoes):
+    # O vazio no começo de uma estação não é preenchido com o fim da estação anterior
+    preenchido, _ = gap_filling.preencher_lacunas(medicoes, VARIAVEIS)
+    for _, grupo in preenchido.groupby('nome_estacao'):
+        assert grupo[VARIAVEIS].iloc[:2].isna().all().all()
+        assert grupo[VARIAVEIS].iloc[-3:].notna().all().all()
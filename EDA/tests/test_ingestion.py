@@ -0,0 +1,40 @@
+"""
+Leitura paralela dos CSVs (`utils/ingestion.py`).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from utils import ingestion
+
+
+@pytest.fixture
+def fontes(tmp_path):
+    # Arquivos de tamanhos bem diferentes, para que terminem fora da ordem de envio
+    rng = np.random.default_rng(0)
+    fontes = {}
+    for i, n in enumerate([5000, 10, 2000, 1, 300]):
+        caminho = tmp_path / f'arquivo_{i}.csv'
+        pd.DataFrame({'arquivo': i, 'valor': rng.random(n), 'texto': [f'{i}-{j}' for j in range(n)]}).to_csv(
+            caminho, index=False)
+        fontes[f'f{i}'] = str(caminho)
+    return fontes
+
+
+@pytest.mark.parametrize('parse_in_processes', [False, True], ids=['threads', 'processos'])
+def test_mesmo_resultado_da_leitura_sequencial(fontes, parse_in_processes):
+    esperado = pd.concat([pd.read_csv(caminho) for caminho in fontes.values()], ignore_index=True)
+    df, tempos = ingestion.read_csvs_parallel(fontes, workers=4, parse_in_processes=parse_in_processes)
+    pd.testing.assert_frame_equal(df, esperado)
+    assert tempos['arquivo'].tolist() == list(fontes)
+    assert tempos['linhas'].tolist() == [5000, 10, 2000, 1, 300]
+
+
+def test_repassa_argumentos_do_read_csv(fontes):
+    df, _ = ingestion.read_csvs_parallel(fontes, workers=2, parse_in_processes=False, usecols=['arquivo', 'valor'])
+    assert df.columns.tolist() == ['arquivo', 'valor']
+
+
+def test_um_worker_le_em_sequencia(fontes):
+    esperado = pd.concat([pd.read_csv(caminho) for caminho in fontes.values()], ignore_index=True)
+    df, _ = ingestion.read_csvs_parallel(fontes, workers=1)
+    pd.testing.assert_frame_equal(df, esperado)
@@ -0,0 +1,64 @@
+"""
+Médias móveis por estação (`utils/rolling_windows.py`) contra `groupby(estação)` +
+`rolling('8h', min_periods=6)` do pandas.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from utils import rolling_windows
+
+COLUNAS = ['o3', 'co']
+# 75% das horas da janela
+MINIMO = {'1h': 1, '8h': 6, '24h': 18}
+
+
+@pytest.fixture
+def horario():
+    rng = np.random.default_rng(3)
+    partes = []
+    for estacao, inicio, horas in [('b', '2019-01-01', 24 * 6), ('a', '2019-01-03 05:00', 24 * 4), ('c', '2019-01-01', 30)]:
+        datas = pd.date_range(inicio, periods=horas, freq='h')
+        partes.append(pd.DataFrame({'nome_estacao': estacao, 'data': datas,
+                                    'o3': rng.normal(30, 8, horas), 'co': rng.normal(0.5, 0.1, horas)}))
+    df_horario = pd.concat(partes, ignore_index=True)
+    # Horas sem medição (inclusive um trecho longo), valores vazios e linhas fora de ordem
+    df_horario = df_horario.drop(index=list(rng.choice(len(df_horario), 60, replace=False)) + list(range(40, 52)))
+    df_horario.loc[rng.choice(df_horario.index, 40, replace=False), 'o3'] = np.nan
+    df_horario.loc[rng.choice(df_horario.index, 40, replace=False), 'co'] = np.nan
+    return df_horario.sample(frac=1, random_state=4)
+
+
+def _referencia(df_horario, janela):
+    medias = []
+    for _, grupo in df_horario.groupby('nome_estacao'):
+        serie = grupo.sort_values('data')[['data'] + COLUNAS]
+        medias.append(serie.rolling(janela, on='data', min_periods=MINIMO[janela]).mean()[COLUNAS])
+    return pd.concat(medias).reindex(df_horario.index).add_suffix(f'_{janela}')
+
+
+@pytest.mark.parametrize('janela', list(MINIMO))
+def test_medias_iguais_ao_rolling_por_estacao(horario, janela):
+    resultado = rolling_windows.medias_moveis(horario, COLUNAS, janelas=[janela])
+    esperado = _referencia(horario, janela)
+    pd.testing.assert_frame_equal(resultado, esperado, rtol=1e-10, atol=1e-10)
+    # Há janelas com e sem o mínimo de horas válidas
+    assert resultado.notna().any().all()
+    assert janela == '1h' or resultado.isna().any().all()
+
+
+def test_maximos_diarios(horario):
+    resultado = rolling_windows.maximos_diarios(horario, COLUNAS)
+
+    medias = pd.concat([_referencia(horario, janela) for janela in MINIMO], axis=1)
+    medias['nome_estacao'] = horario['nome_estacao']
+    medias['data_formatada'] = horario['data'].dt.floor('D').astype('datetime64[us]')
+    esperado = (medias.groupby(['data_formatada', 'nome_estacao']).max()
+                .add_suffix('_max').reset_index()[['nome_estacao', 'data_formatada'] + list(resultado.columns[2:])])
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False, rtol=1e-10, atol=1e-10)
+
+
+def test_sem_linhas():
+    vazio = pd.DataFrame({'nome_estacao': pd.Series(dtype=object), 'data': pd.Series(dtype='datetime64[ns]'),
+                          'o3': pd.Series(dtype='float64')})
+    assert rolling_windows.medias_moveis(vazio, ['o3']).empty
+    assert rolling_windows.maximos_diarios(vazio, ['o3']).empty
@@ -0,0 +1,44 @@
+"""
+Seleção de períodos no cubo de agregados dos sensores (`utils/rollup.py`).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from utils import rollup
+
+
+@pytest.fixture
+def cubo():
+    # Duas estações; 'b' só tem medições em 2019 e nenhuma estação mede depois de junho de 2019
+    datas = pd.date_range('2018-01-01', '2019-06-30', freq='D')
+    df = pd.DataFrame({
+        'nome_estacao': np.repeat(['a', 'b'], len(datas)),
+        'data_formatada': np.tile(datas, 2),
+        'pm10': np.arange(2 * len(datas), dtype=float),
+    })
+    df['ano'] = df['data_formatada'].dt.year
+    df['mes'] = df['data_formatada'].dt.month
+    df = df[(df['nome_estacao'] == 'a') | (df['ano'] == 2019)]
+    return df, rollup.build_rollup(df, ['pm10'])
+
+
+def test_meses_sem_dados_sao_ignorados(cubo):
+    df, cubo = cubo
+    # Julho de 2019 não tem medições: como em `isin`, ficam só as de janeiro
+    janeiro = df[(df['ano'] == 2019) & (df['mes'] == 1)]
+    assert rollup.resumo_cidade(cubo, [2019], [1, 7])['pm10', 'count'] == len(janeiro)
+    assert len(rollup.serie_diaria_cidade(cubo, [2019], [1, 7])) == 31
+
+
+def test_combinacao_sem_linhas_e_vazia(cubo):
+    _, cubo = cubo
+    assert rollup.resumo_por_estacao(cubo, [2018]).index.tolist() == ['a']
+    assert rollup.resumo_por_estacao(cubo, [2019], [9]).empty
+    assert rollup.resumo_cidade(cubo, [2020])['pm10', 'count'] == 0
+
+
+def test_media_por_estacao(cubo):
+    df, cubo = cubo
+    esperado = df[df['mes'].isin([2, 3])].groupby('nome_estacao')['pm10'].mean()
+    resumo = rollup.resumo_por_estacao(cubo, [2018, 2019], [2, 3])
+    pd.testing.assert_series_equal(resumo['pm10', 'mean'], esperado, check_names=False)
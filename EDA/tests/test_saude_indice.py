@@ -0,0 +1,101 @@
+"""
+Filtros da página de saúde sobre o índice de bitmaps (`utils/bitmap_index.py` e
+`analytics/saude_indice.py`), comparados com as máscaras booleanas do pandas.
+"""
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from analytics import saude, saude_indice
+from utils import bitmap_index
+
+
+@pytest.fixture(scope='module')
+def internacoes():
+    rng = np.random.default_rng(2)
+    n = 3000
+    df_sus = pd.DataFrame({
+        'ANO_CMPT': rng.choice([2017, 2018, 2019], n),
+        'MES_CMPT': rng.integers(1, 13, n),
+        'SEXO': rng.choice([1, 3], n),
+        'IDADE': rng.integers(0, 100, n),
+        'DIAS_PERM': rng.integers(0, 30, n),
+        'MORTE': rng.choice([0, 1], n, p=[0.9, 0.1]),
+        'DIAG_PRINC': rng.choice(['J180', 'J189', 'I10', 'C341', 'A09', 'Z001', '', 'xx'], n),
+    })
+    # Um mês que não aparece em 2019, para os filtros com valores ausentes
+    df_sus = df_sus[~((df_sus['ANO_CMPT'] == 2019) & (df_sus['MES_CMPT'] == 7))].reset_index(drop=True)
+    df_sus = saude.adicionar_dimensoes(df_sus)
+    return df_sus, saude_indice.indexar(df_sus)
+
+
+def _mascara(df_sus, ano, mes, sexo):
+    mascara = pd.Series(True, index=df_sus.index)
+    for coluna, valor in [('ANO_CMPT', ano), ('MES_CMPT', mes), ('SEXO', sexo)]:
+        if valor is not None:
+            mascara &= df_sus[coluna].isin(valor if isinstance(valor, list) else [valor])
+    return mascara
+
+
+COMBINACOES = list(itertools.product([None, 2018, [2017, 2019]], [None, 7, [1, 7]], [None, 1, 3]))
+
+
+@pytest.mark.parametrize('ano, mes, sexo', COMBINACOES)
+def test_filtros_iguais_as_mascaras(internacoes, ano, mes, sexo):
+    df_sus, indice = internacoes
+    filtrada = saude_indice.filtrar(saude_indice.consulta(df_sus, indice), ano=ano, mes=mes, sexo=sexo)
+    esperado = df_sus[_mascara(df_sus, ano, mes, sexo)]
+
+    obtidos = saude_indice.indicadores(filtrada)
+    esperados = saude.indicadores(esperado)
+    assert obtidos['total_internacoes'] == esperados['total_internacoes']
+    for chave in ['media_idade', 'taxa_mortalidade', 'media_permanencia']:
+        np.testing.assert_allclose(obtidos[chave], esperados[chave], rtol=1e-12, equal_nan=True)
+
+    pd.testing.assert_frame_equal(saude_indice.amostra(filtrada, 100), esperado.head(100))
+    assert saude_indice.para_csv(filtrada) == esperado.to_csv(index=False).encode('utf-8')
+
+
+def test_filtro_sem_linhas(internacoes):
+    df_sus, indice = internacoes
+    filtrada = saude_indice.filtrar(saude_indice.consulta(df_sus, indice), ano=2019, mes=7)
+    assert saude_indice.indicadores(filtrada)['total_internacoes'] == 0
+    assert saude_indice.amostra(filtrada).empty
+
+
+def test_filtros_por_capitulo_e_obito(internacoes):
+    df_sus, indice = internacoes
+    filtrada = saude_indice.filtrar(saude_indice.consulta(df_sus, indice), capitulo='X', morte=1)
+    esperado = df_sus[df_sus['DIAG_PRINC'].str.startswith('J') & (df_sus['MORTE'] == 1)]
+    assert saude_indice.indicadores(filtrada)['total_internacoes'] == len(esperado)
+
+
+@pytest.mark.parametrize('inicio', [0, 524_280, 524_287, 524_288, 524_290, 1_048_570])
+@pytest.mark.parametrize('limite', [1, 5, 20])
+def test_posicoes_na_fronteira_dos_blocos(inicio, limite):
+    # Blocos de 64 KiB do bitmap = 524.288 linhas; linhas selecionadas a partir de `inicio`, com buracos
+    n = 1_048_600
+    valores = np.zeros(n, dtype=np.int8)
+    valores[inicio:inicio + 30:3] = 1
+    indice = bitmap_index.construir({'v': pd.Series(valores)})
+    selecao = bitmap_index.selecionar(indice, v=1)
+    esperado = np.flatnonzero(valores == 1)
+    np.testing.assert_array_equal(bitmap_index.posicoes(indice, selecao, limite), esperado[:limite])
+    np.testing.assert_array_equal(bitmap_index.posicoes(indice, selecao), esperado)
+
+
+def test_posicoes_ignora_bits_de_preenchimento():
+    # 10 linhas ocupam 2 bytes; os 6 bits que sobram no fim não são linhas
+    indice = bitmap_index.construir({'v': pd.Series([1] * 10)})
+    todas = bitmap_index.todas(indice)
+    assert bitmap_index.contar(todas) == 10
+    np.testing.assert_array_equal(bitmap_index.posicoes(indice, todas, 50), np.arange(10))
+
+
+@pytest.mark.parametrize('cid, esperado', [
+    ('A00', 'I'), ('a009', 'I'), ('B99', 'I'), ('C00', 'II'), ('H59', 'VII'), ('H60', 'VIII'), ('J189', 'X'),
+    ('U99', 'XXII'), ('V01', 'XX'), ('Y98', 'XX'), ('Z99', 'XXI'), (' J45 ', 'X'),
+    ('', None), ('J1', None), ('1234', None), ('JAB', None), (None, None), (float('nan'), None),
+])
+def test_capitulo(cid, esperado):
+    assert saude_indice.capitulo(cid) == esperado
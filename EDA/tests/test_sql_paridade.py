@@ -0,0 +1,139 @@
+"""
+Backend DuckDB (`analytics/sensores_sql.py` e `analytics/saude_sql.py`) contra o caminho
+em pandas (`analytics/sensores.py` e `analytics/saude.py`), sobre uma pasta `data/`
+sintética pequena.
+"""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from analytics import saude, saude_sql, sensores, sensores_sql
+from benchmarks import synthetic
+from utils import data_loader, duckdb_backend
+from utils.config import POLUENTES_TRADUCAO
+from utils.rollup import build_rollup
+from utils.time_index import date_bounds
+
+POLUENTES = list(POLUENTES_TRADUCAO)
+PERIODOS = [([2019], []), ([2018, 2019], [1, 7, 12]), ([2019], [2])]
+
+
+@pytest.fixture(scope='module')
+def dados(tmp_path_factory):
+    destino = tmp_path_factory.mktemp('qualiar')
+    synthetic.gerar(str(destino), n_estacoes=3, ano_inicial=2018, ano_final=2019, internacoes_dia=5.0, boxcox=False)
+    # Os caminhos de `utils/config.py` são relativos e as views do DuckDB são lidas a cada consulta
+    anterior = os.getcwd()
+    os.chdir(destino)
+    try:
+        df_sensor, _ = data_loader.build_sensor_data()
+        df_sus, df_sus_aggregated = data_loader.build_sus_data()
+        yield {
+            'conexao': duckdb_backend.conectar(),
+            'df_sensor': df_sensor,
+            'rollup': build_rollup(df_sensor, POLUENTES),
+            'janelas': data_loader.build_sensor_windows(),
+            'df_sus': saude.adicionar_dimensoes(df_sus),
+            'df_sus_aggregated': df_sus_aggregated,
+        }
+    finally:
+        os.chdir(anterior)
+
+
+def _iguais(obtido, esperado, **kwargs):
+    pd.testing.assert_frame_equal(obtido.reset_index(drop=True), esperado.reset_index(drop=True), check_dtype=False,
+                                  check_index_type=False, check_column_type=False, check_categorical=False,
+                                  rtol=1e-9, atol=1e-9, **kwargs)
+
+
+def test_estacoes_anos_e_datas(dados):
+    con, df_sensor = dados['conexao'], dados['df_sensor']
+    assert sensores_sql.estacoes(con) == sorted(df_sensor['nome_estacao'].unique())
+    assert sensores_sql.anos_disponiveis(con) == sorted(df_sensor['ano'].unique())
+    assert sensores_sql.limites_datas(con) == date_bounds(df_sensor)
+
+
+@pytest.mark.parametrize('anos, meses', PERIODOS)
+@pytest.mark.parametrize('poluente', ['temp', 'chuva', 'o3'])
+def test_agregados_por_estacao(dados, anos, meses, poluente):
+    con, rollup = dados['conexao'], dados['rollup']
+    _iguais(sensores_sql.media_por_estacao(con, anos, meses, poluente),
+            sensores.media_por_estacao(rollup, anos, meses, poluente))
+    _iguais(sensores_sql.comparacao_estacoes(con, anos, meses, poluente),
+            sensores.comparacao_estacoes(rollup, anos, meses, poluente))
+
+
+@pytest.mark.parametrize('anos, meses', PERIODOS)
+def test_serie_resumo_e_correlacao(dados, anos, meses):
+    con, rollup = dados['conexao'], dados['rollup']
+    variaveis = ['temp', 'o3', 'chuva']
+    _iguais(sensores_sql.serie_temporal(con, anos, meses, variaveis),
+            sensores.serie_temporal(rollup, anos, meses, variaveis))
+
+    obtido, n_dias = sensores_sql.resumo_periodo(con, anos, meses, ['temp', 'chuva', 'pm10'])
+    esperado, n_dias_esperado = sensores.resumo_periodo(rollup, anos, meses, ['temp', 'chuva', 'pm10'])
+    assert n_dias == n_dias_esperado
+    for var in esperado:
+        np.testing.assert_allclose(obtido[var], esperado[var], rtol=1e-9)
+
+    df_filtered = sensores.filtrar_periodo(dados['df_sensor'], anos, meses, sensores.METEOROLOGICAS + ['o3', 'pm10'])
+    pd.testing.assert_frame_equal(sensores_sql.matriz_correlacao(con, anos, meses, ['o3', 'pm10']),
+                                  sensores.matriz_correlacao(df_filtered, ['o3', 'pm10']),
+                                  check_dtype=False, check_names=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('anos, meses', PERIODOS)
+@pytest.mark.parametrize('janela', ['1h', '8h', '24h'])
+def test_maximos_das_medias_moveis(dados, anos, meses, janela):
+    pd.testing.assert_frame_equal(
+        sensores_sql.maximos_medias_moveis(dados['conexao'], anos, meses, 'o3', janela),
+        sensores.maximos_medias_moveis(dados['janelas'], anos, meses, 'o3', janela),
+        check_dtype=False, check_index_type=False, check_column_type=False, check_names=False,
+        check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('data, anos', [('2019-03-05', [2019]), ('2019-03-05', [2018])])
+def test_dados_do_dia(dados, data, anos):
+    colunas = ['nome_estacao', 'data_formatada'] + POLUENTES
+    obtido = sensores_sql.dados_do_dia(dados['conexao'], pd.Timestamp(data), anos, [])
+    esperado = sensores.dados_do_dia(dados['df_sensor'], pd.Timestamp(data), anos, [])
+    _iguais(obtido[colunas], esperado[colunas])
+
+
+def test_tabelas_da_saude(dados):
+    consulta, df_sus = saude_sql.consulta(dados['conexao']), dados['df_sus']
+    assert len(df_sus) > 0
+    _iguais(saude_sql.internacoes_mensais(consulta), dados['df_sus_aggregated'])
+    _iguais(saude_sql.internacoes_por_faixa_etaria(consulta), saude.internacoes_por_faixa_etaria(df_sus))
+    _iguais(saude_sql.internacoes_por_sexo(consulta), saude.internacoes_por_sexo(df_sus))
+    _iguais(saude_sql.mortalidade_mensal(consulta), saude.mortalidade_mensal(df_sus))
+
+    obtidas, esperadas = saude_sql.contagens(consulta), saude.contagens(df_sus)
+    _iguais(obtidas['diagnosticos'], esperadas['diagnosticos'])
+    _iguais(saude.top_diagnosticos(obtidas['diagnosticos']), saude.top_diagnosticos(esperadas['diagnosticos']))
+    _iguais(saude.top_causas_morte(obtidas['diagnosticos']), saude.top_causas_morte(esperadas['diagnosticos']))
+
+    for coluna in ['ANO_CMPT', 'MES_CMPT', 'SEXO']:
+        assert saude_sql.valores_distintos(consulta, coluna) == sorted(int(valor) for valor in df_sus[coluna].unique())
+
+
+@pytest.mark.parametrize('filtro', [{}, {'ano': 2019}, {'ano': 2019, 'mes': 5, 'sexo': 1}, {'sexo': 3}, {'ano': 1999}])
+def test_filtros_da_saude(dados, filtro):
+    df_sus = dados['df_sus']
+    mascara = pd.Series(True, index=df_sus.index)
+    for coluna, chave in [('ANO_CMPT', 'ano'), ('MES_CMPT', 'mes'), ('SEXO', 'sexo')]:
+        if chave in filtro:
+            mascara &= df_sus[coluna] == filtro[chave]
+    esperado = df_sus[mascara]
+    filtrada = saude_sql.filtrar(saude_sql.consulta(dados['conexao']), **filtro)
+
+    obtidos, esperados = saude_sql.indicadores(filtrada), saude.indicadores(esperado)
+    assert obtidos['total_internacoes'] == esperados['total_internacoes'] == len(esperado)
+    for chave in ['media_idade', 'taxa_mortalidade', 'media_permanencia']:
+        np.testing.assert_allclose(obtidos[chave], esperados[chave], rtol=1e-9, equal_nan=True)
+
+    assert len(saude_sql.amostra(filtrada, 100)) == min(len(esperado), 100)
+    assert len(saude_sql.para_csv(filtrada).splitlines()) == len(esperado) + 1
@@ -0,0 +1,26 @@
+"""
+Gerador de dados sintéticos (`benchmarks/synthetic.py`).
+"""
+import os
+import pandas as pd
+from benchmarks import synthetic
+from utils.config import SENSOR_CSV_PATHS, SUS_CSV_PATHS
+
+
+def test_grava_todos_os_arquivos_da_configuracao(tmp_path):
+    # Menos estações que arquivos e um ano fora de SUS_CSV_PATHS
+    linhas_sensores, linhas_sus = synthetic.gerar(str(tmp_path), n_estacoes=3, ano_inicial=2020, ano_final=2020,
+                                                  internacoes_dia=2, boxcox=False)
+    assert linhas_sensores == 3 * 366 * 24
+    assert linhas_sus > 0
+
+    sensores = [pd.read_csv(tmp_path / path) for path in SENSOR_CSV_PATHS.values()]
+    assert all(df.columns.tolist() == synthetic.SENSOR_OUTPUT_COLUMNS for df in sensores)
+    assert sum(len(df) for df in sensores) == linhas_sensores
+    assert sum(df.empty for df in sensores) == len(SENSOR_CSV_PATHS) - 3
+
+    for path in SUS_CSV_PATHS.values():
+        df = pd.read_csv(tmp_path / path)
+        assert df.columns.tolist() == synthetic.SUS_OUTPUT_COLUMNS
+        assert df.empty
+    assert os.path.exists(tmp_path / 'data' / 'datasus' / 'dados_filtrados_2020.csv')
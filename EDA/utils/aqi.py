@@ -0,0 +1,168 @@
+"""
+Cálculo vetorizado do Índice de Qualidade do Ar (AQI).
+
+Reproduz a metodologia de `notebooks/air_quality_index.ipynb`:
+
+- PM2.5 e PM10: média diária
+- CO e O₃: maior média móvel de 8 horas do dia (O₃ convertido para ppm), por estação
+  e pelo relógio, com pelo menos 6 horas válidas (ver `utils/rolling_windows.py`)
+- NO₂ e SO₂: maior valor horário do dia (SO₂ convertido para ppm)
+
+Em vez de percorrer a lista de breakpoints valor a valor com `.apply`, as tabelas
+ficam em arrays e o sub-índice de todas as estações e dias é calculado de uma vez
+com `np.searchsorted` + interpolação linear. O AQI final é o maior sub-índice do dia.
+
+Para recalcular o arquivo diário da cidade (a partir da raiz do repositório):
+
+    PYTHONPATH=EDA python -m utils.aqi data/Sensors/AQI/air_quality_index_per_day.csv
+"""
+import sys
+import numpy as np
+import pandas as pd
+from utils.rolling_windows import medias_moveis
+
+# Colunas: c_low, c_high, i_low, i_high
+AQI_BREAKPOINTS = {
+    'pm2_5': np.array([
+        (0.0, 9.0, 0, 50),          # Good
+        (9.1, 35.4, 51, 100),       # Moderate
+        (35.5, 55.4, 101, 150),     # Unhealthy for Sensitive Groups
+        (55.5, 125.4, 151, 200),    # Unhealthy
+        (125.5, 225.4, 201, 300),   # Very Unhealthy
+        (225.5, 325.4, 301, 400),   # Hazardous
+        (325.5, 99999.9, 401, 500)  # Hazardous (Emergency)
+    ]),
+    'pm10': np.array([
+        (0.0, 54.0, 0, 50),
+        (55.0, 154.0, 51, 100),
+        (155.0, 254.0, 101, 150),
+        (255.0, 354.0, 151, 200),
+        (355.0, 424.0, 201, 300),
+        (425.0, 604.0, 301, 400),
+        (605.0, 99999.9, 401, 500)
+    ]),
+    'co': np.array([  # média de 8h, ppm
+        (0.0, 4.4, 0, 50),
+        (4.5, 9.4, 51, 100),
+        (9.5, 12.4, 101, 150),
+        (12.5, 15.4, 151, 200),
+        (15.5, 30.4, 201, 300),
+        (30.5, 50.4, 301, 400),
+        (50.4, 99999.9, 401, 500)
+    ]),
+    'no2': np.array([  # máximo horário
+        (0.0, 53.0, 0, 50),
+        (54.0, 100.0, 51, 100),
+        (101.0, 360.0, 101, 150),
+        (361.0, 649.0, 151, 200),
+        (650.0, 1249.0, 201, 300),
+        (1250.0, 2049.0, 301, 400),
+        (2050.0, 99999.0, 401, 500)
+    ]),
+    'o3': np.array([  # média de 8h, ppm
+        (0.0, 0.054, 0, 50),
+        (0.055, 0.07, 51, 100),
+        (0.071, 0.085, 101, 150),
+        (0.086, 0.105, 151, 200),
+        (0.106, 0.2, 201, 300)
+    ]),
+    'so2': np.array([  # máximo horário, ppm
+        (0.0, 0.034, 0, 50),
+        (0.035, 0.144, 51, 100),
+        (0.145, 0.224, 101, 150),
+        (0.225, 0.304, 151, 200),
+        (0.305, 0.604, 201, 300),
+        (0.604, 0.804, 301, 400),
+        (0.805, 99999.0, 401, 500)
+    ]),
+}
+
+AQI_POLUENTES = list(AQI_BREAKPOINTS.keys())
+
+AQI_CLASSES = np.array(['Good', 'Moderate', 'Unhealthy for Sensitive Groups', 'Unhealthy',
+                        'Very Unhealthy', 'Hazardous', 'Invalid AQI'])
+AQI_LIMITES_CLASSES = np.array([50, 100, 150, 200, 300, 500])
+
+# Massas molares (g/mol) e volume molar a 25°C e 1 atm (L/mol)
+MASSA_MOLAR = {'o3': 48.0, 'so2': 64.066}
+VOLUME_MOLAR = 24.45
+
+
+def ugm3_to_ppm(valor_ugm3, poluente):
+    """Converte µg/m³ para ppm: ppm = (µg/m³ * 24.45) / (massa_molar * 1000)"""
+    return (valor_ugm3 * VOLUME_MOLAR) / (MASSA_MOLAR[poluente] * 1000)
+
+
+def sub_indice(concentracoes, poluente):
+    """
+    Sub-índice AQI de um array de concentrações.
+
+    Valores fora de todas as faixas (lacunas entre c_high e o próximo c_low, acima
+    da última faixa ou negativos) resultam em NaN, como no notebook original.
+    """
+    c = np.asarray(concentracoes, dtype='float64')
+    c_low, c_high, i_low, i_high = AQI_BREAKPOINTS[poluente].T
+
+    pos = np.searchsorted(c_low, c, side='right') - 1
+    pos = np.clip(pos, 0, len(c_low) - 1)
+    # Quando duas faixas se tocam (ex.: CO em 50.4), vale a primeira, como no loop original
+    anterior = np.clip(pos - 1, 0, None)
+    pos = np.where((pos > 0) & (c <= c_high[anterior]), anterior, pos)
+
+    valido = (c >= c_low[pos]) & (c <= c_high[pos])
+    aqi = (i_high[pos] - i_low[pos]) / (c_high[pos] - c_low[pos]) * (c - c_low[pos]) + i_low[pos]
+    return np.where(valido, aqi, np.nan)
+
+
+def classificar_aqi(aqi):
+    """Classificação textual do AQI (NaN ou acima de 500 -> 'Invalid AQI')"""
+    aqi = np.asarray(aqi, dtype='float64')
+    pos = np.searchsorted(AQI_LIMITES_CLASSES, aqi, side='left')
+    pos = np.where(np.isnan(aqi), len(AQI_LIMITES_CLASSES), pos)
+    return pd.Categorical(AQI_CLASSES[pos], categories=AQI_CLASSES)
+
+
+def calcular_aqi(df_horario, por=('nome_estacao', 'data_formatada')):
+    """
+    Calcula os sub-índices, o AQI final e a classificação a partir das medições horárias.
+
+    `df_horario` precisa das colunas nome_estacao, data, data_formatada e dos poluentes.
+    `por` define o agrupamento: por estação e dia (padrão) ou só por dia, para a cidade
+    inteira (como no notebook).
+    """
+    por = list(por)
+    medias_8h = medias_moveis(df_horario, ['co', 'o3'], janelas=['8h'])
+
+    base = df_horario[por].copy()
+    base['pm2_5'] = df_horario['pm2_5']
+    base['pm10'] = df_horario['pm10']
+    base['co'] = medias_8h['co_8h']
+    base['no2'] = df_horario['no2']
+    base['o3'] = ugm3_to_ppm(medias_8h['o3_8h'], 'o3')
+    base['so2'] = ugm3_to_ppm(df_horario['so2'], 'so2')
+
+    df_dia = base.groupby(por).agg(
+        pm2_5_medio=('pm2_5', 'mean'),
+        pm10_medio=('pm10', 'mean'),
+        co_8h_max=('co', 'max'),
+        no2_1h_max=('no2', 'max'),
+        o3_8h_max=('o3', 'max'),
+        so2_1h_max=('so2', 'max'),
+    )
+
+    for poluente, coluna in zip(AQI_POLUENTES, df_dia.columns):
+        df_dia[f'aqi_{poluente}'] = sub_indice(df_dia[coluna].to_numpy(), poluente)
+
+    df_dia['aqi_final'] = df_dia[[f'aqi_{p}' for p in AQI_POLUENTES]].max(axis=1)
+    df_dia['classificacao'] = classificar_aqi(df_dia['aqi_final'].to_numpy())
+    return df_dia.reset_index()
+
+
+if __name__ == '__main__':
+    from utils.data_loader import read_sensor_hourly
+
+    destino = sys.argv[1] if len(sys.argv) > 1 else 'air_quality_index_per_day.csv'
+    df_aqi = calcular_aqi(read_sensor_hourly(), por=['data_formatada'])
+    df_aqi = df_aqi[['data_formatada', 'aqi_final', 'classificacao']].rename(columns={'classificacao': 'descricao_aqi'})
+    df_aqi.to_csv(destino, index=False)
+    print(f"AQI de {len(df_aqi)} dias gravado em {destino}")
@@ -0,0 +1,130 @@
+"""
+Cache em disco dos DataFrames processados pelos loaders.
+
+A chave de cada entrada combina o nome do loader, `CACHE_VERSION`, os argumentos e
+a impressão digital dos arquivos de origem: tamanho + data de modificação de cada
+arquivo (padrão) ou o sha256 do conteúdo (`QUALIAR_CACHE_HASH=sha256`, lido de novo
+só quando o tamanho ou a data de modificação do arquivo mudam). Quando um CSV ou o
+armazenamento Parquet muda, a chave muda e o resultado é recalculado; enquanto não
+muda, um servidor recém-iniciado lê o resultado pronto do disco.
+
+Os loaders do Streamlit passam a impressão digital como argumento da função com
+`@st.cache_data`, então o cache em memória também é invalidado quando os arquivos
+mudam; ele guarda só as `MEMORY_CACHE_MAX_ENTRIES` entradas mais recentes de cada
+loader, por até `MEMORY_CACHE_TTL`. No disco, as entradas mais antigas que
+`CACHE_MAX_AGE_DAYS` ou além de `CACHE_MAX_BYTES` (as menos usadas primeiro) são
+removidas a cada gravação.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import time
+from utils.config import CACHE_DIR, CACHE_ENABLED, CACHE_HASH, CACHE_MAX_BYTES, CACHE_MAX_AGE_DAYS, CACHE_VERSION
+from utils.profiling import marcar_cache
+
+logger = logging.getLogger(__name__)
+
+EXTENSAO = '.pkl'
+# sha256 de cada arquivo já lido: {caminho: ((tamanho, data de modificação), sha256)}
+_DIGESTS = {}
+
+
+def _arquivos(sources):
+    for source in sources:
+        if os.path.isdir(source):
+            for raiz, _, nomes in sorted(os.walk(source)):
+                for nome in sorted(nomes):
+                    yield os.path.join(raiz, nome)
+        else:
+            yield source
+
+
+def _sha256(path, stat):
+    # O conteúdo só é lido de novo quando o tamanho ou a data de modificação mudam
+    marca = (stat.st_size, stat.st_mtime_ns)
+    memorizado = _DIGESTS.get(path)
+    if memorizado is not None and memorizado[0] == marca:
+        return memorizado[1]
+    h = hashlib.sha256()
+    with open(path, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            h.update(bloco)
+    _DIGESTS[path] = (marca, h.hexdigest())
+    return _DIGESTS[path][1]
+
+
+def fingerprint(sources, method=CACHE_HASH):
+    """Impressão digital de arquivos e pastas (URLs entram só pelo endereço)"""
+    h = hashlib.sha256()
+    for path in _arquivos(sources):
+        if path.startswith(('http://', 'https://')) or not os.path.exists(path):
+            marca = 'sem-arquivo'
+        elif method == 'sha256':
+            marca = _sha256(path, os.stat(path))
+        else:
+            stat = os.stat(path)
+            marca = f'{stat.st_size}-{stat.st_mtime_ns}'
+        h.update(f'{path}:{marca}\n'.encode())
+    return h.hexdigest()[:16]
+
+
+def _chave(nome, impressao, args):
+    h = hashlib.sha256(repr((nome, CACHE_VERSION, impressao, args)).encode())
+    return f'{nome}-{h.hexdigest()[:16]}'
+
+
+def cached(nome, impressao, build, *args, cache_dir=CACHE_DIR):
+    """Devolve `build(*args)` do disco se a entrada existir; senão calcula e grava"""
+    if not CACHE_ENABLED:
+        marcar_cache('calculado')
+        return build(*args)
+
+    path = os.path.join(cache_dir, _chave(nome, impressao, args) + EXTENSAO)
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as arquivo:
+                resultado = pickle.load(arquivo)
+            os.utime(path)  # marca como usado recentemente para a remoção por tamanho
+            logger.info("cache %s: lido de %s", nome, path)
+            marcar_cache('disco')
+            return resultado
+        except (OSError, EOFError, pickle.UnpicklingError):
+            logger.warning("cache %s: entrada corrompida, recalculando", nome)
+
+    marcar_cache('calculado')
+    resultado = build(*args)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporario = f'{path}.{os.getpid()}.tmp'
+        with open(temporario, 'wb') as arquivo:
+            pickle.dump(resultado, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, path)
+        logger.info("cache %s: gravado em %s", nome, path)
+        evict(cache_dir)
+    except OSError as erro:
+        logger.warning("cache %s: não foi possível gravar (%s)", nome, erro)
+    return resultado
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, max_age_days=CACHE_MAX_AGE_DAYS):
+    """Remove entradas vencidas e, se passar do limite de tamanho, as usadas há mais tempo"""
+    if not os.path.isdir(cache_dir):
+        return []
+    entradas = []
+    for entrada in os.scandir(cache_dir):
+        if entrada.is_file() and entrada.name.endswith(EXTENSAO):
+            stat = entrada.stat()
+            entradas.append((stat.st_mtime, stat.st_size, entrada.path))
+    entradas.sort()
+
+    limite_idade = time.time() - max_age_days * 86400
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = []
+    for mtime, tamanho, path in entradas:
+        if mtime >= limite_idade and total <= max_bytes:
+            break
+        os.remove(path)
+        total -= tamanho
+        removidas.append(path)
+    return removidas
@@ -0,0 +1,20 @@
+"""
+Traços do Plotly que passam para WebGL em séries grandes.
+
+Em SVG (`go.Scatter`) o navegador cria um elemento por ponto, e o desenho fica lento
+com dezenas de milhares de pontos (dados horários, vários anos). `scatter` devolve
+um `go.Scattergl`, desenhado pela GPU em um canvas, quando o traço tem mais de
+`WEBGL_POINTS` pontos e um `go.Scatter` comum nos demais casos.
+"""
+import plotly.graph_objects as go
+from utils.config import WEBGL_POINTS
+
+
+def usa_webgl(n_pontos, limite=WEBGL_POINTS):
+    return n_pontos > limite
+
+
+def scatter(x, y, limite=WEBGL_POINTS, **kwargs):
+    """`go.Scatter` ou, acima de `limite` pontos, `go.Scattergl` com os mesmos argumentos"""
+    classe = go.Scattergl if usa_webgl(len(x), limite) else go.Scatter
+    return classe(x=x, y=y, **kwargs)
@@ -0,0 +1,105 @@
+"""
+Armazenamento colunar (Parquet) dos dados de sensores e do SUS.
+
+A conversão dos CSVs é feita uma única vez, a partir da raiz do repositório:
+
+    PYTHONPATH=EDA python -m utils.columnar_store
+
+As medições dos sensores são particionadas por estação e ano e as internações
+por ano de competência (ANO_CMPT). Os tipos ficam gravados no próprio arquivo,
+então a leitura não precisa inferir nada. Os loaders de `utils/data_loader.py`
+leem este armazenamento quando ele existe e só recorrem aos CSVs quando não existe.
+"""
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from utils.config import (POLUENTES_TRADUCAO, SENSOR_CSV_PATHS, SUS_CSV_PATHS, SUS_INTEREST_COLUMNS,
+                          SENSOR_STORE_PATH, SUS_STORE_PATH)
+
+SENSOR_PARTITIONING = ds.partitioning(pa.schema([('nome_estacao', pa.string()), ('ano', pa.int16())]), flavor='hive')
+SUS_PARTITIONING = ds.partitioning(pa.schema([('ANO_CMPT', pa.int16())]), flavor='hive')
+
+# Colunas dos CSVs por estação (ver notebooks de tratamento de valores vazios)
+SENSOR_COLUMNS = ['nome_estacao', 'data', 'data_formatada', 'ano', 'mes'] + list(POLUENTES_TRADUCAO.keys())
+
+SUS_CODE_COLUMNS = ['DIAG_PRINC', 'DIAG_SECUN']
+
+
+def tipar_sensores(df):
+    """Aplica os tipos do armazenamento às medições dos sensores"""
+    df = df.copy()
+    if 'data' in df.columns:
+        df['data'] = pd.to_datetime(df['data'])
+    if 'ano' in df.columns:
+        df['ano'] = df['ano'].astype('int16')
+    if 'mes' in df.columns:
+        df['mes'] = df['mes'].astype('int8')
+    for poluente in POLUENTES_TRADUCAO:
+        if poluente in df.columns:
+            df[poluente] = df[poluente].astype('float64')
+    return df
+
+
+def tipar_sus(df):
+    """Aplica os tipos do armazenamento às internações (códigos CID como texto)"""
+    df = df.copy()
+    df['ANO_CMPT'] = df['ANO_CMPT'].astype('int16')
+    for col in SUS_CODE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('string')
+    return df
+
+
+def store_exists(path):
+    return os.path.isdir(path) and any(os.scandir(path))
+
+
+def read_store(path, partitioning, columns=None, filter=None):
+    """Lê um conjunto Parquet particionado, apenas com as colunas e partições pedidas"""
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning)
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+
+def read_sensor_store(columns=None, filter=None, path=SENSOR_STORE_PATH):
+    return read_store(path, SENSOR_PARTITIONING, columns=columns, filter=filter)
+
+
+def read_sus_store(columns=None, filter=None, path=SUS_STORE_PATH):
+    return read_store(path, SUS_PARTITIONING, columns=columns, filter=filter)
+
+
+def write_store(df, path, partitioning):
+    """Grava o DataFrame como Parquet particionado, substituindo o conteúdo anterior"""
+    # Grava em uma pasta temporária e troca as pastas: partições que não existem mais (uma estação
+    # ou um ano removido) somem, e um leitor nunca vê o armazenamento pela metade
+    path = os.path.normpath(path)
+    temporario = f'{path}.{os.getpid()}.tmp'
+    antigo = f'{path}.{os.getpid()}.old'
+    shutil.rmtree(temporario, ignore_errors=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(table, temporario, format='parquet', partitioning=partitioning)
+    if os.path.exists(path):
+        os.replace(path, antigo)
+    os.replace(temporario, path)
+    shutil.rmtree(antigo, ignore_errors=True)
+
+
+def build_sensor_store(paths=SENSOR_CSV_PATHS, path=SENSOR_STORE_PATH):
+    df_sensor = pd.concat([pd.read_csv(url, sep=',', usecols=SENSOR_COLUMNS) for url in paths.values()],
+                          ignore_index=True)
+    write_store(tipar_sensores(df_sensor), path, SENSOR_PARTITIONING)
+    return len(df_sensor)
+
+
+def build_sus_store(paths=SUS_CSV_PATHS, path=SUS_STORE_PATH):
+    df_sus = pd.concat([pd.read_csv(url, sep=',', usecols=SUS_INTEREST_COLUMNS) for url in paths.values()],
+                       ignore_index=True)
+    write_store(tipar_sus(df_sus), path, SUS_PARTITIONING)
+    return len(df_sus)
+
+
+if __name__ == '__main__':
+    print(f"Sensores: {build_sensor_store()} linhas gravadas em {SENSOR_STORE_PATH}")
+    print(f"SUS: {build_sus_store()} linhas gravadas em {SUS_STORE_PATH}")
@@ -1,3 +1,5 @@
+import os
+
 POLUENTES_TRADUCAO = {
     'pm2_5': 'PM2.5 (µg/m³)',
     'pm10': 'PM10 (µg/m³)',
@@ -35,4 +37,109 @@ month_names = {
     1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
     5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
     9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
-}
\ No newline at end of file
+}
+
+# Arquivos de origem (CSV) de cada estação e de cada ano do DATASUS
+SENSOR_CSV_PATHS = {
+    'bangu': 'data/Sensors/por_estacao/df_sensor_bangu_preenchido.csv',
+    'campo_grande': 'data/Sensors/por_estacao/df_sensor_campo_grande_preenchido.csv',
+    'pedra_guaratiba': 'data/Sensors/por_estacao/df_sensor_pedra_guaratiba_preenchido.csv',
+    'iraja': 'data/Sensors/por_estacao/df_sensor_iraja_preenchido.csv',
+    'sao_cristovao': 'data/Sensors/por_estacao/df_sensor_sao_cristovao_preenchido.csv',
+    'tijuca': 'data/Sensors/por_estacao/df_sensor_tijuca_preenchido.csv',
+    'centro': 'data/Sensors/por_estacao/df_sensor_centro_preenchido.csv',
+    'copacabana': 'data/Sensors/por_estacao/df_sensor_copacabana_preenchido.csv'
+}
+
+# Nome de cada estação nos dados brutos (mesmas chaves de SENSOR_CSV_PATHS)
+SENSOR_STATION_NAMES = {
+    'bangu': 'ESTAÇÃO BANGU',
+    'campo_grande': 'ESTAÇÃO CAMPO GRANDE',
+    'pedra_guaratiba': 'ESTAÇÃO PEDRA DE GUARATIBA',
+    'iraja': 'ESTAÇÃO IRAJÁ',
+    'sao_cristovao': 'ESTAÇÃO SÃO CRISTÓVÃO',
+    'tijuca': 'ESTAÇÃO TIJUCA',
+    'centro': 'ESTAÇÃO CENTRO',
+    'copacabana': 'ESTAÇÃO COPACABANA'
+}
+
+# Cadastro das estações (nome, código, coordenadas), ver `utils/stations.py`
+SENSOR_STATIONS_PATH = 'data/Sensors/estacoes.csv'
+
+# Medições com transformação Box-Cox (página Poluentes x Doenças)
+SENSOR_BOXCOX_PATH = 'data/Sensors/medicoes-sensores-boxcox.csv'
+
+SUS_CSV_PATHS = {
+    2012: 'data/datasus/dados_filtrados_2012.csv',
+    2013: 'data/datasus/dados_filtrados_2013.csv',
+    2014: 'data/datasus/dados_filtrados_2014.csv',
+    2015: 'data/datasus/dados_filtrados_2015.csv',
+    2016: 'data/datasus/dados_filtrados_2016.csv',
+    2017: 'data/datasus/dados_filtrados_2017.csv',
+    2018: 'data/datasus/dados_filtrados_2018.csv',
+    2019: 'data/datasus/dados_filtrados_2019.csv'
+}
+
+SUS_INTEREST_COLUMNS = ['UF_ZI', 'ANO_CMPT', 'MES_CMPT', 'MUNIC_RES', 'NASC', 'SEXO', 'DT_INTER', 'DT_SAIDA', 'DIAG_PRINC', 'DIAG_SECUN', 'IDADE', 'DIAS_PERM', 'MORTE']
+
+# Armazenamento colunar (Parquet) gerado por `utils/columnar_store.py`
+STORE_DIR = 'data/store'
+SENSOR_STORE_PATH = STORE_DIR + '/sensores'
+SUS_STORE_PATH = STORE_DIR + '/sus'
+
+# Backend das consultas da visão geral dos sensores e da página de saúde: 'pandas' (DataFrames em memória)
+# ou 'duckdb' (SQL direto nos arquivos, só o resultado agregado vai para a memória; ver `utils/duckdb_backend.py`)
+QUERY_BACKEND = os.environ.get('QUALIAR_BACKEND', 'pandas')
+DUCKDB_MEMORY_LIMIT = os.environ.get('QUALIAR_DUCKDB_MEMORY', '1GB')
+DUCKDB_THREADS = int(os.environ.get('QUALIAR_DUCKDB_THREADS', os.cpu_count() or 1))
+
+# Modo horário das páginas de sensores: armazém float32 mapeado em memória (ver `utils/hourly_store.py`)
+SENSOR_HOURLY = os.environ.get('QUALIAR_HOURLY', '0') == '1'
+SENSOR_HOURLY_PATH = STORE_DIR + '/horario'
+
+# Pré-carga em segundo plano dos conjuntos das outras páginas depois de desenhar a atual (ver `utils/datasets.py`)
+PREFETCH = os.environ.get('QUALIAR_PREFETCH', '1') == '1'
+
+# Leitura paralela dos CSVs (ver `utils/ingestion.py`)
+INGESTION_WORKERS = int(os.environ.get('QUALIAR_INGESTION_WORKERS', os.cpu_count() or 1))
+INGESTION_PARSE_IN_PROCESSES = os.environ.get('QUALIAR_INGESTION_PROCESSES', '1') == '1'
+
+# Internações do município do Rio de Janeiro (UF_ZI) a partir de 2012
+MUNICIPIO_RIO_DE_JANEIRO = 330455
+SUS_DATA_INICIAL = '2012-01-01'
+
+# Leitura compacta do SUS (ver `utils/sus_reader.py`)
+SUS_COMPACT = os.environ.get('QUALIAR_SUS_COMPACT', '1') == '1'
+SUS_CHUNKSIZE = int(os.environ.get('QUALIAR_SUS_CHUNKSIZE', 200_000))
+
+# Download incremental do DATASUS/SIH (ver `utils/datasus.py`)
+DATASUS_DIR = 'data/datasus'
+DATASUS_CACHE_DIR = DATASUS_DIR + '/cache'
+DATASUS_UF = 'RJ'
+DATASUS_WORKERS = int(os.environ.get('QUALIAR_DATASUS_WORKERS', 4))
+
+# Cache em disco dos dados processados (ver `utils/cache.py`)
+# Aumente CACHE_VERSION quando o processamento dos loaders mudar
+CACHE_VERSION = 4
+CACHE_DIR = os.environ.get('QUALIAR_CACHE_DIR', 'data/cache')
+CACHE_ENABLED = os.environ.get('QUALIAR_DISK_CACHE', '1') == '1'
+CACHE_HASH = os.environ.get('QUALIAR_CACHE_HASH', 'mtime')  # 'mtime' (tamanho + data) ou 'sha256' (conteúdo)
+CACHE_MAX_BYTES = int(os.environ.get('QUALIAR_CACHE_MAX_MB', 2048)) * 1024 * 1024
+CACHE_MAX_AGE_DAYS = int(os.environ.get('QUALIAR_CACHE_MAX_AGE_DAYS', 30))
+# Caches em memória do Streamlit (`utils/data_loader.py`): cada mudança nos arquivos de origem cria uma entrada
+# nova, então só as MEMORY_CACHE_MAX_ENTRIES mais recentes de cada loader ficam em memória, por até MEMORY_CACHE_TTL
+MEMORY_CACHE_MAX_ENTRIES = int(os.environ.get('QUALIAR_MEMORY_CACHE_ENTRIES', 2))
+MEMORY_CACHE_TTL = float(os.environ.get('QUALIAR_MEMORY_CACHE_TTL_HOURS', 24)) * 3600  # segundos
+
+# Instrumentação dos reruns (ver `utils/profiling.py`): '1' mostra o painel de tempos na barra lateral,
+# 'cprofile' também grava o cProfile de cada rerun em PROFILE_DIR (o mesmo vale para ?profile= na URL)
+PROFILE_MODE = os.environ.get('QUALIAR_PROFILE', '0')
+PROFILE_DIR = os.environ.get('QUALIAR_PROFILE_DIR', 'data/profiles')
+
+# Redução das séries longas antes de enviar os gráficos ao navegador (ver `analytics/downsampling.py`):
+# pontos por série, da ordem da largura do gráfico em pixels no layout "wide"
+DOWNSAMPLE_POINTS = int(os.environ.get('QUALIAR_DOWNSAMPLE_POINTS', 1200))
+DOWNSAMPLE_METHOD = os.environ.get('QUALIAR_DOWNSAMPLE_METHOD', 'lttb')  # 'lttb' ou 'minmax'
+
+# Gráficos de dispersão e de linhas com mais pontos que isto usam WebGL (go.Scattergl; ver `utils/charts.py`)
+WEBGL_POINTS = int(os.environ.get('QUALIAR_WEBGL_POINTS', 1000))
@@ -1,52 +1,127 @@
 import pandas as pd
 import streamlit as st
-from sklearn.preprocessing import StandardScaler
-from utils.config import POLUENTES_TRADUCAO, POLUENTES_SCALED
+from utils.config import (POLUENTES_TRADUCAO, POLUENTES_SCALED, SENSOR_CSV_PATHS, SUS_CSV_PATHS, SUS_INTEREST_COLUMNS,
+                          SENSOR_STORE_PATH, SUS_STORE_PATH, SENSOR_STATIONS_PATH, SENSOR_BOXCOX_PATH,
+                          MUNICIPIO_RIO_DE_JANEIRO, SUS_DATA_INICIAL, SUS_COMPACT, MEMORY_CACHE_MAX_ENTRIES,
+                          MEMORY_CACHE_TTL)
+from utils.columnar_store import (SENSOR_COLUMNS, store_exists, read_sensor_store, read_sus_store, tipar_sensores,
+                                  tipar_sus)
+from utils.ingestion import read_csvs_parallel
+from utils.sus_reader import read_sus_compact
+from utils.rollup import build_rollup
+from utils.rolling_windows import maximos_diarios
+from utils.cache import cached, fingerprint
+from utils.stations import attach_coordinates
+from utils.time_index import sort_by_date
+from utils.profiling import perfilar, marcar_cache, anexar
+from utils import hourly_store
+from analytics.saude import adicionar_dimensoes, contagens
+from analytics.saude_indice import indexar
 
-# Carregamento dos dados
-@st.cache_data
+SENSOR_LOAD_COLUMNS = ['nome_estacao', 'data_formatada', 'ano', 'mes'] + list(POLUENTES_TRADUCAO.keys())
+
+def read_sensor_hourly(columns=SENSOR_COLUMNS):
+    """Medições horárias de todas as estações, sem agregação"""
+    # Lê o armazenamento colunar quando disponível (ver utils/columnar_store.py) e, na falta dele, os CSVs
+    if store_exists(SENSOR_STORE_PATH):
+        return read_sensor_store(columns=columns)
+    df_sensor, tempos = read_csvs_parallel(SENSOR_CSV_PATHS, usecols=columns)
+    anexar('Leitura dos CSVs dos sensores', tempos)
+    return tipar_sensores(df_sensor)
+
+def sensor_sources():
+    medicoes = [SENSOR_STORE_PATH] if store_exists(SENSOR_STORE_PATH) else list(SENSOR_CSV_PATHS.values())
+    return medicoes + [SENSOR_STATIONS_PATH]
+
+def sus_sources():
+    return [SUS_STORE_PATH] if store_exists(SUS_STORE_PATH) else list(SUS_CSV_PATHS.values())
+
+# Os loaders públicos calculam a impressão digital dos arquivos de origem e a passam às funções
+# com cache: se um arquivo muda, tanto o cache em memória quanto o em disco (utils/cache.py) são refeitos
+@perfilar(cache=True)
 def load_sensor_data():
-    url_bangu = 'data/Sensors/por_estacao/df_sensor_bangu_preenchido.csv'
-    url_campo_grande = 'data/Sensors/por_estacao/df_sensor_campo_grande_preenchido.csv'
-    url_pedra_guaratiba = 'data/Sensors/por_estacao/df_sensor_pedra_guaratiba_preenchido.csv'
-    url_iraja = 'data/Sensors/por_estacao/df_sensor_iraja_preenchido.csv'
-    url_sao_cristovao = 'data/Sensors/por_estacao/df_sensor_sao_cristovao_preenchido.csv'
-    url_tijuca = 'data/Sensors/por_estacao/df_sensor_tijuca_preenchido.csv'
-    url_centro = 'data/Sensors/por_estacao/df_sensor_centro_preenchido.csv'
-    url_copacabana = 'data/Sensors/por_estacao/df_sensor_copacabana_preenchido.csv'
-    
-    df_sensor_bangu = pd.read_csv(url_bangu, sep=',')
-    df_sensor_campo_grande = pd.read_csv(url_campo_grande, sep=',')
-    df_sensor_pedra_guaratiba = pd.read_csv(url_pedra_guaratiba, sep=',')
-    df_sensor_iraja = pd.read_csv(url_iraja, sep=',')
-    df_sensor_sao_cristovao = pd.read_csv(url_sao_cristovao, sep=',')
-    df_sensor_tijuca = pd.read_csv(url_tijuca, sep=',')
-    df_sensor_centro = pd.read_csv(url_centro, sep=',')
-    df_sensor_copacabana = pd.read_csv(url_copacabana, sep=',')
-    
-    df_sensor = pd.concat([
-        df_sensor_bangu,
-        df_sensor_campo_grande,
-        df_sensor_pedra_guaratiba,
-        df_sensor_iraja,
-        df_sensor_sao_cristovao,
-        df_sensor_tijuca,
-        df_sensor_centro,
-        df_sensor_copacabana
-    ], ignore_index=True)
+    return _load_sensor_data(fingerprint(sensor_sources()))
+
+@st.cache_data(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sensor_data(impressao):
+    return cached('sensor', impressao, build_sensor_data)
+
+# Carregamento dos dados
+def build_sensor_data():
+    df_sensor = read_sensor_hourly(SENSOR_LOAD_COLUMNS)
     
     # Processamento dos dados
     poluentes = [col for col in df_sensor.columns if col not in ['data_formatada', 'ano', 'mes', 'data', 'nome_estacao']]
     df_sensor_aggregated = df_sensor.groupby(by=['nome_estacao', 'data_formatada'])[list(POLUENTES_TRADUCAO.keys()) + ['ano', 'mes']].mean().reset_index()
     
+    # Coordenadas do cadastro de estações (ver utils/stations.py)
+    df_sensor_aggregated = attach_coordinates(df_sensor_aggregated)
+    
+    # Datas em datetime64 e linhas ordenadas por data: recortes por busca binária (ver utils/time_index.py)
+    df_sensor_aggregated = sort_by_date(df_sensor_aggregated)
+    
     return df_sensor_aggregated, poluentes
 
-# Carregamento dos dados
-@st.cache_data
+@perfilar(cache=True)
+def load_sensor_rollup():
+    """Cubo de agregados dia/mês/ano por estação e da cidade (ver utils/rollup.py)"""
+    return _load_sensor_rollup(fingerprint(sensor_sources()))
+
+# cache_resource: o cubo é somente leitura e é devolvido sem cópia a cada rerun
+@st.cache_resource(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sensor_rollup(impressao):
+    return cached('sensor_rollup', impressao, lambda: build_rollup(_load_sensor_data(impressao)[0], list(POLUENTES_TRADUCAO.keys())))
+
+@perfilar(cache=True)
+def load_sensor_windows():
+    """Máximos diários das médias móveis de 1h, 8h e 24h de cada estação (ver utils/rolling_windows.py)"""
+    return _load_sensor_windows(fingerprint(sensor_sources()))
+
+@st.cache_resource(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sensor_windows(impressao):
+    return cached('sensor_janelas', impressao, build_sensor_windows)
+
+def build_sensor_windows():
+    poluentes = list(POLUENTES_TRADUCAO.keys())
+    return maximos_diarios(read_sensor_hourly(['nome_estacao', 'data'] + poluentes), poluentes)
+
+@perfilar(cache=True)
+def load_sensor_hourly_store():
+    """Armazém horário float32 mapeado em memória, para o modo horário (ver utils/hourly_store.py)"""
+    return _load_sensor_hourly_store(fingerprint(sensor_sources()))
+
+# cache_resource: o memmap é somente leitura e o mesmo para todas as sessões
+@st.cache_resource(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sensor_hourly_store(impressao):
+    armazem, construido = hourly_store.preparar(impressao)
+    marcar_cache('calculado' if construido else 'disco')
+    return armazem
+
+@perfilar(cache=True)
+def load_query_backend():
+    """Conexão DuckDB com as views dos sensores e do SUS, para QUALIAR_BACKEND=duckdb (ver utils/duckdb_backend.py)"""
+    return _load_query_backend(fingerprint(sensor_sources() + sus_sources()))
+
+# cache_resource: uma conexão para todas as sessões; a impressão digital troca a conexão quando os arquivos mudam
+@st.cache_resource(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_query_backend(impressao):
+    from utils import duckdb_backend
+    marcar_cache('calculado')
+    return duckdb_backend.conectar()
+
+@perfilar(cache=True)
 def load_sensor_boxcox_data():
-  url_sensor_boxcox = 'data/Sensors/medicoes-sensores-boxcox.csv'
+  return _load_sensor_boxcox_data(fingerprint([SENSOR_BOXCOX_PATH]))
 
-  df_sensor = pd.read_csv(url_sensor_boxcox, sep=',')
+@st.cache_data(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sensor_boxcox_data(impressao):
+  return cached('sensor_boxcox', impressao, build_sensor_boxcox_data)
+
+# Carregamento dos dados
+def build_sensor_boxcox_data():
+  # sklearn leva quase um segundo para importar: só quando o cache não tem o resultado
+  from sklearn.preprocessing import StandardScaler
+  df_sensor = pd.read_csv(SENSOR_BOXCOX_PATH, sep=',')
   
   cols_to_scale = ['pm2_5', 'pm10', 'nox', 'temp', 'o3']
 
@@ -58,8 +133,35 @@ def load_sensor_boxcox_data():
   
   return df_sensor_aggregated
 
-@st.cache_data
-def load_sus_data():
+@perfilar(cache=True)
+def load_sus_data(compact=SUS_COMPACT):
+  return _load_sus_data(fingerprint(sus_sources()), compact)
+
+@st.cache_data(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sus_data(impressao, compact):
+  return cached('sus', impressao, build_sus_data, compact)
+
+@perfilar(cache=True)
+def load_sus_counts(compact=SUS_COMPACT):
+  """Tabelas de contagem da página de saúde, por dimensão (ver analytics/saude.py)"""
+  return _load_sus_counts(fingerprint(sus_sources()), compact)
+
+# cache_resource: tabelas pequenas e somente leitura, devolvidas sem cópia a cada rerun
+@st.cache_resource(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sus_counts(impressao, compact):
+  return cached('sus_contagens', impressao, lambda compact: contagens(_load_sus_data(impressao, compact)[0]), compact)
+
+@perfilar(cache=True)
+def load_sus_index(compact=SUS_COMPACT):
+  """Índice de bitmaps das internações para os filtros interativos (ver analytics/saude_indice.py)"""
+  return _load_sus_index(fingerprint(sus_sources()), compact)
+
+# cache_resource: os bitmaps são somente leitura e os mesmos para todas as sessões
+@st.cache_resource(max_entries=MEMORY_CACHE_MAX_ENTRIES, ttl=MEMORY_CACHE_TTL)
+def _load_sus_index(impressao, compact):
+  return cached('sus_indice', impressao, lambda compact: indexar(_load_sus_data(impressao, compact)[0]), compact)
+
+def build_sus_data(compact=SUS_COMPACT):
   urls = {
     'sus_2012': 'https://raw.githubusercontent.com/AILAB-CEFET-RJ/qualiar/refs/heads/main/data/datasus/dados_filtrados_2012.csv',
     'sus_2013': 'https://raw.githubusercontent.com/AILAB-CEFET-RJ/qualiar/refs/heads/main/data/datasus/dados_filtrados_2013.csv',
@@ -71,53 +173,32 @@ def load_sus_data():
     'sus_2019': 'https://raw.githubusercontent.com/AILAB-CEFET-RJ/qualiar/refs/heads/main/data/datasus/dados_filtrados_2019.csv'
   }
   
-  url_sus_2012 = 'data/datasus/dados_filtrados_2012.csv'
-  url_sus_2013 = 'data/datasus/dados_filtrados_2013.csv'
-  url_sus_2014 = 'data/datasus/dados_filtrados_2014.csv'
-  url_sus_2015 = 'data/datasus/dados_filtrados_2015.csv'
-  url_sus_2016 = 'data/datasus/dados_filtrados_2016.csv'
-  url_sus_2017 = 'data/datasus/dados_filtrados_2017.csv'
-  url_sus_2018 = 'data/datasus/dados_filtrados_2018.csv'
-  url_sus_2019 = 'data/datasus/dados_filtrados_2019.csv'
-  
-  df_sus_2012 = pd.read_csv(url_sus_2012, sep=',')
-  df_sus_2013 = pd.read_csv(url_sus_2013, sep=',')
-  df_sus_2014 = pd.read_csv(url_sus_2014, sep=',')
-  df_sus_2015 = pd.read_csv(url_sus_2015, sep=',')
-  df_sus_2016 = pd.read_csv(url_sus_2016, sep=',')
-  df_sus_2017 = pd.read_csv(url_sus_2017, sep=',')
-  df_sus_2018 = pd.read_csv(url_sus_2018, sep=',')
-  df_sus_2019 = pd.read_csv(url_sus_2019, sep=',')
+  if compact:
+    # Colunas podadas, filtro do município na leitura e tipos reduzidos (ver utils/sus_reader.py)
+    df_sus = read_sus_compact(MUNICIPIO_RIO_DE_JANEIRO, SUS_DATA_INICIAL)
+  else:
+    if store_exists(SUS_STORE_PATH):
+      df_sus = read_sus_store(columns=SUS_INTEREST_COLUMNS)
+    else:
+      df_sus, tempos = read_csvs_parallel(SUS_CSV_PATHS, usecols=SUS_INTEREST_COLUMNS)
+      anexar('Leitura dos CSVs do SUS', tempos)
+      df_sus = tipar_sus(df_sus[SUS_INTEREST_COLUMNS])
     
-  df_sus = pd.concat([
-    df_sus_2012,
-    df_sus_2013,
-    df_sus_2014,
-    df_sus_2015,
-    df_sus_2016,
-    df_sus_2017,
-    df_sus_2018,
-    df_sus_2019
-  ], ignore_index=True)
-  
-  interest_columns = ['UF_ZI', 'ANO_CMPT', 'MES_CMPT', 'MUNIC_RES', 'NASC', 'SEXO', 'DT_INTER', 'DT_SAIDA', 'DIAG_PRINC', 'DIAG_SECUN', 'IDADE', 'DIAS_PERM', 'MORTE']
+    df_sus = df_sus[df_sus['UF_ZI'] == MUNICIPIO_RIO_DE_JANEIRO]
 
-  df_sus = df_sus[interest_columns]
-  
-  municipios_rio_de_janeiro = 330455
-  
-  df_sus = df_sus[df_sus['UF_ZI'] == municipios_rio_de_janeiro]
+    df_sus['data_formatada'] = pd.to_datetime(df_sus['DT_INTER'], format='%Y%m%d').dt.strftime('%Y-%m-%d')
 
-  df_sus['data_formatada'] = pd.to_datetime(df_sus['DT_INTER'], format='%Y%m%d').dt.strftime('%Y-%m-%d')
+    df_sus.sort_values(by='data_formatada', inplace=True)
 
-  df_sus.sort_values(by='data_formatada', inplace=True)
+    df_sus = df_sus[(df_sus['data_formatada'] >= SUS_DATA_INICIAL)]
 
-  df_sus = df_sus[(df_sus['data_formatada'] >= '2012-01-01')]
+    df_sus['data_formatada_dt'] = pd.to_datetime(df_sus['data_formatada'])
 
-  df_sus['data_formatada_dt'] = pd.to_datetime(df_sus['data_formatada'])
+    df_sus['ano'] = df_sus['data_formatada_dt'].dt.year
+    df_sus['mes'] = df_sus['data_formatada_dt'].dt.month
 
-  df_sus['ano'] = df_sus['data_formatada_dt'].dt.year
-  df_sus['mes'] = df_sus['data_formatada_dt'].dt.month
+  # Faixa etária e descrição do sexo em categorias, calculadas uma vez aqui e não a cada rerun da página
+  df_sus = adicionar_dimensoes(df_sus)
 
   df_sus_aggregated = df_sus.groupby(['ano', 'mes']).agg(
       num_internacoes=('DT_INTER', 'count')
@@ -0,0 +1,90 @@
+"""
+Registro dos conjuntos de dados do dashboard: cada página declara as entradas que usa.
+
+`main.py` carregava sensores, SUS e Box-Cox em todo rerun, antes do roteamento, e a
+primeira visita a qualquer página pagava os três. Agora cada página lista os nomes
+de `CONJUNTOS` de que precisa (`PAGINAS` em `main.py`), `carregar` materializa só
+esses e, depois que a página foi desenhada, `pre_carregar` aquece em uma thread de
+fundo os caches dos conjuntos das outras páginas.
+
+Os loaders são os de `utils/data_loader.py`. O cache do Streamlit é do processo
+(vale para todas as sessões e threads) e calcula cada chave uma vez: uma página que
+pede um conjunto ainda em pré-carga espera o cálculo em andamento em vez de repeti-lo.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import SENSOR_HOURLY, PREFETCH
+from utils.data_loader import (load_sensor_data, load_sus_data, load_sensor_boxcox_data, load_sensor_rollup,
+                               load_sensor_windows, load_sensor_hourly_store, load_query_backend,
+                               load_sus_counts, load_sus_index)
+
+logger = logging.getLogger(__name__)
+
+
+def _sensor_horario():
+    # Modo horário (QUALIAR_HOURLY=1): medições de cada hora lidas do armazém mapeado em memória
+    return load_sensor_hourly_store() if SENSOR_HOURLY else None
+
+
+# nome -> (loader, posição no resultado do loader ou None para o resultado inteiro)
+CONJUNTOS = {
+    'df_sensor': (load_sensor_data, 0),
+    'sensor_rollup': (load_sensor_rollup, None),
+    'sensor_janelas': (load_sensor_windows, None),
+    'sensor_horario': (_sensor_horario, None),
+    'df_sus': (load_sus_data, 0),
+    'df_sus_aggregated': (load_sus_data, 1),
+    'sus_contagens': (load_sus_counts, None),
+    'sus_indice': (load_sus_index, None),
+    'df_sensor_boxcox': (load_sensor_boxcox_data, None),
+    'consultas': (load_query_backend, None),
+}
+
+# Uma thread só: a pré-carga não disputa a CPU com as sessões mais do que o necessário
+_THREAD = 'pre-carga'
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=_THREAD)
+_pendentes = {}  # loader -> Future ainda não concluído
+
+
+def _loaders(nomes):
+    loaders = []
+    for nome in nomes:
+        loader, _ = CONJUNTOS[nome]
+        if loader not in loaders:
+            loaders.append(loader)
+    return loaders
+
+
+def carregar(nomes):
+    """{nome: conjunto} só com os conjuntos pedidos (cada loader roda uma vez)"""
+    resultados = {loader: loader() for loader in _loaders(nomes)}
+    dados = {}
+    for nome in nomes:
+        loader, posicao = CONJUNTOS[nome]
+        dados[nome] = resultados[loader] if posicao is None else resultados[loader][posicao]
+    return dados
+
+
+def _fora_da_pre_carga(registro):
+    return not registro.threadName.startswith(_THREAD)
+
+
+# O spinner do cache procura a sessão do Streamlit e avisa a cada chamada que a thread de fundo não tem uma
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(_fora_da_pre_carga)
+
+
+def _pre_carregar(loader):
+    try:
+        loader()
+    except Exception:
+        logger.exception("pré-carga de %s falhou", loader.__name__)
+
+
+def pre_carregar(nomes):
+    """Aquece em segundo plano o cache dos loaders de `nomes` (não espera; sem efeito com QUALIAR_PREFETCH=0)"""
+    if not PREFETCH:
+        return
+    for loader in _loaders(nomes):
+        futuro = _pendentes.get(loader)
+        if futuro is None or futuro.done():
+            _pendentes[loader] = _executor.submit(_pre_carregar, loader)
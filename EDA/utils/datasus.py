@@ -0,0 +1,220 @@
+"""
+Download incremental das internações do SIH/DATASUS (substitui o notebook
+`data/datasus/download_datasus.ipynb`).
+
+Cada (ano, mês) é baixado, filtrado (doenças respiratórias, `DIAGSEC1` iniciando
+com 'J' e `IDENT == '1'`) e gravado em `data/datasus/cache/{ano}/{mes}.parquet`.
+O `manifest.json` do cache guarda, para cada mês, a assinatura dos arquivos de
+origem (nome, tamanho e data de modificação); nas execuções seguintes só são
+baixados os meses que faltam ou cujos arquivos mudaram. Os meses são baixados em
+paralelo e o manifesto é gravado a cada mês concluído, então uma execução
+interrompida continua de onde parou.
+
+Os CSVs anuais (`dados_filtrados_{ano}.csv`) são montados com um único `pd.concat`
+dos meses em cache. Uso, a partir da raiz do repositório:
+
+    PYTHONPATH=EDA python -m utils.datasus 2012 2013 2014
+    PYTHONPATH=EDA python -m utils.datasus 2019 --meses 1 2 --workers 8
+    PYTHONPATH=EDA python -m utils.datasus 2019 --fonte-local /caminho/para/arquivos_RD
+
+`--fonte-local` usa `LocalSIHSource`, que lê arquivos de uma pasta com a mesma
+interface do `pysus.SIH` (útil para testes e para trabalhar sem acesso ao FTP).
+"""
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from utils.config import DATASUS_DIR, DATASUS_CACHE_DIR, DATASUS_UF, DATASUS_WORKERS
+
+logger = logging.getLogger(__name__)
+
+MESES = list(range(1, 13))
+MANIFESTO = 'manifest.json'
+
+
+def carregar_sih():
+    """Fonte padrão: SIH do pysus (instalado à parte, só funciona em Linux)"""
+    from pysus import SIH
+    return SIH().load()
+
+
+class LocalSIHSource:
+    """
+    Fonte local com a interface usada do `pysus.SIH` (`get_files` e `download`).
+
+    Lê arquivos `RD{UF}{aa}{mm}.parquet` (ou `.csv`) de `pasta`.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+
+    def load(self):
+        return self
+
+    def get_files(self, grupo, uf, year, month):
+        arquivos = []
+        for mes in month:
+            for extensao in ('parquet', 'csv'):
+                caminho = os.path.join(self.pasta, f'{grupo}{uf}{year % 100:02d}{mes:02d}.{extensao}')
+                if os.path.exists(caminho):
+                    arquivos.append(_ArquivoLocal(caminho))
+        return arquivos
+
+    def download(self, files):
+        dados = [_ArquivoLocal(arquivo.path) for arquivo in files]
+        return dados[0] if len(dados) == 1 else dados
+
+
+class _ArquivoLocal:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        stat = os.stat(path)
+        self.info = {'size': stat.st_size, 'modify': stat.st_mtime_ns}
+
+    def to_dataframe(self):
+        if self.path.endswith('.csv'):
+            return pd.read_csv(self.path, dtype=str)
+        return pd.read_parquet(self.path)
+
+
+def filtrar_respiratorias(df):
+    """Mesmo filtro do notebook: diagnóstico secundário do capítulo J e AIH normal"""
+    return df[df['DIAGSEC1'].str.startswith('J', na=False) & (df['IDENT'] == '1')]
+
+
+def assinatura(files):
+    """Identifica a versão dos arquivos de origem de um mês"""
+    assinaturas = []
+    for arquivo in files:
+        info = getattr(arquivo, 'info', None) or {}
+        assinaturas.append({
+            'nome': str(getattr(arquivo, 'name', arquivo)),
+            'tamanho': str(info.get('size', '')),
+            'modificado': str(info.get('modify', info.get('last_update', ''))),
+        })
+    return sorted(assinaturas, key=lambda a: a['nome'])
+
+
+def caminho_mes(ano, mes, cache_dir=DATASUS_CACHE_DIR):
+    return os.path.join(cache_dir, str(ano), f'{mes:02d}.parquet')
+
+
+def ler_manifesto(cache_dir=DATASUS_CACHE_DIR):
+    caminho = os.path.join(cache_dir, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_manifesto(manifesto, cache_dir=DATASUS_CACHE_DIR):
+    # Grava em um arquivo temporário e substitui, para não corromper o manifesto se o processo cair
+    caminho = os.path.join(cache_dir, MANIFESTO)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def _chave(ano, mes):
+    return f'{ano}-{mes:02d}'
+
+
+def _atualizado(entrada, files, ano, mes, cache_dir):
+    if entrada is None or entrada['arquivos'] != assinatura(files):
+        return False
+    return entrada['linhas'] == 0 or os.path.exists(caminho_mes(ano, mes, cache_dir))
+
+
+def baixar_mes(source_factory, ano, mes, entrada=None, uf=DATASUS_UF, cache_dir=DATASUS_CACHE_DIR, forcar=False):
+    """
+    Baixa, filtra e grava um mês, se ainda não estiver atualizado no cache.
+
+    Retorna a nova entrada do manifesto ou None quando o mês já estava atualizado.
+    """
+    sih = source_factory()
+    files = sih.get_files('RD', uf=uf, year=ano, month=[mes])
+    if not forcar and _atualizado(entrada, files, ano, mes, cache_dir):
+        return None
+
+    linhas = 0
+    if files:
+        dados = sih.download(files)
+        if not isinstance(dados, list):
+            dados = [dados]
+        df_filtrado = pd.concat([filtrar_respiratorias(d.to_dataframe()) for d in dados], ignore_index=True)
+        destino = caminho_mes(ano, mes, cache_dir)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        df_filtrado.to_parquet(destino + '.tmp', index=False)
+        os.replace(destino + '.tmp', destino)
+        linhas = len(df_filtrado)
+    return {'arquivos': assinatura(files), 'linhas': linhas}
+
+
+def atualizar_cache(anos, meses=MESES, source_factory=carregar_sih, workers=DATASUS_WORKERS,
+                    uf=DATASUS_UF, cache_dir=DATASUS_CACHE_DIR, forcar=False):
+    """Baixa em paralelo os meses que faltam ou mudaram; retorna as chaves 'ano-mes' baixadas"""
+    os.makedirs(cache_dir, exist_ok=True)
+    manifesto = ler_manifesto(cache_dir)
+    baixados = []
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        tarefas = {
+            pool.submit(baixar_mes, source_factory, ano, mes, manifesto.get(_chave(ano, mes)), uf, cache_dir, forcar):
+                _chave(ano, mes)
+            for ano in anos for mes in meses
+        }
+        for tarefa in as_completed(tarefas):
+            chave = tarefas[tarefa]
+            entrada = tarefa.result()
+            if entrada is None:
+                logger.info("%s: já atualizado", chave)
+                continue
+            manifesto[chave] = entrada
+            gravar_manifesto(manifesto, cache_dir)
+            baixados.append(chave)
+            logger.info("%s: %d internações filtradas", chave, entrada['linhas'])
+
+    return sorted(baixados)
+
+
+def montar_anual(ano, cache_dir=DATASUS_CACHE_DIR, destino_dir=DATASUS_DIR):
+    """Junta os meses do ano em cache em `dados_filtrados_{ano}.csv` (um único concat)"""
+    manifesto = ler_manifesto(cache_dir)
+    partes = [pd.read_parquet(caminho_mes(ano, mes, cache_dir)) for mes in MESES
+              if manifesto.get(_chave(ano, mes), {}).get('linhas')]
+    if not partes:
+        return None
+    os.makedirs(destino_dir, exist_ok=True)
+    destino = os.path.join(destino_dir, f'dados_filtrados_{ano}.csv')
+    pd.concat(partes, ignore_index=True).to_csv(destino, index=False)
+    return destino
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Download incremental do SIH/DATASUS')
+    parser.add_argument('anos', nargs='+', type=int)
+    parser.add_argument('--meses', nargs='+', type=int, default=MESES)
+    parser.add_argument('--workers', type=int, default=DATASUS_WORKERS)
+    parser.add_argument('--uf', default=DATASUS_UF)
+    parser.add_argument('--cache', default=DATASUS_CACHE_DIR)
+    parser.add_argument('--destino', default=DATASUS_DIR)
+    parser.add_argument('--fonte-local', help='pasta com arquivos RD{UF}{aa}{mm} no lugar do FTP do DATASUS')
+    parser.add_argument('--forcar', action='store_true', help='baixa novamente mesmo os meses já atualizados')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    source_factory = (lambda: LocalSIHSource(args.fonte_local)) if args.fonte_local else carregar_sih
+
+    baixados = atualizar_cache(args.anos, args.meses, source_factory, args.workers, args.uf, args.cache, args.forcar)
+    print(f"{len(baixados)} mês(es) baixado(s)")
+    for ano in args.anos:
+        destino = montar_anual(ano, args.cache, args.destino)
+        print(f"{ano}: {destino or 'sem dados'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Backend SQL opcional (DuckDB) sobre os arquivos dos sensores e do SUS.
+
+Com `QUALIAR_BACKEND=duckdb`, a visão geral dos sensores e a página de saúde não
+recebem os DataFrames completos: cada gráfico pede ao DuckDB só o resultado agregado
+de que precisa (funções de `analytics/sensores_sql.py` e `analytics/saude_sql.py`).
+As consultas leem direto o armazenamento Parquet (`utils/columnar_store.py`) ou, na
+falta dele, os CSVs. No Parquet, os filtros por ano descartam partições inteiras e só
+as colunas usadas são lidas; sobre os CSVs, cada consulta relê os arquivos inteiros. Acima de `DUCKDB_MEMORY_LIMIT` o DuckDB usa o disco, então
+um pod pequeno responde sobre mais dados do que cabem na sua memória.
+
+Views da conexão:
+
+- `sensores`: medições horárias (`data` em TIMESTAMP, `data_formatada` em DATE);
+- `sensores_diarios`: média diária de cada estação, como `load_sensor_data`;
+- `sus`: internações do município a partir de `SUS_DATA_INICIAL`, com `data_formatada`,
+  `ano` e `mes` da data de internação, como `load_sus_data`.
+
+Requer o pacote `duckdb` (opcional, importado só neste modo).
+"""
+import logging
+from utils.config import (POLUENTES_TRADUCAO, SENSOR_CSV_PATHS, SUS_CSV_PATHS, SUS_INTEREST_COLUMNS, SENSOR_STORE_PATH,
+                          SUS_STORE_PATH, MUNICIPIO_RIO_DE_JANEIRO, SUS_DATA_INICIAL, DUCKDB_MEMORY_LIMIT,
+                          DUCKDB_THREADS)
+from utils.columnar_store import SUS_CODE_COLUMNS, store_exists
+
+VARIAVEIS = list(POLUENTES_TRADUCAO.keys())
+
+logger = logging.getLogger(__name__)
+
+# Tipos das colunas dos CSVs dos sensores: uma variável vazia em um arquivo seria lida como VARCHAR
+TIPOS_SENSORES = {'data': 'TIMESTAMP', **{var: 'DOUBLE' for var in VARIAVEIS}}
+
+
+def _texto(valor):
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def _fonte(pasta, csvs, tipos=None):
+    """Leitura do armazenamento Parquet particionado ou, se ele não existir, dos CSVs"""
+    if store_exists(pasta):
+        return f"read_parquet({_texto(pasta + '/**/*.parquet')}, hive_partitioning = true)"
+    arquivos = ', '.join(_texto(caminho) for caminho in csvs)
+    opcoes = ''
+    if tipos:
+        opcoes = ', types = {' + ', '.join(f'{_texto(coluna)}: {_texto(tipo)}' for coluna, tipo in tipos.items()) + '}'
+    return f"read_csv([{arquivos}], header = true, union_by_name = true{opcoes})"
+
+
+def _views(conexao):
+    variaveis = ', '.join(VARIAVEIS)
+    medias = ', '.join(f'avg({var}) AS {var}' for var in VARIAVEIS)
+    conexao.execute(f"""
+        CREATE VIEW sensores AS
+        SELECT nome_estacao, CAST(data AS TIMESTAMP) AS data, CAST(data_formatada AS DATE) AS data_formatada,
+               ano, mes, {variaveis}
+        FROM {_fonte(SENSOR_STORE_PATH, SENSOR_CSV_PATHS.values(), TIPOS_SENSORES)}
+    """)
+    # Agrupar também por ano e mês (constantes no dia) deixa os filtros por ano chegarem às partições
+    conexao.execute(f"""
+        CREATE VIEW sensores_diarios AS
+        SELECT nome_estacao, data_formatada, ano, mes, {medias}
+        FROM sensores
+        GROUP BY nome_estacao, data_formatada, ano, mes
+    """)
+    data_inicial = int(SUS_DATA_INICIAL.replace('-', ''))
+    conexao.execute(f"""
+        CREATE VIEW sus AS
+        SELECT {', '.join(SUS_INTEREST_COLUMNS)},
+               CAST(strptime(CAST(DT_INTER AS VARCHAR), '%Y%m%d') AS DATE) AS data_formatada,
+               CAST(DT_INTER // 10000 AS INTEGER) AS ano,
+               CAST(DT_INTER // 100 % 100 AS INTEGER) AS mes
+        FROM {_fonte(SUS_STORE_PATH, SUS_CSV_PATHS.values(), {col: 'VARCHAR' for col in SUS_CODE_COLUMNS})}
+        WHERE UF_ZI = {int(MUNICIPIO_RIO_DE_JANEIRO)} AND DT_INTER >= {data_inicial}
+    """)
+
+
+def conectar(memoria=DUCKDB_MEMORY_LIMIT, threads=DUCKDB_THREADS):
+    """Conexão DuckDB em memória com as views `sensores`, `sensores_diarios` e `sus`"""
+    import duckdb
+    for pasta in (SENSOR_STORE_PATH, SUS_STORE_PATH):
+        if not store_exists(pasta):
+            logger.warning("%s não existe: as consultas DuckDB vão reler os CSVs a cada gráfico", pasta)
+    conexao = duckdb.connect(':memory:', config={'memory_limit': memoria, 'threads': threads})
+    _views(conexao)
+    return conexao
+
+
+def consultar(conexao, sql, parametros=None):
+    """Resultado da consulta como DataFrame; cada chamada usa o próprio cursor (a conexão é compartilhada entre sessões)"""
+    with conexao.cursor() as cursor:
+        return cursor.execute(sql, parametros).df()
+
+
+def coluna(nome):
+    """Nome de uma variável dos sensores para compor o SQL (só as de POLUENTES_TRADUCAO)"""
+    if nome not in VARIAVEIS:
+        raise ValueError(f"Variável desconhecida: {nome!r}")
+    return nome
+
+
+def lista(valores):
+    """Inteiros para um `IN (...)` (literais, para que os filtros por ano cheguem às partições do Parquet)"""
+    return ', '.join(str(int(valor)) for valor in valores)
+
+
+def filtro_periodo(anos, meses=None, ano='ano', mes='mes'):
+    """Condição SQL dos anos pedidos e, se houver, só dos meses pedidos (sem meses = ano inteiro)"""
+    if not anos:
+        return 'FALSE'
+    condicao = f'{ano} IN ({lista(anos)})'
+    if meses:
+        condicao += f' AND {mes} IN ({lista(meses)})'
+    return condicao
@@ -0,0 +1,98 @@
+"""
+Preenchimento de valores vazios das medições horárias dos sensores.
+
+Mesma regra dos notebooks de `notebooks/analise-exploratoria/tratamento_valores_vazios/`:
+para cada estação e variável, conta os valores vazios de cada dia e interpola
+linearmente (`Series.interpolate()`) apenas as linhas dos dias com até `limite`
+valores vazios. As linhas dos demais dias ficam de fora da interpolação, como no
+`df[mask][col].interpolate()` dos notebooks.
+
+Em vez de um notebook por estação e uma célula por coluna, todas as estações e
+variáveis são tratadas de uma vez: as posições e os valores válidos anterior e
+seguinte de cada linha vêm de `ffill`/`bfill` agrupados por estação.
+
+Para gerar os CSVs `df_sensor_{estacao}_preenchido.csv` a partir das medições
+brutas (a partir da raiz do repositório):
+
+    PYTHONPATH=EDA python -m utils.gap_filling medicao-sensores.csv
+"""
+import os
+import sys
+import pandas as pd
+from utils.config import SENSOR_CSV_PATHS, SENSOR_STATION_NAMES
+
+VARIAVEIS = ['chuva', 'temp', 'ur', 'co', 'no', 'no2', 'nox', 'so2', 'o3', 'pm10', 'pm2_5']
+LIMITE_NULOS_DIA = 6
+
+
+def preencher_lacunas(df, variaveis=VARIAVEIS, limite=LIMITE_NULOS_DIA, estacao='nome_estacao', dia='data_formatada'):
+    """
+    Interpola os valores vazios dos dias com até `limite` vazios, por estação e variável.
+
+    As linhas de cada estação precisam estar em ordem temporal. Retorna o DataFrame
+    preenchido e uma tabela com os vazios antes e depois por estação e variável.
+    """
+    df = df.copy()
+    valores = df[variaveis].astype('float64')
+    vazios = valores.isna()
+    grupos_estacao = df[estacao]
+
+    nulos_no_dia = vazios.groupby([df[estacao], df[dia]], sort=False).transform('sum')
+    elegivel = nulos_no_dia <= limite
+
+    # Posição de cada linha dentro da sequência de linhas elegíveis da estação
+    posicao = elegivel.astype('int64').groupby(grupos_estacao, sort=False).cumsum()
+    valido = elegivel & ~vazios
+    pos_valida = posicao.where(valido)
+    val_valido = valores.where(valido)
+
+    pos_anterior = pos_valida.groupby(grupos_estacao, sort=False).ffill()
+    val_anterior = val_valido.groupby(grupos_estacao, sort=False).ffill()
+    pos_seguinte = pos_valida.groupby(grupos_estacao, sort=False).bfill()
+    val_seguinte = val_valido.groupby(grupos_estacao, sort=False).bfill()
+
+    interpolado = val_anterior + (val_seguinte - val_anterior) * (posicao - pos_anterior) / (pos_seguinte - pos_anterior)
+    # Depois do último valor válido repete o último valor (comportamento do interpolate);
+    # antes do primeiro, continua vazio
+    interpolado = interpolado.where(pos_seguinte.notna(), val_anterior)
+
+    alvo = elegivel & vazios
+    df[variaveis] = valores.where(~alvo, interpolado)
+
+    estatisticas = pd.DataFrame({
+        'vazios': vazios.groupby(grupos_estacao).sum().stack(),
+        'elegiveis': alvo.groupby(grupos_estacao).sum().stack(),
+        'restantes': df[variaveis].isna().groupby(grupos_estacao).sum().stack(),
+    })
+    estatisticas.index.names = [estacao, 'variavel']
+    estatisticas['preenchidos'] = estatisticas['vazios'] - estatisticas['restantes']
+    estatisticas['pct_preenchido'] = (100 * estatisticas['preenchidos'] / estatisticas['vazios']).round(1)
+    return df, estatisticas.reset_index()
+
+
+def preparar_medicoes(df_medicoes, df_estacoes):
+    """Mesma preparação dos notebooks: nome da estação, colunas de interesse, datas e anos 2012-2019"""
+    df = df_medicoes.copy()
+    df['nome_estacao'] = df['codnum'].map(df_estacoes.set_index('codnum')['nome'])
+    df = df[['nome_estacao', 'data'] + VARIAVEIS]
+    df['data'] = pd.to_datetime(df['data'], format='%Y/%m/%d %H:%M:%S+00')
+    df['data_formatada'] = df['data'].dt.strftime('%Y-%m-%d')
+    df['ano'] = df['data'].dt.year
+    df['mes'] = df['data'].dt.month
+    df = df[(df['ano'] > 2011) & (df['ano'] < 2020)]
+    return df.sort_values(['nome_estacao', 'data'], kind='stable')
+
+
+if __name__ == '__main__':
+    origem = sys.argv[1]
+    estacoes = sys.argv[2] if len(sys.argv) > 2 else 'data/Sensors/estacoes.csv'
+
+    df_sensor = preparar_medicoes(pd.read_csv(origem, sep=','), pd.read_csv(estacoes, sep=',', encoding='utf-8-sig'))
+    df_preenchido, estatisticas = preencher_lacunas(df_sensor)
+    print(estatisticas.to_string(index=False))
+
+    for chave, nome in SENSOR_STATION_NAMES.items():
+        destino = SENSOR_CSV_PATHS[chave]
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        df_preenchido[df_preenchido['nome_estacao'] == nome].to_csv(destino, index=False)
+        print(f"{nome}: {destino}")
@@ -0,0 +1,181 @@
+"""
+Armazém horário dos sensores: um array float32 mapeado em memória (modo horário).
+
+`load_sensor_data` reduz as medições a médias diárias; o modo horário
+(`QUALIAR_HOURLY=1`) dá às páginas as medições de cada hora sem carregar o histórico
+horário inteiro em cada processo. O armazém fica em `SENSOR_HOURLY_PATH`:
+
+- `valores.f32`: array (variável, estação, hora) em float32, NaN nas horas sem
+  medição, com as horas contadas a partir da meia-noite do primeiro dia e dias
+  completos (24 horas cada). A janela de uma variável em uma estação é um trecho
+  contíguo do arquivo.
+- `meta.json`: primeiro dia, número de dias, estações, variáveis e a impressão
+  digital dos arquivos de origem (um armazém desatualizado é refeito).
+
+O arquivo é aberto com `np.memmap` em modo leitura: as consultas leem só as páginas
+que tocam e o sistema operacional compartilha essas páginas entre os processos.
+A construção lê uma estação (ou um CSV) por vez, então o pico de memória é o de um
+bloco. Para construir ou refazer a partir da raiz do repositório:
+
+    PYTHONPATH=EDA python -m utils.hourly_store
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from utils.config import POLUENTES_TRADUCAO, SENSOR_CSV_PATHS, SENSOR_STORE_PATH, SENSOR_HOURLY_PATH
+from utils.columnar_store import SENSOR_PARTITIONING, store_exists
+
+VALORES = 'valores.f32'
+META = 'meta.json'
+VARIAVEIS = list(POLUENTES_TRADUCAO.keys())
+HORAS_DIA = 24
+DIAS_POR_BLOCO = 366  # perfis diurnos percorrem o armazém um ano por vez
+
+
+def _blocos(colunas):
+    """Medições horárias aos pedaços: uma estação do armazenamento colunar ou um CSV por vez"""
+    if store_exists(SENSOR_STORE_PATH):
+        dataset = ds.dataset(SENSOR_STORE_PATH, format='parquet', partitioning=SENSOR_PARTITIONING)
+        estacoes = dataset.to_table(columns=['nome_estacao']).column('nome_estacao').unique().to_pylist()
+        for estacao in sorted(estacoes):
+            yield dataset.to_table(columns=colunas, filter=ds.field('nome_estacao') == estacao).to_pandas()
+        return
+    for url in SENSOR_CSV_PATHS.values():
+        yield pd.read_csv(url, sep=',', usecols=colunas)
+
+
+def _horas(datas):
+    return pd.to_datetime(datas).to_numpy(dtype='datetime64[h]').astype('int64')
+
+
+def construir(impressao=None, pasta=SENSOR_HOURLY_PATH, variaveis=VARIAVEIS):
+    """Grava o armazém a partir das medições horárias (duas passadas: calendário e valores)"""
+    estacoes, primeira, ultima = set(), None, None
+    for bloco in _blocos(['nome_estacao', 'data']):
+        if bloco.empty:
+            continue
+        horas = _horas(bloco['data'])
+        estacoes.update(bloco['nome_estacao'].astype(str).unique())
+        primeira = horas.min() if primeira is None else min(primeira, horas.min())
+        ultima = horas.max() if ultima is None else max(ultima, horas.max())
+    if primeira is None:
+        raise ValueError("Nenhuma medição horária encontrada")
+
+    estacoes = sorted(estacoes)
+    inicio = primeira // HORAS_DIA * HORAS_DIA
+    n_dias = int((ultima - inicio) // HORAS_DIA + 1)
+
+    # Grava em um arquivo temporário e troca no fim: quem estiver lendo nunca vê um armazém pela metade
+    os.makedirs(pasta, exist_ok=True)
+    temporario = os.path.join(pasta, f'{VALORES}.{os.getpid()}.tmp')
+    valores = np.memmap(temporario, dtype='float32', mode='w+', shape=(len(variaveis), len(estacoes), n_dias * HORAS_DIA))
+    valores[:] = np.nan
+    for bloco in _blocos(['nome_estacao', 'data'] + variaveis):
+        if bloco.empty:
+            continue
+        linhas = pd.Index(estacoes).get_indexer(bloco['nome_estacao'].astype(str))
+        horas = _horas(bloco['data']) - inicio
+        valores[:, linhas, horas] = bloco[variaveis].to_numpy(dtype='float32').T
+    valores.flush()
+    del valores
+
+    meta = {
+        'inicio': str(np.datetime64(int(inicio), 'h').astype('datetime64[D]')),
+        'n_dias': n_dias,
+        'estacoes': estacoes,
+        'variaveis': list(variaveis),
+        'impressao': impressao,
+    }
+    temporario_meta = os.path.join(pasta, f'{META}.{os.getpid()}.tmp')
+    with open(temporario_meta, 'w', encoding='utf-8') as arquivo:
+        json.dump(meta, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, os.path.join(pasta, VALORES))
+    os.replace(temporario_meta, os.path.join(pasta, META))
+    return abrir(pasta)
+
+
+def abrir(pasta=SENSOR_HOURLY_PATH):
+    """Armazém como dicionário (metadados + `valores`, o memmap somente leitura); None se não existir"""
+    caminho_meta = os.path.join(pasta, META)
+    if not os.path.exists(caminho_meta):
+        return None
+    with open(caminho_meta, encoding='utf-8') as arquivo:
+        meta = json.load(arquivo)
+    forma = (len(meta['variaveis']), len(meta['estacoes']), meta['n_dias'] * HORAS_DIA)
+    meta['valores'] = np.memmap(os.path.join(pasta, VALORES), dtype='float32', mode='r', shape=forma)
+    meta['inicio'] = pd.Timestamp(meta['inicio'])
+    return meta
+
+
+def preparar(impressao, pasta=SENSOR_HOURLY_PATH):
+    """Abre o armazém e o (re)constrói se não existir ou se os arquivos de origem mudaram; retorna (armazém, construído)"""
+    armazem = abrir(pasta)
+    if armazem is not None and armazem['impressao'] == impressao:
+        return armazem, False
+    return construir(impressao, pasta), True
+
+
+def intervalo(armazem):
+    """Primeira e última hora do armazém"""
+    return armazem['inicio'], armazem['inicio'] + pd.Timedelta(hours=armazem['n_dias'] * HORAS_DIA - 1)
+
+
+def _selecao(armazem, variavel, estacoes):
+    v = armazem['variaveis'].index(variavel)
+    estacoes = armazem['estacoes'] if estacoes is None else [e for e in armazem['estacoes'] if e in set(estacoes)]
+    return v, estacoes, [armazem['estacoes'].index(e) for e in estacoes]
+
+
+def serie_horaria(armazem, variavel, inicio, fim, estacoes=None):
+    """Medições horárias de `variavel` com inicio <= hora < fim: horas × estações (lê só esse trecho)"""
+    v, estacoes, linhas = _selecao(armazem, variavel, estacoes)
+    total = armazem['n_dias'] * HORAS_DIA
+    h0 = int(np.clip((pd.Timestamp(inicio) - armazem['inicio']) // pd.Timedelta(hours=1), 0, total))
+    h1 = int(np.clip((pd.Timestamp(fim) - armazem['inicio']) // pd.Timedelta(hours=1), h0, total))
+    trecho = np.array(armazem['valores'][v, :, h0:h1][linhas])
+    indice = pd.date_range(armazem['inicio'] + pd.Timedelta(hours=h0), periods=h1 - h0, freq='h', name='data')
+    return pd.DataFrame(trecho.T, index=indice, columns=estacoes)
+
+
+def perfil_diurno(armazem, variavel, anos=None, meses=None, estacoes=None, estatistica='media'):
+    """
+    Média (ou máximo, com `estatistica='maximo'`) de cada hora do dia nos anos e meses
+    pedidos: horas (0-23) × estações. Percorre o armazém um ano por vez.
+    """
+    v, estacoes, linhas = _selecao(armazem, variavel, estacoes)
+    dias = pd.date_range(armazem['inicio'], periods=armazem['n_dias'], freq='D')
+    selecionados = np.ones(len(dias), dtype=bool)
+    if anos:
+        selecionados &= np.isin(dias.year, [int(ano) for ano in anos])
+    if meses:
+        selecionados &= np.isin(dias.month, [int(mes) for mes in meses])
+
+    somas = np.zeros((len(linhas), HORAS_DIA))
+    contagens = np.zeros((len(linhas), HORAS_DIA), dtype='int64')
+    maximos = np.full((len(linhas), HORAS_DIA), np.nan)
+    for d0 in range(0, len(dias), DIAS_POR_BLOCO):
+        d1 = min(d0 + DIAS_POR_BLOCO, len(dias))
+        if not selecionados[d0:d1].any():
+            continue
+        bloco = np.array(armazem['valores'][v, :, d0 * HORAS_DIA:d1 * HORAS_DIA][linhas], dtype='float64')
+        bloco = bloco.reshape(len(linhas), d1 - d0, HORAS_DIA)[:, selecionados[d0:d1], :]
+        validos = ~np.isnan(bloco)
+        somas += np.where(validos, bloco, 0.0).sum(axis=1)
+        contagens += validos.sum(axis=1)
+        maximos = np.fmax(maximos, np.fmax.reduce(bloco, axis=1))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        resultado = maximos if estatistica == 'maximo' else np.where(contagens > 0, somas / contagens, np.nan)
+    return pd.DataFrame(resultado.T, index=pd.RangeIndex(HORAS_DIA, name='hora'), columns=estacoes)
+
+
+if __name__ == '__main__':
+    from utils.data_loader import sensor_sources
+    from utils.cache import fingerprint
+
+    armazem = construir(fingerprint(sensor_sources()))
+    tamanho = armazem['valores'].nbytes / 2**20
+    print(f"Armazém horário com {len(armazem['estacoes'])} estações e {armazem['n_dias']} dias "
+          f"({tamanho:.1f} MB) gravado em {SENSOR_HOURLY_PATH}")
@@ -0,0 +1,114 @@
+"""
+Leitura paralela de vários CSVs (caminhos locais ou URLs).
+
+O download/leitura dos bytes de cada arquivo roda em um pool de threads (I/O) e,
+à medida que cada arquivo chega, o parsing é enviado para um pool de processos
+(CPU). Os processos não são criados com `fork`: o servidor do Streamlit (e a pré-carga
+em segundo plano de `utils/datasets.py`) tem outras threads, e um fork com um lock
+preso em uma delas (logging, imports) pode travar o processo filho. Eles partem de um
+`forkserver` (ou `spawn`, onde ele não existe) que já importou este módulo, então
+criar o pool a cada leitura custa pouco. Os DataFrames são concatenados na ordem do dicionário de origem, então o
+resultado é o mesmo da leitura sequencial. O tempo de cada arquivo vai para o log
+(nível INFO) e volta na tabela `tempos`, que os loaders mostram no painel de tempos
+(`utils/profiling.py`); os arquivos mais lentos que `LENTO` vezes a mediana também
+saem como WARNING, visível mesmo sem configurar o logging.
+"""
+import io
+import logging
+import multiprocessing
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import pandas as pd
+from utils.config import INGESTION_WORKERS, INGESTION_PARSE_IN_PROCESSES
+
+logger = logging.getLogger(__name__)
+
+LENTO = 2  # arquivos acima de LENTO vezes a mediana dos tempos são marcados como lentos
+
+
+def _contexto_processos():
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    contexto = multiprocessing.get_context('forkserver')
+    # Os processos já nascem com pandas e este módulo importados
+    contexto.set_forkserver_preload([__name__])
+    return contexto
+
+
+def fetch_bytes(source):
+    """Lê o conteúdo bruto de um arquivo local ou de uma URL http(s)"""
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(source) as resposta:
+            return resposta.read()
+    with open(source, 'rb') as arquivo:
+        return arquivo.read()
+
+
+def parse_csv(conteudo, read_csv_kwargs):
+    inicio = time.perf_counter()
+    df = pd.read_csv(io.BytesIO(conteudo), **read_csv_kwargs)
+    return df, time.perf_counter() - inicio
+
+
+def _fetch_timed(source):
+    inicio = time.perf_counter()
+    conteudo = fetch_bytes(source)
+    return conteudo, time.perf_counter() - inicio
+
+
+def read_csvs_parallel(sources, workers=None, parse_in_processes=None, **read_csv_kwargs):
+    """
+    Lê todos os CSVs de `sources` (nome -> caminho ou URL) em paralelo e concatena na ordem original.
+
+    Retorna o DataFrame concatenado e uma tabela com os tempos por arquivo.
+    """
+    workers = workers or INGESTION_WORKERS
+    parse_in_processes = INGESTION_PARSE_IN_PROCESSES if parse_in_processes is None else parse_in_processes
+    read_csv_kwargs.setdefault('sep', ',')
+    inicio = time.perf_counter()
+
+    if workers <= 1 or len(sources) <= 1:
+        resultados = {}
+        for nome, source in sources.items():
+            conteudo, t_leitura = _fetch_timed(source)
+            resultados[nome] = (len(conteudo), t_leitura) + parse_csv(conteudo, read_csv_kwargs)
+    else:
+        n_workers = min(workers, len(sources))
+        if parse_in_processes:
+            parse_pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=_contexto_processos())
+        else:
+            parse_pool = ThreadPoolExecutor(max_workers=n_workers)
+        with ThreadPoolExecutor(max_workers=n_workers) as io_pool, parse_pool:
+            leituras = {io_pool.submit(_fetch_timed, source): nome for nome, source in sources.items()}
+            parses = {}
+            for futuro in as_completed(leituras):
+                nome = leituras[futuro]
+                conteudo, t_leitura = futuro.result()
+                parses[nome] = (len(conteudo), t_leitura, parse_pool.submit(parse_csv, conteudo, read_csv_kwargs))
+            resultados = {nome: (tamanho, t_leitura) + futuro.result()
+                          for nome, (tamanho, t_leitura, futuro) in parses.items()}
+
+    linhas = []
+    for nome in sources:
+        tamanho, t_leitura, df, t_parse = resultados[nome]
+        linhas.append({'arquivo': nome, 'bytes': tamanho, 'leitura_s': t_leitura, 'parse_s': t_parse, 'linhas': len(df)})
+    tempos = pd.DataFrame(linhas)
+    tempos['total_s'] = tempos['leitura_s'] + tempos['parse_s']
+    tempos['lento'] = (len(tempos) > 1) & (tempos['total_s'] > LENTO * tempos['total_s'].median())
+
+    df = pd.concat([resultados[nome][2] for nome in sources], ignore_index=True)
+
+    _log_tempos(tempos, time.perf_counter() - inicio)
+    return df, tempos
+
+
+def _log_tempos(tempos, total):
+    mediana = tempos['total_s'].median()
+    for linha in tempos.itertuples():
+        logger.info("%s: leitura %.3fs, parse %.3fs, %d linhas", linha.arquivo, linha.leitura_s, linha.parse_s,
+                    linha.linhas)
+        if linha.lento:
+            logger.warning("%s lento: %.3fs (leitura %.3fs, parse %.3fs), mediana dos %d arquivos %.3fs",
+                           linha.arquivo, linha.total_s, linha.leitura_s, linha.parse_s, len(tempos), mediana)
+    logger.info("%d arquivos lidos em %.3fs", len(tempos), total)
@@ -0,0 +1,219 @@
+"""
+Tempos de cada rerun do dashboard: loaders, seções das páginas e cache.
+
+`main.py` chama `iniciar()` no começo de cada rerun e `mostrar_painel()` no fim.
+Entre os dois, os trechos marcados com `span(...)`, `@perfilar(...)` ou `etapa(...)`
+são registrados e o painel da barra lateral mostra uma cascata (início e duração
+de cada trecho) e, nos loaders, se o resultado veio do cache em memória do
+Streamlit, do cache em disco (`utils/cache.py`) ou foi calculado. Tabelas de detalhes
+registradas com `anexar(...)` (os tempos por arquivo da leitura dos CSVs) aparecem
+abaixo da cascata.
+
+Liga com `QUALIAR_PROFILE=1` ou `?profile=1` na URL; com `cprofile` no lugar de
+`1`, o rerun inteiro também passa pelo cProfile e o `.prof` é gravado em
+`PROFILE_DIR` (abre com `python -m pstats` ou snakeviz).
+
+Desligado, `span` devolve sempre o mesmo contexto vazio e `@perfilar`/`etapa`
+só fazem uma consulta a um atributo antes de seguir.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from utils.config import PROFILE_MODE, PROFILE_DIR
+
+MODOS = ('1', 'cprofile')
+
+# Cada sessão do Streamlit roda o script na sua própria thread
+_local = threading.local()
+_NULO = contextlib.nullcontext()
+
+
+class _Registro:
+    __slots__ = ('nome', 'nivel', 'inicio', 'fim', 'cache', 'etapa')
+
+    def __init__(self, nome, nivel, cache, etapa):
+        self.nome = nome
+        self.nivel = nivel
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.cache = 'memória' if cache else None  # sem marcar_cache, o corpo com cache não rodou
+        self.etapa = etapa
+
+
+class _Span:
+    def __init__(self, nome, cache=False, etapa=False):
+        self.nome = nome
+        self.cache = cache
+        self.etapa = etapa
+
+    def __enter__(self):
+        pilha = _local.pilha
+        self.registro = _Registro(self.nome, len(pilha), self.cache, self.etapa)
+        _local.registros.append(self.registro)
+        pilha.append(self.registro)
+        return self.registro
+
+    def __exit__(self, *exc):
+        # Fecha também a etapa que ficou aberta dentro deste trecho
+        pilha = _local.pilha
+        agora = time.perf_counter()
+        while pilha:
+            registro = pilha.pop()
+            registro.fim = agora
+            if registro is self.registro:
+                break
+        return False
+
+
+def modo():
+    """'1', 'cprofile' ou None, pela variável de ambiente ou por ?profile= na URL"""
+    if PROFILE_MODE in MODOS:
+        return PROFILE_MODE
+    try:
+        valor = st.query_params.get('profile')
+    except Exception:  # fora de `streamlit run`
+        return None
+    return valor if valor in MODOS else None
+
+
+def ativo():
+    return getattr(_local, 'registros', None) is not None
+
+
+def iniciar():
+    """Começa o registro de um rerun (ou desliga, se a instrumentação estiver desligada)"""
+    atual = modo()
+    _local.registros = [] if atual else None
+    _local.pilha = []
+    _local.tabelas = []
+    _local.inicio = time.perf_counter()
+    _local.perfil = None
+    if atual == 'cprofile':
+        _local.perfil = cProfile.Profile()
+        _local.perfil.enable()
+
+
+def span(nome, cache=False):
+    """Contexto que registra a duração de um trecho; `cache=True` para trechos atrás de um cache"""
+    if getattr(_local, 'registros', None) is None:
+        return _NULO
+    return _Span(nome, cache)
+
+
+def perfilar(nome=None, cache=False):
+    """Decorador: registra cada chamada da função como um trecho"""
+    def decorador(func):
+        rotulo = nome or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, 'registros', None) is None:
+                return func(*args, **kwargs)
+            with _Span(rotulo, cache):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorador
+
+
+def etapa(nome):
+    """Marca o começo de uma seção; ela vai até a próxima etapa ou até o fim do trecho que a contém"""
+    if getattr(_local, 'registros', None) is None:
+        return
+    pilha = _local.pilha
+    if pilha and pilha[-1].etapa:
+        registro = pilha.pop()
+        registro.fim = time.perf_counter()
+    _Span(nome, etapa=True).__enter__()
+
+
+def marcar_cache(origem):
+    """Chamado de dentro do corpo com cache: anota no trecho com cache mais interno de onde veio o resultado"""
+    if getattr(_local, 'registros', None) is None:
+        return
+    for registro in reversed(_local.pilha):
+        if registro.cache is not None:
+            if registro.cache == 'memória':  # a primeira marca vale (caches aninhados não sobrescrevem)
+                registro.cache = origem
+            return
+
+
+def anexar(nome, df):
+    """Tabela de detalhes do rerun (por exemplo, os tempos por arquivo de `utils/ingestion.py`), mostrada no painel"""
+    if getattr(_local, 'registros', None) is None:
+        return
+    # Identifica a tabela pelo trecho em que foi registrada (o loader que leu os arquivos)
+    if _local.pilha:
+        nome = f'{_local.pilha[-1].nome}: {nome}'
+    _local.tabelas.append((nome, df))
+
+
+def finalizar():
+    """Encerra o rerun: fecha os trechos abertos e grava o cProfile; retorna (registros, tabelas, total, arquivo)"""
+    registros = _local.registros
+    agora = time.perf_counter()
+    for registro in _local.pilha:
+        registro.fim = agora
+    _local.pilha = []
+    _local.registros = None
+    tabelas, _local.tabelas = _local.tabelas, []
+
+    arquivo = None
+    perfil = getattr(_local, 'perfil', None)
+    if perfil is not None:
+        perfil.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        arquivo = os.path.join(PROFILE_DIR, time.strftime('rerun-%Y%m%d-%H%M%S.prof'))
+        perfil.dump_stats(arquivo)
+        _local.perfil = None
+    return registros, tabelas, agora - _local.inicio, arquivo
+
+
+def tabela(registros, inicio):
+    return pd.DataFrame({
+        'trecho': ['· ' * r.nivel + r.nome for r in registros],
+        'início (ms)': [round((r.inicio - inicio) * 1000, 1) for r in registros],
+        'duração (ms)': [round((r.fim - r.inicio) * 1000, 1) for r in registros],
+        'cache': [r.cache or '' for r in registros],
+    })
+
+
+def mostrar_painel():
+    """Painel da barra lateral com a cascata do rerun (nada a fazer se estiver desligado)"""
+    if not ativo():
+        return
+    inicio = _local.inicio
+    registros, tabelas, total, arquivo = finalizar()
+
+    df = tabela(registros, inicio)
+    rotulos = [f'{i + 1:02d} {trecho}' for i, trecho in enumerate(df['trecho'])]
+    cores = {'memória': '#2ca02c', 'disco': '#1f77b4', 'calculado': '#d62728', '': '#7f7f7f'}
+
+    with st.sidebar.expander("⏱️ Tempos do rerun", expanded=True):
+        st.caption(f"Total: {total * 1000:.0f} ms — cache: verde memória, azul disco, vermelho calculado")
+        fig = go.Figure(go.Bar(
+            y=rotulos, x=df['duração (ms)'], base=df['início (ms)'], orientation='h',
+            marker_color=[cores.get(c, '#7f7f7f') for c in df['cache']],
+            hovertemplate='%{y}<br>início %{base:.1f} ms<br>duração %{x:.1f} ms<extra></extra>'
+        ))
+        fig.update_layout(height=max(200, 22 * len(rotulos) + 60), margin=dict(l=0, r=0, t=10, b=0),
+                          yaxis=dict(autorange='reversed'), xaxis_title='ms')
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(df, hide_index=True, use_container_width=True)
+
+        for nome, detalhes in tabelas:
+            st.caption(nome)
+            st.dataframe(detalhes, hide_index=True, use_container_width=True)
+
+        if arquivo:
+            saida = io.StringIO()
+            pstats.Stats(arquivo, stream=saida).sort_stats('cumulative').print_stats(15)
+            st.caption(f"cProfile gravado em `{arquivo}`")
+            st.text(saida.getvalue())
@@ -0,0 +1,108 @@
+"""
+Médias móveis por estação em janelas de tempo (1h, 8h e 24h) e seus máximos diários.
+
+As médias regulatórias (CO e O₃ em 8 horas, material particulado em 24 horas) são
+de cada estação e pelo relógio: a janela de 8h que termina às 10h cobre as medições
+de (02h, 10h]. Um `rolling(8)` sobre as linhas mistura estações quando o DataFrame é
+a concatenação de todas e, com lacunas, junta horas que não são consecutivas.
+
+Todas as estações, colunas e janelas saem de uma passada: as linhas são ordenadas
+por (estação, hora), estação e hora viram uma única chave inteira (com as estações
+afastadas mais do que a maior janela, para que nenhuma janela atravesse de uma para
+outra), o início de cada janela vem de `np.searchsorted` sobre a chave e a soma e a
+contagem de valores válidos vêm de somas acumuladas.
+
+Uma janela só tem média com pelo menos `MINIMO_HORAS` horas válidas (75% da janela,
+como na regra da EPA para a média de 8 horas).
+"""
+import numpy as np
+import pandas as pd
+
+JANELAS = {'1h': 1, '8h': 8, '24h': 24}
+MINIMO_HORAS = {'1h': 1, '8h': 6, '24h': 18}
+
+
+def _ordenar(df_horario, estacao, tempo, maior_janela):
+    """Nomes das estações e, na ordem (estação, hora): posições, códigos das estações, horas e a chave inteira"""
+    codigos, estacoes = pd.factorize(df_horario[estacao], sort=True)
+    horas = pd.to_datetime(df_horario[tempo]).to_numpy(dtype='datetime64[h]').astype('int64')
+    if len(horas) == 0:
+        return estacoes, np.arange(0), codigos, horas, horas
+    passo = horas.max() - horas.min() + maior_janela + 1
+    chave = codigos * passo + (horas - horas.min())
+    # Os CSVs e o armazenamento colunar já vêm por estação e hora: aí não há o que ordenar
+    if (chave[1:] >= chave[:-1]).all():
+        return estacoes, np.arange(len(chave)), codigos, horas, chave
+    ordem = np.argsort(chave, kind='stable')
+    return estacoes, ordem, codigos[ordem], horas[ordem], chave[ordem]
+
+
+def _medias_ordenadas(valores, chave, janelas, minimo):
+    """{janela: médias (linhas na ordem da chave, uma coluna por variável)}"""
+    validos = ~np.isnan(valores)
+    n_validos = validos.sum(axis=0)
+    # Somas acumuladas sobre desvios da média: menos erro de arredondamento em séries longas
+    centro = np.where(validos, valores, 0.0).sum(axis=0) / np.maximum(n_validos, 1)
+    somas = np.zeros((len(valores) + 1, valores.shape[1]))
+    np.cumsum(np.where(validos, valores - centro, 0.0), axis=0, out=somas[1:])
+    contagens = np.zeros((len(valores) + 1, valores.shape[1]), dtype='int64')
+    np.cumsum(validos, axis=0, out=contagens[1:])
+
+    fim = np.arange(1, len(valores) + 1)
+    medias = {}
+    for nome in janelas:
+        inicio = np.searchsorted(chave, chave - JANELAS[nome], side='right')
+        quantidade = contagens[fim] - contagens[inicio]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = (somas[fim] - somas[inicio]) / quantidade + centro
+        media[quantidade < minimo.get(nome, JANELAS[nome])] = np.nan
+        medias[nome] = media
+    return medias
+
+
+def medias_moveis(df_horario, colunas, janelas=tuple(JANELAS), minimo=MINIMO_HORAS, estacao='nome_estacao', tempo='data'):
+    """
+    Média de cada coluna nas últimas 1h/8h/24h de medições da mesma estação.
+
+    Retorna um DataFrame com o índice de `df_horario` (que não precisa estar ordenado)
+    e colunas `<coluna>_<janela>`, ex.: `o3_8h`.
+    """
+    colunas, janelas = list(colunas), list(janelas)
+    _, ordem, _, _, chave = _ordenar(df_horario, estacao, tempo, max(JANELAS[j] for j in janelas))
+    valores = df_horario[colunas].to_numpy(dtype='float64')[ordem]
+    medias = _medias_ordenadas(valores, chave, janelas, minimo)
+
+    resultado = np.empty((len(df_horario), len(colunas) * len(janelas)))
+    for i, nome in enumerate(janelas):
+        resultado[ordem, i * len(colunas):(i + 1) * len(colunas)] = medias[nome]
+    nomes = [f'{coluna}_{nome}' for nome in janelas for coluna in colunas]
+    return pd.DataFrame(resultado, index=df_horario.index, columns=nomes)
+
+
+def maximos_diarios(df_horario, colunas, janelas=tuple(JANELAS), minimo=MINIMO_HORAS, estacao='nome_estacao',
+                    tempo='data'):
+    """
+    Maior média móvel de cada janela em cada dia e estação (a janela é atribuída ao
+    dia em que termina).
+
+    Uma linha por (estação, dia), ordenada por (`data_formatada`, estação) como o
+    DataFrame diário de `load_sensor_data`; colunas `<coluna>_<janela>_max`.
+    """
+    colunas, janelas = list(colunas), list(janelas)
+    nomes = [f'{coluna}_{nome}_max' for nome in janelas for coluna in colunas]
+    estacoes, ordem, codigos, horas, chave = _ordenar(df_horario, estacao, tempo, max(JANELAS[j] for j in janelas))
+    if len(ordem) == 0:
+        return pd.DataFrame(columns=[estacao, 'data_formatada'] + nomes)
+
+    valores = df_horario[colunas].to_numpy(dtype='float64')[ordem]
+    medias = _medias_ordenadas(valores, chave, janelas, minimo)
+
+    # Linhas de um mesmo (estação, dia) são contíguas na ordem da chave; fmax ignora NaN
+    dias = horas // 24
+    inicios = np.flatnonzero(np.r_[True, (codigos[1:] != codigos[:-1]) | (dias[1:] != dias[:-1])])
+    maximos = np.hstack([np.fmax.reduceat(medias[nome], inicios, axis=0) for nome in janelas])
+
+    df_dia = pd.DataFrame(maximos, columns=nomes)
+    df_dia.insert(0, estacao, np.asarray(estacoes, dtype=object)[codigos[inicios]])
+    df_dia.insert(1, 'data_formatada', dias[inicios].astype('datetime64[D]').astype('datetime64[us]'))
+    return df_dia.sort_values(['data_formatada', estacao], kind='stable', ignore_index=True)
@@ -0,0 +1,117 @@
+"""
+Cubo de agregados pré-calculados dos sensores (estação × período × variável).
+
+Construído uma única vez a partir do DataFrame diário de `load_sensor_data`, com três
+níveis de período (dia, mês e ano) e, para cada um, as linhas de cada estação e a
+linha da cidade inteira (`CIDADE`). Cada linha guarda soma, contagem, mínimo e máximo
+de cada variável, que podem ser recombinados para qualquer conjunto de anos e meses:
+média = soma das somas / soma das contagens, mínimo dos mínimos e máximo dos máximos.
+
+As consultas das páginas selecionam linhas pelo índice (ordenado) em vez de filtrar
+e reagrupar o DataFrame completo a cada interação.
+"""
+import numpy as np
+import pandas as pd
+
+CIDADE = 'GERAL (Média RJ)'
+ESTATISTICAS = ['sum', 'count', 'min', 'max']
+
+# Como cada estatística é recombinada ao juntar linhas do cubo
+_COMBINACAO = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max', 'n_dias': 'sum'}
+
+CHAVES = {
+    'dia': ['nome_estacao', 'ano', 'mes', 'data_formatada'],
+    'mes': ['nome_estacao', 'ano', 'mes'],
+    'ano': ['nome_estacao', 'ano'],
+}
+
+
+def _agregar(df, por, variaveis):
+    agregado = df.groupby(por)[variaveis].agg(ESTATISTICAS)
+    agregado['n_dias', ''] = df.groupby(por)['data_formatada'].nunique()
+    return agregado
+
+
+def _combinar(linhas, por):
+    """Junta linhas do cubo agrupando pelos níveis `por` do índice"""
+    return linhas.groupby(level=por).agg({col: _COMBINACAO[col[1] or col[0]] for col in linhas.columns})
+
+
+def _com_cidade(estacoes, cidade, chaves):
+    cidade = pd.concat({CIDADE: cidade}, names=['nome_estacao'])
+    return pd.concat([estacoes, cidade]).reorder_levels(chaves).sort_index()
+
+
+def build_rollup(df_sensor, variaveis):
+    """Monta o cubo {nível: DataFrame} a partir do DataFrame diário por estação"""
+    df = df_sensor.copy()
+    df['ano'] = df['ano'].astype(int)
+    df['mes'] = df['mes'].astype(int)
+
+    estacao_dia = _agregar(df, CHAVES['dia'], variaveis)
+    cidade_dia = _agregar(df, CHAVES['dia'][1:], variaveis)
+    estacao_mes = _combinar(estacao_dia, CHAVES['mes'])
+    cidade_mes = _combinar(cidade_dia, CHAVES['mes'][1:])
+    estacao_ano = _combinar(estacao_mes, CHAVES['ano'])
+    cidade_ano = _combinar(cidade_mes, CHAVES['ano'][1:])
+
+    # Na cidade, a linha de um dia é a média entre estações; mês e ano contam dias distintos
+    return {
+        'dia': _com_cidade(estacao_dia, cidade_dia, CHAVES['dia']),
+        'mes': _com_cidade(estacao_mes, cidade_mes, CHAVES['mes']),
+        'ano': _com_cidade(estacao_ano, cidade_ano, CHAVES['ano']),
+        'variaveis': list(variaveis),
+    }
+
+
+def _selecionar(rollup, anos, meses=None, estacoes=None, nivel=None):
+    """Linhas do cubo para os anos/meses pedidos (sem meses = ano inteiro)"""
+    if nivel is None:
+        nivel = 'mes' if meses else 'ano'
+    tabela = rollup[nivel]
+    pedidos = {'nome_estacao': estacoes, 'ano': anos, 'mes': meses or None}
+    # Como `isin`: valores pedidos que não estão no índice (um mês sem medições) são ignorados. A
+    # seleção usa os códigos de cada nível porque `.loc` com listas levanta KeyError quando uma
+    # combinação de valores existentes (um mês que só falta em um dos anos) não tem linhas
+    selecao = np.ones(len(tabela), dtype=bool)
+    for nome, valores in pedidos.items():
+        if valores is None or nome not in tabela.index.names:
+            continue
+        posicao = tabela.index.names.index(nome)
+        codigos = tabela.index.levels[posicao].get_indexer(list(valores))
+        selecao &= np.isin(tabela.index.codes[posicao], codigos[codigos >= 0])
+    return tabela[selecao]
+
+
+def _com_media(resumo, variaveis):
+    for var in variaveis:
+        resumo[var, 'mean'] = resumo[var, 'sum'] / resumo[var, 'count']
+    return resumo
+
+
+def resumo_por_estacao(rollup, anos, meses=None):
+    """Soma, contagem, mínimo, máximo e média de cada variável por estação no período"""
+    linhas = _selecionar(rollup, anos, meses)
+    linhas = linhas[linhas.index.get_level_values('nome_estacao') != CIDADE]
+    return _com_media(_combinar(linhas, 'nome_estacao'), rollup['variaveis'])
+
+
+def resumo_cidade(rollup, anos, meses=None):
+    """Estatísticas da cidade inteira no período (uma linha; `n_dias` = dias distintos)"""
+    linhas = _selecionar(rollup, anos, meses, estacoes=[CIDADE])
+    resumo = _combinar(linhas, 'nome_estacao')
+    if resumo.empty:
+        # Período sem dados: somas e contagens zeradas, como no DataFrame filtrado vazio
+        resumo = resumo.reindex([CIDADE])
+        aditivas = [col for col in resumo.columns if _COMBINACAO[col[1] or col[0]] == 'sum']
+        resumo[aditivas] = 0
+    return _com_media(resumo, rollup['variaveis']).iloc[0]
+
+
+def serie_diaria_cidade(rollup, anos, meses=None, variaveis=None):
+    """Média diária entre estações de cada variável, indexada por data"""
+    variaveis = variaveis or rollup['variaveis']
+    linhas = _selecionar(rollup, anos, meses, estacoes=[CIDADE], nivel='dia')
+    serie = pd.DataFrame({var: linhas[var, 'sum'] / linhas[var, 'count'] for var in variaveis})
+    serie.index = linhas.index.get_level_values('data_formatada')
+    return serie.sort_index()
@@ -0,0 +1,35 @@
+"""
+Cadastro das estações de monitoramento, lido de `data/Sensors/estacoes.csv`.
+
+As coordenadas são anexadas às medições uma única vez, na construção do cache dos
+loaders: os nomes das estações são fatorados em códigos inteiros e a latitude e a
+longitude de cada linha vêm de uma indexação do cadastro por esses códigos.
+"""
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from utils.config import SENSOR_STATIONS_PATH
+
+STATION_COLUMNS = {'nome': 'nome_estacao', 'código': 'codigo', 'codnum': 'codnum', 'lat': 'latitude', 'lon': 'longitude'}
+
+
+@lru_cache(maxsize=None)
+def load_station_registry(path=SENSOR_STATIONS_PATH):
+    """Cadastro das estações indexado por `nome_estacao` (codigo, codnum, latitude, longitude)"""
+    registry = pd.read_csv(path, sep=',', encoding='utf-8-sig', usecols=list(STATION_COLUMNS))
+    registry = registry.rename(columns=STATION_COLUMNS)
+    registry['nome_estacao'] = registry['nome_estacao'].str.strip()
+    return registry.set_index('nome_estacao')[['codigo', 'codnum', 'latitude', 'longitude']]
+
+
+def attach_coordinates(df, registry=None, station_column='nome_estacao'):
+    """Acrescenta `latitude` e `longitude` a cada linha (NaN para estações fora do cadastro)"""
+    registry = load_station_registry() if registry is None else registry
+    codes, nomes = pd.factorize(df[station_column])
+    coords = registry.reindex(nomes)[['latitude', 'longitude']].to_numpy(dtype='float64')
+    # Linha extra de NaN no fim: o código -1 (nome vazio) aponta para ela
+    coords = np.vstack([coords, [[np.nan, np.nan]]])[codes]
+    df = df.copy()
+    df['latitude'] = coords[:, 0]
+    df['longitude'] = coords[:, 1]
+    return df
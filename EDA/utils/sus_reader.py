@@ -0,0 +1,72 @@
+"""
+Leitura compacta das internações do SUS.
+
+Lê apenas as colunas de interesse, em blocos, descartando já na leitura as
+internações fora do município e anteriores a `SUS_DATA_INICIAL`. Os códigos
+(CID, sexo, município) viram categorias, os inteiros são reduzidos ao menor tipo
+que comporta os valores e a data de internação fica em uma única coluna datetime64
+(`data_formatada`). Assim o pico de memória fica limitado ao tamanho de um bloco
+mais o resultado já filtrado.
+"""
+import pandas as pd
+import pyarrow.dataset as ds
+from pandas.api.types import union_categoricals
+from utils.config import (SUS_CSV_PATHS, SUS_INTEREST_COLUMNS, SUS_STORE_PATH, SUS_CHUNKSIZE,
+                          MUNICIPIO_RIO_DE_JANEIRO, SUS_DATA_INICIAL)
+from utils.columnar_store import SUS_PARTITIONING, SUS_CODE_COLUMNS, store_exists
+
+SUS_CATEGORICAL_COLUMNS = ['MUNIC_RES', 'SEXO', 'DIAG_PRINC', 'DIAG_SECUN']
+SUS_INTEGER_COLUMNS = ['UF_ZI', 'ANO_CMPT', 'MES_CMPT', 'NASC', 'DT_INTER', 'DT_SAIDA', 'IDADE', 'DIAS_PERM', 'MORTE']
+
+
+def iter_sus_chunks(municipio=MUNICIPIO_RIO_DE_JANEIRO, chunksize=SUS_CHUNKSIZE):
+    """Percorre as internações do município em blocos, do armazenamento colunar ou dos CSVs"""
+    if store_exists(SUS_STORE_PATH):
+        dataset = ds.dataset(SUS_STORE_PATH, format='parquet', partitioning=SUS_PARTITIONING)
+        for batch in dataset.to_batches(columns=SUS_INTEREST_COLUMNS, filter=ds.field('UF_ZI') == municipio,
+                                        batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    for url in SUS_CSV_PATHS.values():
+        for chunk in pd.read_csv(url, sep=',', usecols=SUS_INTEREST_COLUMNS, chunksize=chunksize,
+                                 dtype={col: 'string' for col in SUS_CODE_COLUMNS}):
+            yield chunk[chunk['UF_ZI'] == municipio]
+
+
+def compact_sus_chunk(chunk, data_inicial=SUS_DATA_INICIAL):
+    """Reduz os tipos de um bloco e mantém só as internações a partir de `data_inicial`"""
+    data_formatada = pd.to_datetime(chunk['DT_INTER'], format='%Y%m%d')
+    mask = data_formatada >= pd.Timestamp(data_inicial)
+
+    compacto = pd.DataFrame(index=chunk.index[mask])
+    for col in SUS_INTEREST_COLUMNS:
+        if col in SUS_CATEGORICAL_COLUMNS:
+            compacto[col] = chunk.loc[mask, col].astype('category')
+        else:
+            compacto[col] = pd.to_numeric(chunk.loc[mask, col], downcast='integer')
+    compacto['data_formatada'] = data_formatada[mask]
+    return compacto
+
+
+def concat_compact_chunks(chunks):
+    """Concatena os blocos unificando as categorias (senão o pandas volta para object)"""
+    # Blocos vazios (um arquivo só com cabeçalho, um bloco todo filtrado) têm categorias sem tipo
+    chunks = [chunk for chunk in chunks if len(chunk)]
+    if not chunks:
+        return pd.DataFrame(columns=SUS_INTEREST_COLUMNS + ['data_formatada'])
+    for col in SUS_CATEGORICAL_COLUMNS:
+        categorias = union_categoricals([chunk[col] for chunk in chunks], ignore_order=True).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categorias)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_sus_compact(municipio=MUNICIPIO_RIO_DE_JANEIRO, data_inicial=SUS_DATA_INICIAL, chunksize=SUS_CHUNKSIZE):
+    chunks = [compact_sus_chunk(chunk, data_inicial) for chunk in iter_sus_chunks(municipio, chunksize)]
+    df_sus = concat_compact_chunks(chunks)
+    df_sus = df_sus.sort_values(by='data_formatada', kind='stable', ignore_index=True)
+
+    df_sus['ano'] = df_sus['data_formatada'].dt.year.astype('int16')
+    df_sus['mes'] = df_sus['data_formatada'].dt.month.astype('int8')
+    return df_sus
@@ -0,0 +1,69 @@
+"""
+Recortes por data, ano e mês das medições dos sensores por busca binária.
+
+`load_sensor_data` entrega o DataFrame ordenado por (`data_formatada`, `nome_estacao`)
+com `data_formatada` em datetime64. Assim, as linhas de uma data, de um ano ou de
+um mês são um intervalo contíguo, localizado com `np.searchsorted` em vez de uma
+máscara booleana sobre a coluna inteira.
+"""
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = 'data_formatada'
+
+
+def sort_by_date(df, station_column='nome_estacao'):
+    """Ordena pela data (e estação) com data em datetime64, como esperam os recortes abaixo"""
+    df = df.copy()
+    df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN])
+    return df.sort_values([DATE_COLUMN, station_column], kind='stable', ignore_index=True)
+
+
+def _posicoes(df, inicios, fins):
+    datas = df[DATE_COLUMN].to_numpy()
+    inicios = np.searchsorted(datas, np.asarray(inicios, dtype=datas.dtype), side='left')
+    fins = np.searchsorted(datas, np.asarray(fins, dtype=datas.dtype), side='left')
+    return inicios, fins
+
+
+def _recortar(df, inicios, fins):
+    if len(inicios) == 1:
+        return df.iloc[inicios[0]:fins[0]]
+    posicoes = np.concatenate([np.arange(i, f) for i, f in zip(inicios, fins)]) if len(inicios) else []
+    return df.iloc[posicoes]
+
+
+def slice_dates(df, inicio, fim):
+    """Linhas com inicio <= data < fim"""
+    inicios, fins = _posicoes(df, [pd.Timestamp(inicio)], [pd.Timestamp(fim)])
+    return _recortar(df, inicios, fins)
+
+
+def slice_date(df, data):
+    """Linhas de uma data"""
+    data = pd.Timestamp(data).normalize()
+    return slice_dates(df, data, data + pd.Timedelta(days=1))
+
+
+def slice_period(df, anos, meses=None):
+    """Linhas dos anos pedidos e, se houver, só dos meses pedidos (sem meses = ano inteiro)"""
+    anos = sorted(int(ano) for ano in anos)
+    if not anos:
+        return df.iloc[:0]
+    if meses:
+        meses = sorted(int(mes) for mes in meses)
+        inicios = pd.to_datetime(pd.DataFrame({'year': np.repeat(anos, len(meses)),
+                                               'month': np.tile(meses, len(anos)), 'day': 1}))
+        fins = inicios + pd.DateOffset(months=1)
+    else:
+        inicios = pd.to_datetime(pd.DataFrame({'year': anos, 'month': 1, 'day': 1}))
+        fins = inicios + pd.DateOffset(years=1)
+    inicios, fins = _posicoes(df, inicios, fins)
+    return _recortar(df, inicios, fins)
+
+
+def date_bounds(df):
+    """Primeira e última data (primeira e última linha, já que está ordenado)"""
+    if df.empty:
+        return None, None
+    return df[DATE_COLUMN].iloc[0], df[DATE_COLUMN].iloc[-1]